@@ -1,174 +1,53 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for
-import psutil
 import time
-import requests
+_started = time.perf_counter()
+from flask import Flask, render_template, request, jsonify
 import json
 import os
-from datetime import datetime, timedelta, timezone
-import pytz
-from config import WEATHER_LAT, WEATHER_LON, WEATHER_CITY, NEWS_FEEDS, STOCKS, FEATURES
+from datetime import datetime, timedelta
+from config import WEATHER_CITY, NEWS_FEEDS, STOCKS, FEATURES, REFRESH_INTERVAL_NEWS
+from modules import admission, deadline, dashboard, events, versions, httpcache, metrics, profiler, memory, warmup, supervisor
+from modules import features as feature_modules
+from modules.httpcache import file_mtime
+from modules.refresh import start_refreshers
+
+# Flask and the core modules every feature builds on; the widgets themselves
+# are imported further down, only if config.FEATURES enables them
+feature_modules.record('core imports', time.perf_counter() - _started)
 
 app = Flask(__name__)
 
+# Request counts and latency, served at /metrics (modules/metrics.py).
+# Registered first so its after_request hook runs last and times the others.
+metrics.register(app)
+
+# Token buckets and concurrency limits for /log, /digest-cache and /digest
+# (modules/admission.py); rejected requests are still counted and timed above
+admission.register(app)
+
+# Per-request latency budgets (modules/deadline.py)
+deadline.register(app)
+
+# ETags, Cache-Control and gzip for JSON routes (modules/httpcache.py)
+httpcache.register(app)
+
+# Opt-in ?__profile=1 request profiling, off unless config.PROFILING (modules/profiler.py)
+profiler.register(app)
+
 DATA_FILE = os.path.join(os.path.dirname(__file__), 'data.json')
-PACIFIC_TZ = pytz.timezone('America/Los_Angeles')
 
 def load_data():
     if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r') as f:
+        with metrics.timed_json('data', 'load'), open(DATA_FILE, 'r') as f:
             return json.load(f)
     return {'chores': [], 'telemetry': {}, 'users': ['Default']}
 
 def save_data(data):
-    with open(DATA_FILE, 'w') as f:
+    with metrics.timed_json('data', 'save'), open(DATA_FILE, 'w') as f:
         json.dump(data, f)
+    events.publish_widgets(['chores'])
 
-def get_weather():
-    try:
-        url = f"https://api.open-meteo.com/v1/forecast?latitude={WEATHER_LAT}&longitude={WEATHER_LON}&current=temperature_2m,weather_code,wind_speed_10m&hourly=temperature_2m,weather_code&forecast_days=2&timezone=America/Los_Angeles"
-        resp = requests.get(url, timeout=5)
-        data = resp.json()
-        
-        current = data.get('current', {})
-        hourly = data.get('hourly', {})
-        
-        temp_f = round(current.get('temperature_2m', 0) * 9/5 + 32)
-        wind = current.get('wind_speed_10m', 0)
-        code = current.get('weather_code', 0)
-        
-        now_pacific = datetime.now(PACIFIC_TZ)
-        hourly_times = hourly.get('time', [])
-        hourly_temps = hourly.get('temperature_2m', [])
-        hourly_codes = hourly.get('weather_code', [])
-        
-        forecast = []
-        
-        # Show the next 6 hours from now
-        # Times from API are now in local Pacific time
-        for i, t in enumerate(hourly_times):
-            dt_local = datetime.fromisoformat(t)
-            dt_local = PACIFIC_TZ.localize(dt_local)
-            
-            # Only include hours that are >= now
-            if dt_local >= now_pacific:
-                temp_c = hourly_temps[i] if i < len(hourly_temps) else 0
-                forecast.append({
-                    'time': dt_local.strftime('%I %p'),
-                    'temp': round(temp_c * 9/5 + 32),
-                    'code': hourly_codes[i] if i < len(hourly_codes) else 0
-                })
-                if len(forecast) >= 6:
-                    break
-        
-        conditions = {
-            0: "Clear", 1: "Mainly Clear", 2: "Partly Cloudy", 3: "Overcast",
-            45: "Fog", 48: "Fog",
-            51: "Drizzle", 53: "Drizzle", 55: "Drizzle",
-            61: "Rain", 63: "Rain", 65: "Rain",
-            71: "Snow", 73: "Snow", 75: "Snow",
-            80: "Showers", 81: "Showers", 82: "Showers",
-            95: "Thunderstorm", 96: "Thunderstorm"
-        }
-        
-        return {
-            'temp': temp_f,
-            'condition': conditions.get(code, "Unknown"),
-            'wind': round(wind * 0.621371),
-            'city': WEATHER_CITY,
-            'forecast': forecast,
-            'error': None
-        }
-    except Exception as e:
-        return {'temp': '--', 'condition': '--', 'wind': '--', 'city': WEATHER_CITY, 'forecast': [], 'error': str(e)}
-
-def get_news():
-    articles = []
-    seen_titles = set()
-    
-    for category, config in NEWS_FEEDS.items():
-        for feed_url in config['feeds']:
-            try:
-                resp = requests.get(feed_url, timeout=5)
-                content = resp.text
-                
-                source = ""
-                if 'bbc' in feed_url:
-                    source = "BBC"
-                elif 'reuters' in feed_url:
-                    source = "Reuters"
-                elif 'nytimes' in feed_url:
-                    source = "NYT"
-                elif 'techcrunch' in feed_url:
-                    source = "TechCrunch"
-                elif 'verge' in feed_url:
-                    source = "The Verge"
-                elif 'wired' in feed_url:
-                    source = "Wired"
-                
-                import re
-                items = re.findall(r'<item>(.*?)</item>', content, re.DOTALL)
-                
-                for item in items[:8]:
-                    title_match = re.search(r'<title><!\[CDATA\[(.*?)\]\]></title>|<title>(.*?)</title>', item)
-                    link_match = re.search(r'<link>(.*?)</link>', item)
-                    pub_match = re.search(r'<pubDate>(.*?)</pubDate>', item)
-                    
-                    title = (title_match.group(1) or title_match.group(2) or "No title").strip()
-                    link = link_match.group(1).strip() if link_match else "#"
-                    pub_date = pub_match.group(1).strip() if pub_match else ""
-                    
-                    if title not in seen_titles and len(articles) < 20:
-                        try:
-                            pub_dt = datetime.strptime(pub_date[:25], '%a, %d %b %Y %H:%M:%S')
-                            pub_dt = pub_dt.replace(tzinfo=None)
-                            if (datetime.now() - pub_dt).days <= 1:
-                                articles.append({
-                                    'title': title[:75] + ('...' if len(title) > 75 else ''),
-                                    'link': link,
-                                    'category': category,
-                                    'source': source
-                                })
-                                seen_titles.add(title)
-                        except:
-                            pass
-            except:
-                continue
-    
-    return articles
-
-def get_stocks():
-    results = []
-    for symbol in STOCKS:
-        try:
-            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=1d"
-            headers = {'User-Agent': 'Mozilla/5.0'}
-            resp = requests.get(url, headers=headers, timeout=5)
-            data = resp.json()
-            
-            result = data.get('chart', {}).get('result', [])
-            if not result:
-                continue
-                
-            meta = result[0].get('meta', {})
-            price = meta.get('regularMarketPrice', 0)
-            prev_close = meta.get('chartPreviousClose', price)
-            change = price - prev_close
-            change_pct = (change / prev_close * 100) if prev_close else 0
-            
-            results.append({
-                'symbol': symbol,
-                'name': meta.get('shortName', symbol)[:15] if meta.get('shortName') else symbol,
-                'price': round(price, 2),
-                'change': round(change, 2),
-                'change_pct': round(change_pct, 2)
-            })
-        except:
-            continue
-    
-    return results
-
-def get_today_chores():
-    data = load_data()
+def get_today_chores(data=None):
+    data = data if data is not None else load_data()
     today = datetime.now()
     today_str = today.strftime('%Y-%m-%d')
     today_dow = today.weekday()  # 0=Monday, 6=Sunday
@@ -237,9 +116,9 @@ def get_today_chores():
     
     return chores
 
-def get_overdue_chores():
+def get_overdue_chores(data=None):
     """Get chores that were due but not completed"""
-    data = load_data()
+    data = data if data is not None else load_data()
     today = datetime.now()
     today_str = today.strftime('%Y-%m-%d')
     today_dow = today.weekday()
@@ -314,35 +193,6 @@ def index():
                            missing_users=missing_users,
                            completed_users=completed_users)
 
-@app.route('/stats')
-def stats():
-    # Get uptime
-    uptime_seconds = time.time() - psutil.boot_time()
-    days = int(uptime_seconds // 86400)
-    hours = int((uptime_seconds % 86400) // 3600)
-    minutes = int((uptime_seconds % 3600) // 60)
-    uptime_str = f"{days}d {hours}h {minutes}m"
-    
-    # Get last tend time
-    tend_file = os.path.join(os.path.dirname(__file__), 'data', 'tend.json')
-    last_tend_time = "Never"
-    if os.path.exists(tend_file):
-        try:
-            with open(tend_file, 'r') as f:
-                tend_data = json.load(f)
-                if tend_data and 'last_tend' in tend_data:
-                    last_tend_time = tend_data['last_tend']
-        except:
-            pass
-    
-    return {
-        'cpu': psutil.cpu_percent(),
-        'memory': psutil.virtual_memory().percent,
-        'time': time.strftime('%H:%M:%S'),
-        'uptime': uptime_str,
-        'last_tend_time': last_tend_time
-    }
-
 @app.route('/config')
 def config():
     """Expose app configuration including FEATURES toggles"""
@@ -358,22 +208,6 @@ def features():
     """Dashboard feature toggles"""
     return FEATURES
 
-@app.route('/weather')
-def weather():
-    return get_weather()
-
-@app.route('/news')
-def news():
-    return {'articles': get_news()}
-
-@app.route('/stocks')
-def stocks():
-    return {'stocks': get_stocks()}
-
-@app.route('/chores')
-def chores():
-    return {'chores': get_today_chores(), 'overdue': get_overdue_chores()}
-
 @app.route('/checkin_status')
 def checkin_status():
     yesterday, missing_users, completed_users = get_yesterday_checkin_status()
@@ -406,11 +240,11 @@ def telemetry():
     if not date:
         date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
     
-    metrics = {}
+    values = {}
     if request.form:
-        metrics = {k: v for k, v in request.form.items() if k not in ['action', 'user', 'date']}
+        values = {k: v for k, v in request.form.items() if k not in ['action', 'user', 'date']}
     elif request.json:
-        metrics = request.json.get('metrics', {})
+        values = request.json.get('metrics', {})
     
     if user not in data.get('telemetry', {}):
         data['telemetry'][user] = []
@@ -418,281 +252,145 @@ def telemetry():
     # Remove existing entry for this date
     data['telemetry'][user] = [e for e in data['telemetry'][user] if e.get('date') != date]
     
-    entry = {'date': date, 'metrics': metrics}
+    entry = {'date': date, 'metrics': values}
     data['telemetry'][user].append(entry)
     save_data(data)
     return jsonify({'success': True})
 
-@app.route('/chores_page', methods=['POST'])
-def chores_page():
-    """API endpoint for managing chores (no page)"""
-    data = load_data()
-    
-    action = request.form.get('action')
-    
-    if action == 'add':
-        schedule = request.form.get('schedule')
-        schedule_param = request.form.get('schedule_param', '')
-        
-        # Handle weekly (every N weeks)
-        if schedule == 'weekly':
-            weeks = request.form.get('schedule_weeks', '1')
-            day = request.form.get('schedule_param', '6')
-            schedule_param = f"{weeks},{day}"  # e.g., "2,0" = every 2 weeks on Monday
-        
-        # Handle yearly (mm-dd)
-        elif schedule == 'yearly':
-            month = request.form.get('schedule_month', '01')
-            day = request.form.get('schedule_day', '01')
-            schedule_param = f"{month}-{day}"
-        
-        chore = {
-            'name': request.form.get('name'),
-            'schedule': schedule,
-            'schedule_param': schedule_param,
-            'last_done': ''
-        }
-        data['chores'].append(chore)
-    
-    elif action == 'complete':
-        idx = int(request.form.get('index'))
-        if idx < len(data['chores']):
-            data['chores'][idx]['last_done'] = datetime.now().strftime('%Y-%m-%d')
-    
-    elif action == 'delete':
-        idx = int(request.form.get('index'))
-        if idx < len(data['chores']):
-            data['chores'].pop(idx)
-    
-    save_data(data)
-    return jsonify({'success': True})
+def register_chores_routes(app):
+    """Chores live in data.json next to the check-ins, so they stay here;
+    registered through the feature registry like the other widgets"""
+    def build_chores_widget(docs):
+        data = docs.get('data', load_data)
+        return {'chores': get_today_chores(data), 'overdue': get_overdue_chores(data)}, file_mtime(DATA_FILE)
+
+    dashboard.register_widget('chores', build_chores_widget, feature='chores')
+    # Picks up day rollovers and data.json edited outside the app
+    events.schedule_widget('chores', REFRESH_INTERVAL_NEWS / 1000, only_when_watched=True)
+
+    @app.route('/chores')
+    @versions.validated('chores', lambda: f"{file_mtime(DATA_FILE)}-{datetime.now().date()}")  # rolls over daily
+    def chores():
+        data = load_data()
+        return versions.respond('chores', {'chores': get_today_chores(data), 'overdue': get_overdue_chores(data)})
+
+    @app.route('/chores_page', methods=['POST'])
+    def chores_page():
+        """API endpoint for managing chores (no page)"""
+        data = load_data()
+
+        action = request.form.get('action')
+
+        if action == 'add':
+            schedule = request.form.get('schedule')
+            schedule_param = request.form.get('schedule_param', '')
+
+            # Handle weekly (every N weeks)
+            if schedule == 'weekly':
+                weeks = request.form.get('schedule_weeks', '1')
+                day = request.form.get('schedule_param', '6')
+                schedule_param = f"{weeks},{day}"  # e.g., "2,0" = every 2 weeks on Monday
+
+            # Handle yearly (mm-dd)
+            elif schedule == 'yearly':
+                month = request.form.get('schedule_month', '01')
+                day = request.form.get('schedule_day', '01')
+                schedule_param = f"{month}-{day}"
+
+            chore = {
+                'name': request.form.get('name'),
+                'schedule': schedule,
+                'schedule_param': schedule_param,
+                'last_done': ''
+            }
+            data['chores'].append(chore)
+
+        elif action == 'complete':
+            idx = int(request.form.get('index'))
+            if idx < len(data['chores']):
+                data['chores'][idx]['last_done'] = datetime.now().strftime('%Y-%m-%d')
+
+        elif action == 'delete':
+            idx = int(request.form.get('index'))
+            if idx < len(data['chores']):
+                data['chores'].pop(idx)
 
-@app.route('/complete_chore/<int:index>')
-def complete_chore(index):
-    """API to complete a chore"""
-    data = load_data()
-    if index < len(data['chores']):
-        data['chores'][index]['last_done'] = datetime.now().strftime('%Y-%m-%d')
         save_data(data)
-    return jsonify({'success': True})
-
-@app.route('/delete_chore/<int:index>')
-def delete_chore(index):
-    """API to delete a chore"""
-    data = load_data()
-    if index < len(data['chores']):
-        data['chores'].pop(index)
-        save_data(data)
-    return jsonify({'success': True})
-
-
-# Digest cache for AI-generated morning news digest
-DIGEST_FILE = os.path.join(os.path.dirname(__file__), "digest.json")
-
-def load_digest():
-    if os.path.exists(DIGEST_FILE):
-        with open(DIGEST_FILE, 'r') as f:
-            return json.load(f)
-    return {}
-
-def save_digest(data):
-    with open(DIGEST_FILE, 'w') as f:
-        json.dump(data, f)
-
-@app.route('/digest-cache', methods=['GET', 'POST'])
-def digest_cache():
-    if request.method == 'GET':
-        return jsonify(load_digest())
-    elif request.method == 'POST':
-        data = request.get_json()
-        if data:
-            save_digest(data)
-            return jsonify({"status": "ok", "message": "Digest cached"})
-        return jsonify({"status": "error", "message": "No data provided"}), 400
-
-@app.route('/ai-digest')
-def ai_digest():
-    """AI-powered summary of daily news - supports both old summary format and new categorized format"""
-    digest = load_digest()
-    
-    if not digest:
-        # Try RSS feeds as fallback
-        return jsonify({
-            'summary': 'No cached digest available. Morning digest runs at 5am.',
-            'categories': [],
-            'generated': None
-        })
-    
-    # Check for new categorized format first
-    categories = digest.get('categories', [])
-    if categories:
-        # New format with categories
-        return jsonify({
-            'categories': categories,
-            'date': digest.get('date', ''),
-            'generated': datetime.now().strftime('%Y-%m-%d %H:%M')
-        })
-    
-    # Fall back to old single-summary format
-    summary = digest.get('summary', '')
-    themes = digest.get('themes', [])
-    
-    # Build AI-style summary
-    summary_parts = []
-    for theme in themes:
-        theme_name = theme.get('theme', '')
-        headlines = theme.get('headlines', [])
-        if headlines:
-            summary_parts.append({
-                'theme': theme_name,
-                'headlines': headlines[:5],
-                'count': len(headlines)
-            })
-    
-    return jsonify({
-        'summary': summary,
-        'categories': summary_parts,
-        'generated': datetime.now().strftime('%Y-%m-%d %H:%M')
-    })
-
-@app.route('/digest')
-def digest():
-    """RSS-based news digest with themes"""
-    articles = get_news()
-    
-    # Group articles by category
-    themes = {}
-    for article in articles:
-        cat = article.get('category', 'Other')
-        if cat not in themes:
-            themes[cat] = []
-        themes[cat].append({
-            'title': article.get('title', ''),
-            'link': article.get('link', ''),
-            'source': article.get('source', '')
-        })
-    
-    return jsonify({
-        'themes': [{'theme': k, 'headlines': v} for k, v in themes.items()],
-        'generated': datetime.now().strftime('%Y-%m-%d %H:%M')
-    })
-
-@app.route('/journal')
-def journal():
-    """Return journal entries"""
-    journal_file = os.path.join(os.path.dirname(__file__), 'data', 'journal.json')
-    if os.path.exists(journal_file):
-        with open(journal_file, 'r') as f:
-            data = json.load(f)
-            return jsonify(data)
-    return jsonify({'version': '1.0', 'entries': []})
-
-@app.route('/future')
-def future():
-    """Return future improvements / pending tasks"""
-    # Path to RANCH_TASKS.md in nanobot workspace
-    tasks_file = '/home/juanpaez/.nanobot/workspace/memory/RANCH_TASKS.md'
-    tasks = []
-    if os.path.exists(tasks_file):
-        with open(tasks_file, 'r') as f:
-            content = f.read()
-            # Extract pending task lines: "- [ ]" (pending)
-            import re
-            matches = re.findall(r'- \[ \] (.+)', content)
-            for task in matches:
-                tasks.append(task.strip())
-    return jsonify({'tasks': tasks})
-
-@app.route('/rancher/tasks')
-def rancher_tasks():
-    """Alias for /future - return active tasks from RANCH_TASKS.md"""
-    # Path to RANCH_TASKS.md in nanobot workspace
-    tasks_file = '/home/juanpaez/.nanobot/workspace/memory/RANCH_TASKS.md'
-    tasks = []
-    if os.path.exists(tasks_file):
-        with open(tasks_file, 'r') as f:
-            content = f.read()
-            # Extract pending task lines: "- [ ]" (pending)
-            import re
-            matches = re.findall(r'- \[ \] (.+)', content)
-            for task in matches:
-                tasks.append(task.strip())
-    return jsonify({'active_tasks': tasks})
-
-# Life metrics endpoints
-LIFE_FILE = os.path.join(os.path.dirname(__file__), 'data', 'life.json')
-
-def load_life_data():
-    if os.path.exists(LIFE_FILE):
-        with open(LIFE_FILE, 'r') as f:
-            return json.load(f)
-    return {'version': '1.0', 'fitness': {}, 'mood': {}, 'learning': {}, 'social': {}}
-
-@app.route('/life')
-def life():
-    """All life data"""
-    return jsonify(load_life_data())
-
-@app.route('/life/streaks')
-def life_streaks():
-    """Fitness streaks"""
-    data = load_life_data()
-    workouts = data.get('fitness', {}).get('workouts', [])
-    
-    # Calculate streak
-    if not workouts:
-        return jsonify({'fitness': {'current_streak': 0, 'weekly_count': 0, 'weekly_target': 4}})
-    
-    # Get unique dates sorted
-    dates = sorted(set(w['date'] for w in workouts), reverse=True)
-    today = datetime.now().strftime('%Y-%m-%d')
-    
-    # Current streak
-    streak = 0
-    check_date = datetime.strptime(today, '%Y-%m-%d')
-    for d in dates:
-        dt = datetime.strptime(d, '%Y-%m-%d')
-        if (check_date - dt).days <= 1:
-            streak += 1
-            check_date = dt
-        else:
-            break
-    
-    # Weekly count
-    week_ago = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-    weekly_count = sum(1 for d in dates if d >= week_ago)
-    weekly_target = data.get('fitness', {}).get('goals', {}).get('weekly_gym_target', 4)
-    
-    return jsonify({
-        'fitness': {
-            'current_streak': streak,
-            'weekly_count': weekly_count,
-            'weekly_target': weekly_target
-        }
-    })
-
-@app.route('/life/mood')
-def life_mood():
-    """Mood entries"""
-    data = load_life_data()
-    return jsonify(data.get('mood', {}))
-
-@app.route('/life/fitness')
-def life_fitness():
-    """Fitness/workout data"""
-    data = load_life_data()
-    return jsonify(data.get('fitness', {}))
-
-@app.route('/life/learning')
-def life_learning():
-    """Learning data (books, courses, skills)"""
-    data = load_life_data()
-    return jsonify(data.get('learning', {}))
-
-@app.route('/life/social')
-def life_social():
-    """Social interactions"""
-    data = load_life_data()
-    return jsonify(data.get('social', {}))
-
-
+        return jsonify({'success': True})
+
+    @app.route('/complete_chore/<int:index>')
+    def complete_chore(index):
+        """API to complete a chore"""
+        data = load_data()
+        if index < len(data['chores']):
+            data['chores'][index]['last_done'] = datetime.now().strftime('%Y-%m-%d')
+            save_data(data)
+        return jsonify({'success': True})
+
+    @app.route('/delete_chore/<int:index>')
+    def delete_chore(index):
+        """API to delete a chore"""
+        data = load_data()
+        if index < len(data['chores']):
+            data['chores'].pop(index)
+            save_data(data)
+        return jsonify({'success': True})
+
+
+# /debug/memory and the memory soft limit (modules/memory.py); ?since= delta
+# history is cheap to lose, so it is evicted right after the gzip cache
+memory.register_cache('versions', versions.history_size, versions.clear_history, priority=10)
+memory.register_routes(app)
+
+# /dashboard bundles every enabled widget into one response
+# (modules/dashboard.py); each feature module registers its own widget
+dashboard.register_routes(app)
+
+# /events pushes changed widgets to open screens (modules/events.py). Feature
+# modules schedule their own jobs, which only rebuild while at least one
+# screen is listening; chores, life and the digests are also pushed as soon
+# as they're written.
+events.register_routes(app)
+
+# Startup warm-up and /ready (modules/warmup.py): the upstream snapshots and
+# data files are filled concurrently before the first screen loads. Feature
+# modules register their own tasks.
+warmup.task('data', load_data)
+warmup.register_routes(app)
+
+# Feature modules (modules/features.py): each is imported and registered only
+# if one of its config.FEATURES flags is on, so a disabled widget costs neither
+# its imports nor its routes and refreshers. /debug/startup reports the cost
+# of each.
+ARTICLE_FEATURES = ('ai_digest', 'news_digest')
+UPSTREAM_FEATURES = ('weather', 'stocks', 'news') + ARTICLE_FEATURES
+
+feature_modules.register('uptime', 'modules.sysstats')  # /stats, /stats/history
+feature_modules.register('weather', 'modules.weather')
+feature_modules.register('stocks', 'modules.stocks')
+feature_modules.register('news', 'modules.news')
+# News digests (/digest, /ai-digest, /digest-cache), team tagging
+# (/news/teams), the article archive (/news/search) and the adaptive source
+# polling scheduler (/sources/status) share the article pipeline in sources.py
+feature_modules.register('digest', 'modules.digest', flags=ARTICLE_FEATURES)
+feature_modules.register('teams', 'modules.teams', flags=ARTICLE_FEATURES)
+feature_modules.register('archive', 'modules.archive', flags=ARTICLE_FEATURES)
+feature_modules.register('sources', 'sources', flags=ARTICLE_FEATURES)
+feature_modules.register('upstream', 'modules.upstream', flags=UPSTREAM_FEATURES)  # /upstream/status
+feature_modules.register('journal', 'modules.journal')
+feature_modules.register('tasks', 'modules.journal:register_task_routes', flags=('future_improvements',))
+feature_modules.register('life', 'modules.life')
+feature_modules.register('chores', register_chores_routes)
+feature_modules.register_routes(app)
+feature_modules.load(app)
+
+
+if __name__ == '__main__':
+    print(feature_modules.format_report(), flush=True)
+    # Refreshers start once the warm-up is done, so nothing is fetched twice
+    if supervisor.is_worker():
+        # Started by `python -m modules.supervisor` on its listening socket
+        supervisor.serve(app, then=start_refreshers)
+    else:
+        warmup.start(then=start_refreshers)
+        app.run(host='0.0.0.0', port=80, threaded=True)
@@ -0,0 +1 @@
+"""Benchmarks - stub upstreams and harnesses for timing the app offline (see bench/run.py)"""
@@ -0,0 +1,119 @@
+"""
+Synthetic Data - realistic data.json and life.json at any scale
+Generates users with daily check-ins, a mix of daily/weekly/monthly/yearly/
+one-time chores, and years of workouts, moods, learning and social entries,
+all ending today so streak and "yesterday" logic has something to find.
+Output is deterministic for a given seed.
+
+    python -m bench.datagen --users 4 --days 1095 --chores 200 --out /tmp/srcc-data
+"""
+
+import os
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from modules.life import CURRENT_VERSION
+
+from . import env
+
+CHORE_NAMES = ['Feed chickens', 'Check water troughs', 'Muck stalls', 'Mow pasture', 'Fix fence line',
+               'Clean gutters', 'Service tractor', 'Split firewood', 'Refill feeders', 'Check smoke detectors',
+               'Backup system logs', 'Clean solar panels', 'Inspect roof', 'Turn compost', 'Sharpen tools']
+WORKOUT_TYPES = ['gym', 'run', 'workout', 'soccer', 'tennis']
+SOCIAL_TYPES = ['family', 'friend', 'colleague']
+
+
+def _days(days, today=None):
+    """The last `days` dates, oldest first, ending today"""
+    today = today or datetime.now().date()
+    return [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+
+
+def make_chore(rng, i, today):
+    schedule = rng.choices(['daily', 'weekly', 'monthly', 'yearly', 'onetime'], weights=[4, 3, 2, 1, 1])[0]
+    param = {
+        'daily': '',
+        'weekly': f'{rng.choice([1, 1, 2])},{rng.randrange(7)}',
+        'monthly': str(rng.randint(1, 28)),
+        'yearly': f'{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+        'onetime': (today + timedelta(days=rng.randint(-60, 60))).isoformat(),
+    }[schedule]
+    chore = {'name': f'{rng.choice(CHORE_NAMES)} #{i}', 'schedule': schedule, 'schedule_param': param}
+    if rng.random() < 0.7:
+        chore['last_done'] = (today - timedelta(days=rng.randint(0, 40))).isoformat()
+    return chore
+
+
+def generate_data(users=4, days=365, chores=20, checkin_rate=0.85, seed=1):
+    """data.json: `chores` chores and `days` of check-ins for each of `users`"""
+    rng = random.Random(seed)
+    today = datetime.now().date()
+    names = [f'User{i + 1}' for i in range(users)]
+    telemetry = {}
+    for name in names:
+        telemetry[name] = [
+            {'date': day.isoformat(), 'metrics': {
+                'sleep': str(rng.randint(5, 9)), 'energy': str(rng.randint(1, 10)),
+                'mood': str(rng.randint(1, 10)), 'notes': rng.choice(['', '', 'long day', 'rain all day'])}}
+            for day in _days(days, today)[:-1] if rng.random() < checkin_rate
+        ]
+    return {
+        'chores': [make_chore(rng, i, today) for i in range(chores)],
+        'telemetry': telemetry,
+        'users': names,
+    }
+
+
+def generate_life(days=365, workouts_per_week=4, mood_rate=0.8, seed=1):
+    """life.json with `days` of fitness, mood, learning and social history"""
+    rng = random.Random(seed)
+    workouts, moods, books, interactions = [], [], [], []
+    for day in _days(days):
+        date = day.isoformat()
+        if rng.random() < workouts_per_week / 7:
+            workouts.append({'date': date, 'type': rng.choice(WORKOUT_TYPES),
+                             'duration': rng.choice([30, 45, 60, 90]), 'notes': ''})
+        if rng.random() < mood_rate:
+            moods.append({'date': date, 'mood': rng.randint(1, 10), 'notes': ''})
+        if rng.random() < 0.05:
+            books.append({'date': date, 'type': 'book', 'title': f'Book {len(books) + 1}', 'notes': ''})
+        if rng.random() < 0.3:
+            interactions.append({'date': date, 'type': rng.choice(SOCIAL_TYPES),
+                                 'with': rng.choice(['Mom', 'Sam', 'Alex', 'neighbors']), 'notes': ''})
+    return {
+        'version': CURRENT_VERSION,
+        'fitness': {'workouts': workouts, 'goals': {'weekly_gym_target': 4, 'primary': 'Build strength and muscle mass'}},
+        'mood': {'entries': moods},
+        'learning': {'books': books, 'courses': [], 'skills': []},
+        'social': {'interactions': interactions},
+    }
+
+
+def write(data_dir, users=4, days=365, chores=20, seed=1):
+    """Write data.json and life.json into data_dir. Returns their paths."""
+    os.makedirs(data_dir, exist_ok=True)
+    paths = env.data_paths(data_dir)
+    with open(paths['data'], 'w') as f:
+        json.dump(generate_data(users, days, chores, seed=seed), f)
+    with open(paths['life'], 'w') as f:
+        json.dump(generate_life(days, seed=seed), f, indent=2)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate synthetic data.json and life.json')
+    parser.add_argument('--users', type=int, default=4)
+    parser.add_argument('--days', type=int, default=365, help='days of history')
+    parser.add_argument('--chores', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', required=True, help='directory to write into')
+    args = parser.parse_args(argv)
+    paths = write(args.out, args.users, args.days, args.chores, args.seed)
+    for key in ('data', 'life'):
+        print(f"{paths[key]}: {os.path.getsize(paths[key]) / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
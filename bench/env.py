@@ -0,0 +1,78 @@
+"""
+Benchmark Environment - run the app against a throwaway data directory
+isolated() points every file the app reads or writes (data.json, life.json,
+digest.json, the sources cache/state, the archive, journal, tasks, tend.json)
+into one directory and resets the in-memory state that depends on them, so
+benchmarks never touch the real files and always start cold.
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager, ExitStack
+from unittest.mock import patch
+
+
+def data_paths(data_dir):
+    """Where each data file lives under data_dir"""
+    return {
+        'data': os.path.join(data_dir, 'data.json'),
+        'life': os.path.join(data_dir, 'life.json'),
+        'journal': os.path.join(data_dir, 'journal.json'),
+        'tasks': os.path.join(data_dir, 'RANCH_TASKS.md'),
+        'tend': os.path.join(data_dir, 'tend.json'),
+        'digest': os.path.join(data_dir, 'digest.json'),
+        'sources_cache': os.path.join(data_dir, 'sources_cache.json'),
+        'sources_state': os.path.join(data_dir, 'sources_state.json'),
+        'archive': os.path.join(data_dir, 'articles_archive.jsonl'),
+    }
+
+
+def reset_state():
+    """Forget everything the app has cached in memory"""
+    import sources
+    from modules import upstream, life, archive, httpcache, versions, digest
+    with upstream._breakers_lock:
+        upstream._breakers.clear()
+    upstream._snapshots.clear()
+    with sources._sources_lock:
+        sources._sources = None
+    life._drop_life_cache()
+    archive.archive.unload()
+    httpcache.clear_gzip_cache()
+    with versions._trackers_lock:
+        versions._trackers.clear()
+    store = digest.store
+    with store.lock:
+        store.raw, store.ai, store.rss, store.history = {}, digest.build_ai_digest({}), None, {}
+        store.updated = {'ai': None, 'rss': None}
+    store.load()
+
+
+@contextmanager
+def isolated(data_dir=None):
+    """Run the app on data_dir (a fresh temp dir if None). Yields the paths
+    from data_paths(); the files themselves are left for the caller to seed."""
+    import app  # noqa: F401 - registers every route and the modules' state
+    from modules import archive, digest
+
+    owned = data_dir is None
+    data_dir = data_dir or tempfile.mkdtemp(prefix='srcc-bench-')
+    paths = data_paths(data_dir)
+    with ExitStack() as stack:
+        for target, key in [
+            ('app.DATA_FILE', 'data'), ('modules.journal.JOURNAL_FILE', 'journal'),
+            ('modules.journal.RANCH_TASKS_FILE', 'tasks'),
+            ('modules.life.LIFE_FILE', 'life'), ('modules.sysstats.TEND_FILE', 'tend'),
+            ('sources.CACHE_FILE', 'sources_cache'), ('sources.SOURCES_STATE_FILE', 'sources_state'),
+        ]:
+            stack.enter_context(patch(target, paths[key]))
+        stack.enter_context(patch.object(digest.store, 'path', paths['digest']))
+        stack.enter_context(patch.object(archive.archive, 'path', paths['archive']))
+        reset_state()
+        try:
+            yield paths
+        finally:
+            reset_state()
+            if owned:
+                shutil.rmtree(data_dir, ignore_errors=True)
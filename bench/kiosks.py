@@ -0,0 +1,391 @@
+"""
+Kiosk Load Test - N simulated dashboard screens against one server
+Each simulated client replays what templates/index.html does in a browser:
+  sse     the current page: the page, one /dashboard bundle, an /events stream
+          and /nanobot/releases every 3 s
+  poll    the same page without EventSource: /dashboard?widgets=... on the
+          3 s (stats), 60 s (stocks) and 300 s (weather, digests) timers
+  legacy  the pre-bundle page: a fan-out of ~15 per-widget fetches, then each
+          widget on its own 3 s / 60 s / 300 s timer
+The initial fan-out goes over up to 6 parallel connections, like a browser.
+Check-ins (POST /telemetry) and /log writes are mixed in at --writes-per-min.
+
+It reports client-side latency per endpoint, server-side time from /metrics
+(the gap between the two is queueing), server CPU and threads, and upstream
+calls per client request (amplification). --speed compresses the timers so a
+300 s cycle can be covered in a short run.
+
+    python -m bench.kiosks --spawn --replay data/cassettes --clients 8 --duration 120 --speed 10
+    python -m bench.kiosks --url http://srcc.local --clients 3 --pattern poll
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+
+from .run import percentile
+
+# Browsers open about this many connections per host
+BROWSER_CONNECTIONS = 6
+
+PATTERNS = {
+    'sse': {
+        'initial': ['/', '/dashboard', '/nanobot/releases'],
+        'timers': [(3, '/nanobot/releases')],
+        'events': True,
+    },
+    'poll': {
+        'initial': ['/', '/dashboard', '/nanobot/releases'],
+        'timers': [(3, '/nanobot/releases'), (3, '/dashboard?widgets=stats'),
+                   (60, '/dashboard?widgets=stocks'), (300, '/dashboard?widgets=weather'),
+                   (300, '/dashboard?widgets=ai_digest,digest')],
+        'events': False,
+    },
+    'legacy': {
+        'initial': ['/', '/stats', '/weather', '/stocks', '/chores', '/ai-digest', '/digest', '/journal', '/life',
+                    '/life/streaks', '/rancher/tasks', '/future', '/checkin_status', '/features',
+                    '/nanobot/releases'],
+        'timers': [(3, '/stats'), (3, '/nanobot/releases'), (60, '/stocks'), (300, '/weather'),
+                   (300, '/ai-digest'), (300, '/digest'), (300, '/life'), (300, '/journal'),
+                   (300, '/chores'), (300, '/rancher/tasks')],
+        'events': False,
+    },
+}
+
+LOG_MESSAGES = ['went to the gym, feeling great', 'had coffee with a friend', 'read a book chapter',
+                'feeling meh today', 'leg day done']
+
+_METRIC_RE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+_LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_metrics(text):
+    """[(name, {labels}, value)] from Prometheus text format"""
+    samples = []
+    for line in text.splitlines():
+        match = _METRIC_RE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            samples.append((name, dict(_LABEL_RE.findall(labels or '')), float(value)))
+    return samples
+
+
+def scrape(session, base_url):
+    try:
+        return parse_metrics(session.get(base_url + '/metrics', timeout=10).text)
+    except requests.RequestException:
+        return []
+
+
+def _total(samples, name, **match):
+    return sum(v for n, labels, v in samples if n == name and all(labels.get(k) == m for k, m in match.items()))
+
+
+def server_summary(before, after, client_requests):
+    """Server-side view of the run from two /metrics scrapes"""
+    buckets = defaultdict(float)
+    for name, labels, value in after:
+        if name == 'srcc_http_request_duration_seconds_bucket' and labels.get('endpoint') != 'metrics':
+            buckets[labels['le']] += value
+    for name, labels, value in before:
+        if name == 'srcc_http_request_duration_seconds_bucket' and labels.get('endpoint') != 'metrics':
+            buckets[labels['le']] -= value
+    bounds = sorted(((float(le), count) for le, count in buckets.items()), key=lambda b: b[0])
+    total = bounds[-1][1] if bounds else 0
+
+    def bucket_percentile(pct):
+        # Upper bound of the bucket holding the percentile
+        for bound, count in bounds:
+            if total and count >= pct / 100 * total:
+                return None if bound == float('inf') else round(bound * 1000, 1)
+        return None
+
+    upstream_before = _total(before, 'srcc_upstream_request_duration_seconds_count')
+    upstream_after = _total(after, 'srcc_upstream_request_duration_seconds_count')
+    hosts = defaultdict(float)
+    for sign, samples in ((-1, before), (1, after)):
+        for name, labels, value in samples:
+            if name == 'srcc_upstream_request_duration_seconds_count':
+                hosts[labels['host']] += sign * value
+    upstream_calls = upstream_after - upstream_before
+    return {
+        'requests': total,
+        'p50_ms_upper': bucket_percentile(50),
+        'p95_ms_upper': bucket_percentile(95),
+        'p99_ms_upper': bucket_percentile(99),
+        'upstream_calls': upstream_calls,
+        'upstream_calls_per_request': round(upstream_calls / client_requests, 3) if client_requests else None,
+        'upstream_calls_by_host': {h: c for h, c in sorted(hosts.items()) if c},
+        'errors_by_kind': {
+            f"{labels['host']} {labels['kind']}": value - _total(before, name, host=labels['host'], kind=labels['kind'])
+            for name, labels, value in after if name == 'srcc_upstream_errors_total'
+        },
+        'rss_mb': round(_total(after, 'srcc_process_resident_memory_bytes') / 2**20, 1),
+        'threads': _total(after, 'srcc_process_threads'),
+    }
+
+
+class Recorder:
+    """Thread-safe per-endpoint latencies and errors"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, name, seconds, status=None, error=None):
+        with self.lock:
+            if error:
+                self.errors[name] += 1
+            else:
+                self.latencies[name].append(seconds * 1000)
+                self.statuses[name][status] += 1
+
+    def summary(self):
+        with self.lock:
+            result = {}
+            for name in sorted(set(self.latencies) | set(self.errors)):
+                ms = self.latencies.get(name, [])
+                result[name] = {
+                    'n': len(ms),
+                    'errors': self.errors.get(name, 0),
+                    'statuses': dict(self.statuses.get(name, {})),
+                    'p50': round(percentile(ms, 50), 2) if ms else None,
+                    'p95': round(percentile(ms, 95), 2) if ms else None,
+                    'p99': round(percentile(ms, 99), 2) if ms else None,
+                }
+            return result
+
+    def all_latencies(self):
+        with self.lock:
+            return [v for values in self.latencies.values() for v in values]
+
+
+class Kiosk(threading.Thread):
+    """One simulated screen"""
+
+    def __init__(self, index, base_url, pattern, recorder, stop, speed=1.0, writes_per_min=0.0):
+        super().__init__(name=f'kiosk-{index}', daemon=True)
+        self.index = index
+        self.base_url = base_url
+        self.pattern = PATTERNS[pattern]
+        self.recorder = recorder
+        self.stop = stop
+        self.speed = speed
+        self.writes_per_min = writes_per_min
+        self.session = requests.Session()
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=BROWSER_CONNECTIONS))
+        self.events = 0
+        self.first_event_s = None
+        self.rng = random.Random(index)
+
+    def request(self, method, path, **kwargs):
+        name = f'{method} {path}'
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=30, **kwargs)
+            response.content
+            self.recorder.add(name, time.perf_counter() - start, response.status_code)
+        except requests.RequestException as e:
+            self.recorder.add(name, time.perf_counter() - start, error=e)
+
+    def listen(self):
+        """Hold an /events stream open like EventSource, counting events"""
+        start = time.perf_counter()
+        while not self.stop.is_set():
+            try:
+                with self.session.get(self.base_url + '/events', stream=True, timeout=(5, 60)) as response:
+                    for line in response.iter_lines(decode_unicode=True):
+                        if self.stop.is_set():
+                            return
+                        if line and line.startswith('event:'):
+                            self.events += 1
+                            if self.first_event_s is None:
+                                self.first_event_s = time.perf_counter() - start
+            except requests.RequestException:
+                if self.stop.is_set():
+                    return
+                self.recorder.add('GET /events (reconnect)', 0, error=True)
+                self.stop.wait(3 / self.speed)
+
+    def write(self):
+        if self.rng.random() < 0.5:
+            yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+            self.request('POST', '/telemetry', json={'user': f'User{self.index % 4 + 1}', 'date': yesterday,
+                                                     'metrics': {'sleep': '7', 'mood': str(self.rng.randint(1, 10))}})
+        else:
+            self.request('POST', '/log', json={'text': self.rng.choice(LOG_MESSAGES)})
+
+    def run(self):
+        # Stagger start-up so screens don't load in lockstep
+        if self.stop.wait(self.rng.uniform(0, 1)):
+            return
+        with ThreadPoolExecutor(max_workers=BROWSER_CONNECTIONS) as pool:
+            list(pool.map(lambda path: self.request('GET', path), self.pattern['initial']))
+        if self.pattern['events']:
+            threading.Thread(target=self.listen, name=f'{self.name}-events', daemon=True).start()
+
+        now = time.monotonic()
+        due = [(now + interval / self.speed, interval, path) for interval, path in self.pattern['timers']]
+        write_every = 60 / self.writes_per_min / self.speed if self.writes_per_min else None
+        next_write = now + self.rng.uniform(0, write_every) if write_every else None
+        while not self.stop.is_set():
+            next_due = min(d[0] for d in due) if due else float('inf')
+            if next_write is not None:
+                next_due = min(next_due, next_write)
+            if self.stop.wait(max(0, next_due - time.monotonic())):
+                return
+            now = time.monotonic()
+            for i, (at, interval, path) in enumerate(due):
+                if at <= now:
+                    self.request('GET', path)
+                    due[i] = (at + interval / self.speed, interval, path)
+            if next_write is not None and next_write <= now:
+                self.write()
+                next_write = now + self.rng.expovariate(1 / write_every)
+
+
+def spawn_server(args):
+    """Start bench.serve in a subprocess and wait until /ready says its caches
+    are warm"""
+    command = [sys.executable, '-m', 'bench.serve', '--port', str(args.port)]
+    if args.replay:
+        command += ['--replay', args.replay, '--latency-scale', str(args.latency_scale)]
+    if args.data_dir:
+        command += ['--data-dir', args.data_dir]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{args.port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'Server exited with {process.returncode}')
+        try:
+            if requests.get(base_url + '/ready', timeout=1).ok:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise SystemExit('Server was not ready within 60 s')
+
+
+class CPUSampler(threading.Thread):
+    """Samples the spawned server's CPU % (100 = one core) once a second"""
+
+    def __init__(self, pid, stop):
+        super().__init__(name='cpu-sampler', daemon=True)
+        import psutil
+        self.process = psutil.Process(pid)
+        self.stop = stop
+        self.samples = []
+        self.process.cpu_percent()
+
+    def run(self):
+        while not self.stop.wait(1):
+            try:
+                self.samples.append(self.process.cpu_percent())
+            except Exception:
+                return
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulate dashboard kiosks against one server')
+    parser.add_argument('--url', help='server to load (default: --spawn a local one)')
+    parser.add_argument('--spawn', action='store_true', help='start bench.serve in a subprocess')
+    parser.add_argument('--port', type=int, default=8099, help='port for --spawn')
+    parser.add_argument('--replay', metavar='DIR', help='cassettes for --spawn (default: stub upstreams)')
+    parser.add_argument('--latency-scale', type=float, default=1.0)
+    parser.add_argument('--data-dir', help='seeded data directory for --spawn (see bench.datagen)')
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--pattern', choices=sorted(PATTERNS), default='sse')
+    parser.add_argument('--duration', type=float, default=60, help='seconds')
+    parser.add_argument('--speed', type=float, default=1.0, help='timer speed-up (10 = 300 s timers fire every 30 s)')
+    parser.add_argument('--writes-per-min', type=float, default=0.5, help='check-in / log writes per client')
+    parser.add_argument('--output', help='write JSON results here (default: stdout)')
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        process, base_url = spawn_server(args)
+
+    stop = threading.Event()
+    recorder = Recorder()
+    session = requests.Session()
+    try:
+        before = scrape(session, base_url)
+        cpu = CPUSampler(process.pid, stop) if process else None
+        if cpu:
+            cpu.start()
+        kiosks = [Kiosk(i, base_url, args.pattern, recorder, stop, args.speed, args.writes_per_min)
+                  for i in range(args.clients)]
+        started = time.time()
+        for kiosk in kiosks:
+            kiosk.start()
+        stop.wait(args.duration)
+        stop.set()
+        for kiosk in kiosks:
+            kiosk.join(timeout=35)
+        elapsed = time.time() - started
+        after = scrape(session, base_url)
+    finally:
+        stop.set()
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+
+    endpoints = recorder.summary()
+    latencies = recorder.all_latencies()
+    client_requests = len(latencies)
+    report = {
+        'meta': {'taken': time.time(), 'url': base_url, 'args': vars(args), 'elapsed_s': round(elapsed, 1)},
+        'client': {
+            'requests': client_requests,
+            'rps': round(client_requests / elapsed, 2),
+            'errors': sum(e['errors'] for e in endpoints.values()),
+            'p50': round(percentile(latencies, 50), 2) if latencies else None,
+            'p95': round(percentile(latencies, 95), 2) if latencies else None,
+            'p99': round(percentile(latencies, 99), 2) if latencies else None,
+            'events_received': sum(k.events for k in kiosks),
+            'first_event_s': max((k.first_event_s for k in kiosks if k.first_event_s is not None), default=None),
+        },
+        'server': server_summary(before, after, client_requests) if before and after else None,
+        'endpoints': endpoints,
+    }
+    if cpu and cpu.samples:
+        report['server']['cpu_pct_mean'] = round(sum(cpu.samples) / len(cpu.samples), 1)
+        report['server']['cpu_pct_max'] = max(cpu.samples)
+
+    client, server = report['client'], report['server'] or {}
+    print(f"{args.clients} {args.pattern} clients for {elapsed:.0f} s: {client['requests']} requests "
+          f"({client['rps']}/s), {client['errors']} errors", file=sys.stderr)
+    print(f"client p50/p95/p99: {client['p50']} / {client['p95']} / {client['p99']} ms; "
+          f"server p95 <= {server.get('p95_ms_upper')} ms; cpu mean {server.get('cpu_pct_mean')}%", file=sys.stderr)
+    print(f"upstream calls per request: {server.get('upstream_calls_per_request')} "
+          f"({server.get('upstream_calls')} total)", file=sys.stderr)
+    for name, e in sorted(endpoints.items(), key=lambda item: -(item[1]['p95'] or 0))[:10]:
+        print(f"  {name:<45} n={e['n']:<6} p95={e['p95']} ms errors={e['errors']} {e['statuses']}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Benchmark Harness - latency percentiles and throughput for every route
+Runs the app in-process on a throwaway data directory with every upstream
+served by the local stub (bench/stubs.py), then times:
+  - each argument-free GET route, through the Flask test client
+  - get_weather, get_news, get_stocks and sources.fetch_all_articles
+For each it reports p50/p95/p99/mean latency in ms, requests per second with
+--concurrency threads, and upstream calls per operation. Results are written
+as JSON so two commits can be compared:
+
+    python -m bench.run --output before.json
+    python -m bench.run --output after.json --compare before.json
+
+--replay DIR answers upstreams from recorded cassettes (modules/cassette.py)
+instead of the stub, at their recorded latency times --latency-scale.
+"""
+
+import os
+import sys
+import math
+import json
+import time
+import argparse
+import platform
+import subprocess
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from . import env, stubs
+
+# Routes that never finish (SSE) or only make sense with a human driving them
+SKIP_ROUTES = {'/events', '/static/<path:filename>'}
+SKIP_PREFIXES = ('/debug/',)
+
+# A p95 this much slower than the baseline counts as a regression
+REGRESSION_RATIO = 1.2
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize(durations, wall=None, requests=None, upstream_calls=0):
+    """Latency summary (ms) of a list of durations in seconds"""
+    ms = [d * 1000 for d in durations]
+    result = {
+        'n': len(ms),
+        'p50': round(percentile(ms, 50), 3),
+        'p95': round(percentile(ms, 95), 3),
+        'p99': round(percentile(ms, 99), 3),
+        'mean': round(sum(ms) / len(ms), 3),
+        'max': round(max(ms), 3),
+        'upstream_calls_per_op': round(upstream_calls / len(ms), 2),
+    }
+    if wall:
+        result['rps'] = round(requests / wall, 1)
+    return result
+
+
+def measure(fn, iterations, concurrency, upstream_calls, warmup=2):
+    """Time fn() `iterations` times serially, then `iterations` more spread
+    over `concurrency` threads for throughput. upstream_calls() is the running
+    total of upstream requests."""
+    for _ in range(warmup):
+        fn()
+    before = upstream_calls()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    calls = upstream_calls() - before
+
+    def timed(_):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(iterations)))
+    wall = time.perf_counter() - start
+    return summarize(durations, wall, iterations, calls)
+
+
+def bench_routes(app, client, iterations, concurrency, upstream_calls, only=None):
+    results = {}
+    rules = sorted(app.url_map.iter_rules(), key=lambda r: r.rule)
+    for rule in rules:
+        if 'GET' not in rule.methods or rule.arguments or rule.rule in SKIP_ROUTES:
+            continue
+        if rule.rule.startswith(SKIP_PREFIXES) or (only and rule.rule not in only):
+            continue
+
+        def get(path=rule.rule):
+            response = client.get(path)
+            response.get_data()
+            response.close()
+            if response.status_code >= 500:
+                raise RuntimeError(f'{path}: HTTP {response.status_code}')
+
+        results[f'GET {rule.rule}'] = measure(get, iterations, concurrency, upstream_calls)
+    return results
+
+
+def bench_functions(iterations, concurrency, upstream_calls):
+    import sources
+    from modules import weather, news, stocks
+    functions = {
+        'get_weather': weather.get_weather,
+        'get_news': news.get_news,
+        'get_stocks': stocks.get_stocks,
+        'fetch_all_articles': sources.fetch_all_articles,
+    }
+    return {f'fn {name}': measure(fn, iterations, concurrency, upstream_calls) for name, fn in functions.items()}
+
+
+def warm():
+    """Run the refreshers and the startup warm-up once so routes see the state
+    they would in production (and /ready answers 200)"""
+    from modules import refresh, warmup
+    for job in ('sources', 'digest', 'stats-sampler'):
+        refresh.run_job(job)
+    warmup.run()
+
+
+@contextmanager
+def upstreams(latency=0.05, jitter=0.0, replay=None, latency_scale=1.0):
+    """Serve upstreams from the stub, or from cassettes in `replay`. Yields a
+    function returning the running total of upstream requests."""
+    if replay:
+        from modules import cassette
+        previous = cassette.cassettes
+        tape = cassette.use('replay', replay, latency_scale)
+        try:
+            yield lambda: tape.replayed + tape.misses
+        finally:
+            cassette.cassettes = previous
+        return
+    with stubs.StubUpstreams(latency=latency, jitter=jitter) as stub, stubs.redirect(stub):
+        yield stub.total_hits
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline, ratio=REGRESSION_RATIO):
+    """Names whose p95 regressed by more than `ratio` against the baseline"""
+    regressions = []
+    for name, current in results.items():
+        old = baseline.get(name)
+        if old and old['p95'] and current['p95'] / old['p95'] > ratio:
+            regressions.append((name, old['p95'], current['p95']))
+    return regressions
+
+
+def print_table(results, out=sys.stderr):
+    print(f"{'benchmark':<36}{'p50':>9}{'p95':>9}{'p99':>9}{'rps':>9}{'upstream':>10}", file=out)
+    for name, r in results.items():
+        print(f"{name:<36}{r['p50']:>9.2f}{r['p95']:>9.2f}{r['p99']:>9.2f}{r.get('rps', 0):>9.1f}"
+              f"{r['upstream_calls_per_op']:>10.2f}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark every route against stub upstreams')
+    parser.add_argument('--iterations', type=int, default=30, help='timed calls per benchmark')
+    parser.add_argument('--concurrency', type=int, default=4, help='threads for the throughput run')
+    parser.add_argument('--latency', type=float, default=50, help='stub upstream latency (ms)')
+    parser.add_argument('--jitter', type=float, default=0, help='extra random stub latency, up to (ms)')
+    parser.add_argument('--replay', metavar='DIR', help='replay upstreams from this cassette directory')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help='replayed latency multiplier')
+    parser.add_argument('--routes', nargs='*', help='only these routes (e.g. /weather /dashboard)')
+    parser.add_argument('--skip-functions', action='store_true', help='routes only')
+    parser.add_argument('--data-dir', help='seeded data directory to use (default: empty temp dir)')
+    parser.add_argument('--output', help='write JSON results here (default: stdout)')
+    parser.add_argument('--compare', help='baseline JSON; exit 1 if any p95 regressed')
+    args = parser.parse_args(argv)
+
+    import app as srcc
+    with upstreams(args.latency / 1000, args.jitter / 1000, args.replay, args.latency_scale) as upstream_calls, \
+            env.isolated(args.data_dir):
+        warm()
+        client = srcc.app.test_client()
+        results = bench_routes(srcc.app, client, args.iterations, args.concurrency, upstream_calls, args.routes)
+        if not args.skip_functions and not args.routes:
+            results.update(bench_functions(args.iterations, args.concurrency, upstream_calls))
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'taken': time.time(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'threads': threading.active_count(),
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    print_table(results)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline)
+        for name, old, new in regressions:
+            print(f'REGRESSION {name}: p95 {old:.2f} -> {new:.2f} ms', file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
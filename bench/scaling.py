@@ -0,0 +1,219 @@
+"""
+Scaling Benchmarks - latency and memory against data.json / life.json size
+Generates synthetic data (bench/datagen.py) at each point of two sweeps:
+days of history (check-ins, workouts, moods...) and number of chores. At each
+point it times the data-bound functions and routes, and measures their peak
+allocation with tracemalloc. For each benchmark it reports how fast cost grows
+with size as a log-log slope: ~1 is linear, and well above 1 is a cliff
+waiting to happen.
+
+    python -m bench.scaling --days 30 365 1095 3650 --chores 10 100 1000 --output scaling.json
+    python -m bench.scaling --plot plots/     # PNGs as well, if matplotlib is installed
+"""
+
+import os
+import sys
+import math
+import json
+import time
+import tempfile
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+
+from . import env, datagen, stubs
+from .run import percentile, git_revision
+
+# A log-log slope above this is reported as superlinear
+SUPERLINEAR_SLOPE = 1.3
+
+
+def benchmarks(srcc, client):
+    """name -> fn() for everything whose cost depends on the data size"""
+    from modules import life
+
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    data = srcc.load_data()
+    workouts = life.load_life_data()['fitness']['workouts']
+
+    def get(path):
+        def fn():
+            response = client.get(path)
+            response.get_data()
+            if response.status_code >= 400:
+                raise RuntimeError(f'{path}: HTTP {response.status_code}')
+        return fn
+
+    def post(path, body):
+        def fn():
+            response = client.post(path, json=body)
+            if response.status_code >= 400:
+                raise RuntimeError(f'{path}: HTTP {response.status_code}')
+        return fn
+
+    return {
+        'fn get_today_chores': lambda: srcc.get_today_chores(data),
+        'fn get_overdue_chores': lambda: srcc.get_overdue_chores(data),
+        'fn get_yesterday_checkin_status': srcc.get_yesterday_checkin_status,
+        'fn calculate_achievements': lambda: life.calculate_achievements(workouts),
+        'fn calculate_streak': lambda: life.calculate_streak(workouts),
+        'GET /chores': get('/chores'),
+        'GET /checkin_status': get('/checkin_status'),
+        'GET /life': get('/life'),
+        'GET /life/streaks': get('/life/streaks'),
+        'GET /dashboard?widgets=chores,life': get('/dashboard?widgets=chores,life'),
+        'POST /telemetry (upsert)': post('/telemetry', {'user': 'User1', 'date': yesterday,
+                                                        'metrics': {'sleep': '7', 'mood': '8'}}),
+        'POST /life/mood': post('/life/mood', {'mood': 7, 'notes': 'bench'}),
+    }
+
+
+def measure_point(srcc, iterations):
+    """Timings and peak allocation of every benchmark at the current data size"""
+    client = srcc.app.test_client()
+    results = {}
+    for name, fn in benchmarks(srcc, client).items():
+        fn()  # warm caches the way a running server would have them
+        durations = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fn()
+            durations.append((time.perf_counter() - start) * 1000)
+        # Traced separately: tracemalloc slows everything it watches
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        results[name] = {
+            'p50': round(percentile(durations, 50), 3),
+            'p95': round(percentile(durations, 95), 3),
+            'peak_kb': round(peak / 1024, 1),
+        }
+    return results
+
+
+def run_sweep(srcc, sweep, sizes, base, iterations, seed):
+    points = []
+    for size in sizes:
+        params = dict(base, **{sweep: size})
+        with tempfile.TemporaryDirectory(prefix='srcc-scaling-') as data_dir:
+            paths = datagen.write(data_dir, seed=seed, **params)
+            files = {key: round(os.path.getsize(paths[key]) / 1024, 1) for key in ('data', 'life')}
+            with env.isolated(data_dir):
+                results = measure_point(srcc, iterations)
+        points.append({'sweep': sweep, 'size': size, 'params': params, 'file_kb': files, 'results': results})
+        print(f"{sweep}={size}: data.json {files['data']} KB, life.json {files['life']} KB", file=sys.stderr)
+    return points
+
+
+def slope(points, name, metric):
+    """Log-log growth of metric between the smallest and largest point"""
+    first, last = points[0], points[-1]
+    a, b = first['results'][name][metric], last['results'][name][metric]
+    if len(points) < 2 or a <= 0 or b <= 0 or last['size'] == first['size']:
+        return None
+    return round(math.log(b / a) / math.log(last['size'] / first['size']), 2)
+
+
+def growth(points):
+    """name -> {'latency_slope', 'memory_slope', 'superlinear'} for one sweep"""
+    report = {}
+    for name in points[0]['results']:
+        latency, memory = slope(points, name, 'p50'), slope(points, name, 'peak_kb')
+        report[name] = {
+            'latency_slope': latency,
+            'memory_slope': memory,
+            'superlinear': any(s is not None and s > SUPERLINEAR_SLOPE for s in (latency, memory)),
+        }
+    return report
+
+
+def print_chart(sweep, points, out=sys.stderr, width=40):
+    """Text chart of p50 latency per benchmark across one sweep"""
+    print(f"\n== {sweep} ==", file=out)
+    for name in points[0]['results']:
+        values = [p['results'][name]['p50'] for p in points]
+        top = max(values) or 1
+        print(name, file=out)
+        for point, value in zip(points, values):
+            bar = '#' * max(1, round(value / top * width))
+            print(f"  {point['size']:>7} {value:>9.3f} ms {point['results'][name]['peak_kb']:>9.1f} KB  {bar}",
+                  file=out)
+
+
+def plot(sweeps, directory):
+    """One PNG per sweep: p50 latency and peak memory against size (log-log)"""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print('--plot needs matplotlib (pip install matplotlib); skipping plots', file=sys.stderr)
+        return
+    os.makedirs(directory, exist_ok=True)
+    for sweep, points in sweeps.items():
+        fig, (latency_ax, memory_ax) = plt.subplots(1, 2, figsize=(14, 6))
+        sizes = [p['size'] for p in points]
+        for name in points[0]['results']:
+            latency_ax.plot(sizes, [p['results'][name]['p50'] for p in points], marker='o', label=name)
+            memory_ax.plot(sizes, [p['results'][name]['peak_kb'] for p in points], marker='o', label=name)
+        for ax, label in ((latency_ax, 'p50 latency (ms)'), (memory_ax, 'peak allocation (KB)')):
+            ax.set_xscale('log')
+            ax.set_yscale('log')
+            ax.set_xlabel(sweep)
+            ax.set_ylabel(label)
+        latency_ax.legend(fontsize='small')
+        fig.tight_layout()
+        fig.savefig(os.path.join(directory, f'scaling-{sweep}.png'))
+        plt.close(fig)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Latency and memory of data-bound routes against data size')
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 365, 1095, 3650], help='history sweep')
+    parser.add_argument('--chores', type=int, nargs='+', default=[10, 100, 1000], help='chore count sweep')
+    parser.add_argument('--users', type=int, default=4)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write JSON results here (default: stdout)')
+    parser.add_argument('--plot', metavar='DIR', help='also write PNG charts here (needs matplotlib)')
+    args = parser.parse_args(argv)
+
+    import app as srcc
+    # Nothing here should reach an upstream, but the stub keeps it that way
+    with stubs.StubUpstreams(latency=0) as stub, stubs.redirect(stub):
+        sweeps = {
+            'days': run_sweep(srcc, 'days', args.days, {'users': args.users, 'chores': 20},
+                              args.iterations, args.seed),
+            'chores': run_sweep(srcc, 'chores', args.chores, {'users': args.users, 'days': 365},
+                                args.iterations, args.seed),
+        }
+
+    report = {
+        'meta': {'revision': git_revision(), 'taken': time.time(), 'args': vars(args)},
+        'sweeps': sweeps,
+        'growth': {sweep: growth(points) for sweep, points in sweeps.items()},
+    }
+    for sweep, points in sweeps.items():
+        print_chart(sweep, points)
+    for sweep, names in report['growth'].items():
+        for name, g in names.items():
+            if g['superlinear']:
+                print(f"SUPERLINEAR {sweep}: {name} (latency slope {g['latency_slope']}, "
+                      f"memory slope {g['memory_slope']})", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.plot:
+        plot(sweeps, args.plot)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Benchmark Server - run the real app (refreshers, threaded server) offline
+Same server stack as `python app.py`, but on a chosen port, optionally on a
+throwaway or seeded data directory, and with every upstream either replayed
+from cassettes or served by the local stub.
+
+    python -m bench.serve --port 8099 --replay data/cassettes
+    python -m bench.serve --port 8099 --stub-latency 50 --data-dir /tmp/srcc-data
+"""
+
+import sys
+import argparse
+from contextlib import ExitStack
+
+from . import env, stubs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the app against replayed or stub upstreams')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--replay', metavar='DIR', help='replay upstreams from this cassette directory')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help='replayed latency multiplier')
+    parser.add_argument('--stub-latency', type=float, default=50, help='stub upstream latency (ms) without --replay')
+    parser.add_argument('--data-dir', help='data directory (default: empty temp dir)')
+    args = parser.parse_args(argv)
+
+    import app as srcc
+    from modules import cassette, refresh, warmup
+
+    with ExitStack() as stack:
+        if args.replay:
+            cassette.use('replay', args.replay, args.latency_scale)
+        else:
+            stub = stack.enter_context(stubs.StubUpstreams(latency=args.stub_latency / 1000))
+            stack.enter_context(stubs.redirect(stub))
+        stack.enter_context(env.isolated(args.data_dir))
+        warmup.start(then=refresh.start_refreshers)
+        print(f'Serving on http://{args.host}:{args.port}', file=sys.stderr, flush=True)
+        srcc.app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Stub Upstreams - a local HTTP server standing in for every upstream
+Serves payloads in the shape Open-Meteo, Yahoo Finance, RSS/Atom feeds and
+the Hacker News API return, with a configurable latency, so routes and
+fetchers can be benchmarked without the internet. redirect() points
+modules.upstream at the stub: a request for https://<host>/<path> is sent to
+http://127.0.0.1:<port>/<host>/<path>. Feed items are dated "now" so the
+day-old article filters keep them.
+"""
+
+import json
+import time
+import random
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+
+ITEMS_PER_FEED = 20
+HN_STORIES = 30
+
+
+def weather_payload():
+    """Open-Meteo /v1/forecast with 48 hourly points from the start of today"""
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    hours = [start + timedelta(hours=i) for i in range(48)]
+    return {
+        'current': {'temperature_2m': 11.4, 'weather_code': 3, 'wind_speed_10m': 9.7},
+        'hourly': {
+            'time': [h.strftime('%Y-%m-%dT%H:%M') for h in hours],
+            'temperature_2m': [round(8 + 6 * ((i % 24) / 24), 1) for i in range(48)],
+            'weather_code': [(0, 1, 2, 3, 61)[i % 5] for i in range(48)],
+        },
+    }
+
+
+def chart_payload(symbol):
+    """Yahoo /v8/finance/chart/<symbol>"""
+    seed = int(hashlib.md5(symbol.encode()).hexdigest()[:6], 16)
+    price = 50 + seed % 400
+    return {'chart': {'result': [{'meta': {
+        'symbol': symbol,
+        'shortName': f'{symbol} Corporation',
+        'regularMarketPrice': price + 1.25,
+        'chartPreviousClose': price,
+    }}], 'error': None}}
+
+
+def _headlines(host, count=ITEMS_PER_FEED):
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        yield {
+            'title': f'{host} story {i}: council approves plan for new regional transit line',
+            'link': f'https://{host}/story/{i}',
+            'summary': f'Summary of story {i} from {host}. ' * 4,
+            'published': now - timedelta(minutes=7 * i),
+        }
+
+
+def rss_feed(host):
+    items = ''.join(
+        f"<item><title><![CDATA[{h['title']}]]></title><link>{h['link']}</link>"
+        f"<pubDate>{format_datetime(h['published'])}</pubDate>"
+        f"<description><![CDATA[{h['summary']}]]></description></item>"
+        for h in _headlines(host))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{host}</title>{items}</channel></rss>'
+
+
+def atom_feed(host):
+    entries = ''.join(
+        f"<entry><title>{h['title']}</title><link href=\"{h['link']}\"/>"
+        f"<published>{h['published'].isoformat()}</published></entry>"
+        for h in _headlines(host))
+    return f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>{host}</title>{entries}</feed>'
+
+
+def hn_payload(path):
+    if path.endswith('topstories.json'):
+        return list(range(1000, 1000 + HN_STORIES))
+    story_id = int(path.rsplit('/', 1)[-1].split('.')[0])
+    return {'id': story_id, 'title': f'Show HN: project number {story_id}', 'score': story_id % 500,
+            'descendants': story_id % 90, 'url': f'https://example.com/hn/{story_id}'}
+
+
+def respond(host, path, query):
+    """(content type, body) for a request originally meant for host/path"""
+    if 'open-meteo' in host:
+        return 'application/json', json.dumps(weather_payload())
+    if 'finance.yahoo' in host:
+        return 'application/json', json.dumps(chart_payload(path.rsplit('/', 1)[-1]))
+    if 'hacker-news' in host:
+        return 'application/json', json.dumps(hn_payload(path))
+    # Every other host is a news feed; a few are Atom to cover both parsers
+    if int(hashlib.md5(host.encode()).hexdigest(), 16) % 4 == 0:
+        return 'application/atom+xml', atom_feed(host)
+    return 'application/rss+xml', rss_feed(host)
+
+
+class StubUpstreams:
+    """Threaded stub server. Each response is delayed by latency (seconds)
+    plus up to `jitter` seconds; `hits` counts requests per original host."""
+
+    def __init__(self, latency=0.05, jitter=0.0, port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.hits = {}
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                host, _, path = parts.path.lstrip('/').partition('/')
+                with stub.lock:
+                    stub.hits[host] = stub.hits.get(host, 0) + 1
+                delay = stub.latency + random.uniform(0, stub.jitter)
+                if delay:
+                    time.sleep(delay)
+                content_type, body = respond(host, '/' + path, parse_qs(parts.query))
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def rewrite(self, url):
+        """The stub URL for an upstream URL"""
+        parts = urlsplit(url)
+        query = f'?{parts.query}' if parts.query else ''
+        return f'{self.base_url}/{parts.netloc}{parts.path}{query}'
+
+    def total_hits(self):
+        with self.lock:
+            return sum(self.hits.values())
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name='stub-upstreams', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+@contextmanager
+def redirect(stub):
+    """Send every upstream.get() to the stub. The circuit breakers still see
+    the original host, so per-host behaviour is unchanged."""
+    real_get = requests.get
+
+    def stub_get(url, **kwargs):
+        return real_get(stub.rewrite(url), **kwargs)
+
+    with patch('modules.upstream.requests.get', side_effect=stub_get):
+        yield
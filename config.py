@@ -72,6 +72,103 @@ REFRESH_INTERVAL_STATS = 3000
 REFRESH_INTERVAL_WEATHER = 300000  # 5 minutes
 REFRESH_INTERVAL_NEWS = 300000     # 5 minutes
 REFRESH_INTERVAL_STOCKS = 60000    # 1 minute
+DIGEST_REFRESH_INTERVAL = 1800000  # 30 minutes - rebuild /digest from the article pool
+
+# System stats sampler (/stats, /stats/history)
+STATS_SAMPLE_INTERVAL = 2000       # 2 seconds
+STATS_HISTORY_SECONDS = 3600       # ring buffers hold the last hour
+
+# HTTP caching - Cache-Control max-age per endpoint (milliseconds), from the
+# refresh intervals above. Versioned routes not listed here get no-cache and
+# are revalidated with their ETag.
+CACHE_MAX_AGE = {
+    'stats': REFRESH_INTERVAL_STATS,
+    'weather': REFRESH_INTERVAL_WEATHER,
+    'stocks': REFRESH_INTERVAL_STOCKS,
+    'news': REFRESH_INTERVAL_NEWS,
+}
+GZIP_MIN_SIZE = 1024        # bytes - smaller JSON bodies aren't worth compressing
+GZIP_CACHE_ENTRIES = 32     # compressed bodies kept, one per ETag
+
+# Adaptive news source polling (milliseconds) - each source's interval moves
+# between these bounds based on how often it actually publishes
+SOURCE_POLL_MIN_INTERVAL = 300000      # 5 minutes
+SOURCE_POLL_MAX_INTERVAL = 21600000    # 6 hours
+SOURCE_POLL_DEFAULT_INTERVAL = 1800000 # 30 minutes until a rate is observed
+SOURCE_SCHEDULER_TICK = 60000          # how often the scheduler checks for due sources
+
+# /events push channel - idle streams get a heartbeat comment this often, and
+# this many recent events are kept so a reconnecting screen can catch up
+EVENTS_HEARTBEAT = 15000  # 15 seconds
+EVENTS_BACKLOG = 100
+
+# ?since=<version> deltas - how many recent versions of each widget source
+# are remembered; older versions get the full payload
+DELTA_HISTORY = 50
+
+# Upstream circuit breakers - after this many consecutive failures a host is
+# skipped (last good data is served as stale) until the reset timeout passes
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_RESET_TIMEOUT = 60000  # 1 minute
+
+# Upstream record/replay (modules/cassette.py) - 'live', 'record' (live, and
+# save every response to data/cassettes/) or 'replay' (answer only from the
+# cassettes). SRCC_UPSTREAM_MODE in the environment overrides this.
+UPSTREAM_MODE = 'live'
+CASSETTE_LATENCY_SCALE = 1.0  # replay delay as a multiple of the recorded latency; 0 = instant
+CASSETTE_KEEP = 5             # recordings replayed per URL (newest), in rotation
+
+# Request latency budgets (milliseconds). Routes that wait on upstreams return
+# what they have by then (marked partial) and finish the work in the background
+REQUEST_BUDGET = 300
+REQUEST_BUDGETS = {
+    # endpoint name -> budget; 0 disables the deadline for that endpoint
+}
+
+# Admission control (modules/admission.py) for write and expensive routes, by
+# endpoint name. 'client' and 'route' are token buckets (requests per minute,
+# burst) per client address and for the route as a whole; 'concurrency' caps
+# how many run at once; 'methods' limits the rules to those methods. Requests
+# over a bucket get 429; over the concurrency limit they queue, unless the
+# expected wait exceeds ADMISSION_QUEUE_SLO (milliseconds), then 429 too.
+# Limits apply per worker process.
+ADMISSION_LIMITS = {
+    'log_activity': {'client': (60, 20), 'route': (120, 30), 'concurrency': 2},  # POST /log
+    'digest_cache': {'methods': ('POST',), 'client': (6, 3), 'route': (12, 4), 'concurrency': 1},
+    'digest': {'client': (120, 30), 'route': (600, 60), 'concurrency': 4},
+}
+ADMISSION_QUEUE_SLO = 500
+
+# Startup warm-up (modules/warmup.py) - /ready answers 200 once every cache
+# has been filled, or after this long even if some upstream is still slow
+WARMUP_TIMEOUT = 30000  # 30 seconds
+
+# Supervisor (modules/supervisor.py) - worker processes serving the port
+# (about 50 MB of RAM each). A new worker generation has this long
+# to warm up and report ready before it is abandoned; the old generation then
+# has this long to finish its in-flight requests
+SERVER_WORKERS = 3
+SUPERVISOR_READY_TIMEOUT = 60000  # 1 minute
+SUPERVISOR_DRAIN_TIMEOUT = 10000  # 10 seconds
+
+# Request profiling - when on, requests with ?__profile=1 or an X-Profile: 1
+# header run under cProfile and are saved to data/profiles/ (the newest
+# PROFILE_KEEP are kept), browsable at /debug/profiles. Off: zero overhead.
+PROFILING = False
+PROFILE_KEEP = 20
+
+# Memory diagnostics (/debug/memory). Tracing runs tracemalloc, which costs
+# memory and CPU, so it is off by default. The soft limit is checked against
+# RSS and evicts rebuildable caches when exceeded; 0 disables it.
+MEMORY_TRACING = False
+MEMORY_TRACE_FRAMES = 1
+MEMORY_SNAPSHOT_INTERVAL = 300000  # 5 minutes
+MEMORY_SOFT_LIMIT_MB = 300         # the Pi has 1 GB shared with everything else
+MEMORY_CHECK_INTERVAL = 30000      # 30 seconds
+
+# Article archive retention (/news/search) - whichever limit is hit first
+ARCHIVE_RETENTION_DAYS = 30
+ARCHIVE_MAX_MB = 10
 
 # Default chores (used if data.json has none)
 # schedule: daily, weekly, monthly, yearly, onetime
@@ -85,10 +182,13 @@ DEFAULT_CHORES = [
 ]
 
 # Feature flags - enable/disable dashboard sections
-# Set to False to hide that section from the dashboard
+# Set to False to hide that section from the dashboard. A disabled widget's
+# module isn't imported and its routes and refreshers aren't registered
+# (modules/features.py; /debug/startup shows what each one costs)
 FEATURES = {
     "weather": True,
     "stocks": True,
+    "news": True,  # /news headlines from NEWS_FEEDS
     "life": True,  # Personal metrics (fitness, mood, learning, social)
     "journal": True,
     "chores": True,
@@ -6,18 +6,44 @@ cd ~/dev/srcc || exit 1
 echo "Pulling latest from GitHub..."
 git pull origin master || { echo "Git pull failed"; exit 1; }
 
+# A running supervisor swaps in a new worker generation on the same socket;
+# the old one keeps serving until the new one is warm, so screens never go dark
+if pgrep -f "modules.supervisor" > /dev/null; then
+    echo "Reloading workers..."
+    if sudo python3 -m modules.supervisor reload; then
+        echo "Server reloaded successfully!"
+        curl -s localhost/ready
+        echo
+        exit 0
+    fi
+    echo "Reload failed; the previous generation is still serving. Check app.log"
+    tail -20 app.log
+    exit 1
+fi
+
 echo "Killing existing server..."
 sudo pkill -f "python3.*app.py" 2>/dev/null
 sleep 2
 
 echo "Starting server..."
-nohup sudo python3 app.py > app.log 2>&1 &
-sleep 3
+nohup sudo python3 -m modules.supervisor > app.log 2>&1 &
 
-if pgrep -f "python3.*app.py" > /dev/null; then
-    echo "Server started successfully!"
-    curl -s localhost/weather | head -5
-else
-    echo "Server failed to start. Check app.log"
-    cat app.log
-fi
+# /ready answers 200 once the caches are warm (at most WARMUP_TIMEOUT, 30 s)
+echo "Waiting for the server to warm up..."
+for i in $(seq 1 60); do
+    if curl -sf localhost/ready > /dev/null; then
+        echo "Server started successfully!"
+        curl -s localhost/ready
+        echo
+        exit 0
+    fi
+    if ! pgrep -f "modules.supervisor" > /dev/null; then
+        break
+    fi
+    sleep 1
+done
+
+echo "Server failed to become ready. Check app.log"
+curl -s localhost/ready
+cat app.log
+exit 1
@@ -1,8 +1,30 @@
 """
 SRCC Modules - Plugin-style architecture for Stone Ranch Command Center
 Each module is self-contained with its own data handling and routes.
+Feature modules are imported only when config.FEATURES enables them
+(modules/features.py), so the names below are resolved on first use.
 """
 
-from .life import register_routes as register_life_routes, load_life_data, save_life_data
+import importlib
 
-__all__ = ['register_life_routes', 'load_life_data', 'save_life_data']
+# name -> (module, attribute)
+_EXPORTS = {
+    'register_life_routes': ('life', 'register_routes'),
+    'load_life_data': ('life', 'load_life_data'),
+    'save_life_data': ('life', 'save_life_data'),
+    'update_life_data': ('life', 'update_life_data'),
+    'init_life_data': ('life', 'init_life_data'),
+    'register_digest_routes': ('digest', 'register_routes'),
+    'register_team_routes': ('teams', 'register_routes'),
+    'register_archive_routes': ('archive', 'register_routes'),
+    'start_refreshers': ('refresh', 'start_refreshers'),
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attribute = _EXPORTS[name]
+    return getattr(importlib.import_module(f'.{module}', __name__), attribute)
@@ -0,0 +1,220 @@
+"""
+Admission Control - token buckets and concurrency limits for costly routes
+The write and expensive routes in config.ADMISSION_LIMITS (/log,
+/digest-cache POSTs, /digest) each get a token bucket per client and one for
+the route as a whole; a request that finds either empty is answered 429 with
+Retry-After before the view runs. Routes with a concurrency limit let that
+many requests run at once and queue the rest, unless the queue is already
+long enough that the expected wait (queue length x recent service time)
+would exceed ADMISSION_QUEUE_SLO, in which case the request gets a 429
+straight away instead of piling onto the Pi.
+
+Limits apply per worker process. Outcomes, queue waits, and requests in
+flight or queued are exported at /metrics and summarized at
+/admission/status.
+"""
+
+import math
+import time
+import threading
+from collections import OrderedDict
+from flask import jsonify, request
+
+from config import ADMISSION_LIMITS, ADMISSION_QUEUE_SLO
+from . import metrics
+
+# Per-client buckets kept per route; the least recently seen go first
+MAX_CLIENTS = 256
+
+# Weight of the newest request in a gate's average service time
+SERVICE_SMOOTHING = 0.2
+
+ADMITTED = 'admitted'
+CLIENT_LIMITED = 'client_limited'
+ROUTE_LIMITED = 'route_limited'
+SHED = 'shed'
+
+admission_requests = metrics.Counter('srcc_admission_requests_total',
+                                     'Requests to admission-controlled routes by endpoint and outcome',
+                                     ('endpoint', 'result'))
+queue_wait = metrics.Histogram('srcc_admission_queue_wait_seconds',
+                               'Time admitted requests waited for a concurrency slot', ('endpoint',))
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+
+    def take(self, now=None):
+        """Take a token; 0 if one was available, else seconds until there is one"""
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class Gate:
+    """At most `limit` requests at a time. Others wait for a slot while the
+    expected wait fits within `slo` seconds and are turned away otherwise."""
+
+    def __init__(self, limit, slo):
+        self.limit = limit
+        self.slo = slo
+        self.cond = threading.Condition()
+        self.active = 0
+        self.queued = 0
+        self.service = None  # recent seconds per request
+
+    def expected_wait(self):
+        """Seconds a request arriving now would wait for a slot"""
+        if self.active < self.limit:
+            return 0
+        return (self.queued + 1) / self.limit * (self.service or 0)
+
+    def enter(self):
+        """(admitted, seconds waited)"""
+        with self.cond:
+            if self.expected_wait() > self.slo:
+                return False, 0
+            start = time.monotonic()
+            self.queued += 1
+            try:
+                admitted = self.cond.wait_for(lambda: self.active < self.limit, self.slo)
+            finally:
+                self.queued -= 1
+            if admitted:
+                self.active += 1
+            return admitted, time.monotonic() - start
+
+    def leave(self, seconds):
+        with self.cond:
+            self.active -= 1
+            self.service = seconds if self.service is None else \
+                (1 - SERVICE_SMOOTHING) * self.service + SERVICE_SMOOTHING * seconds
+            self.cond.notify()
+
+
+class Policy:
+    """Admission rules for one endpoint. `client` and `route` are (requests
+    per minute, burst); `concurrency` caps requests running at once."""
+
+    def __init__(self, endpoint, methods=None, client=None, route=None, concurrency=None,
+                 slo=ADMISSION_QUEUE_SLO / 1000):
+        self.endpoint = endpoint
+        self.methods = set(methods) if methods else None
+        self.client = client
+        self.route = TokenBucket(route[0] / 60, route[1]) if route else None
+        self.gate = Gate(concurrency, slo) if concurrency else None
+        self.clients = OrderedDict()  # client -> TokenBucket
+        self.lock = threading.Lock()
+
+    def applies(self, method):
+        return self.methods is None or method in self.methods
+
+    def _client_bucket(self, client):
+        bucket = self.clients.get(client)
+        if bucket is None:
+            bucket = self.clients[client] = TokenBucket(self.client[0] / 60, self.client[1])
+            if len(self.clients) > MAX_CLIENTS:
+                self.clients.popitem(last=False)
+        else:
+            self.clients.move_to_end(client)
+        return bucket
+
+    def check_rate(self, client):
+        """(result, retry after seconds) from the token buckets"""
+        with self.lock:
+            if self.client:
+                wait = self._client_bucket(client).take()
+                if wait:
+                    return CLIENT_LIMITED, wait
+            if self.route:
+                wait = self.route.take()
+                if wait:
+                    return ROUTE_LIMITED, wait
+        return ADMITTED, 0
+
+    def get_status(self):
+        status = {'clients': len(self.clients)}
+        if self.gate:
+            status.update(active=self.gate.active, queued=self.gate.queued, limit=self.gate.limit,
+                          service_ms=round(self.gate.service * 1000, 1) if self.gate.service else None)
+        return status
+
+
+_policies = {endpoint: Policy(endpoint, **limits) for endpoint, limits in ADMISSION_LIMITS.items()}
+
+metrics.Gauge('srcc_admission_in_flight', 'Requests running on concurrency-limited routes',
+              lambda: sum(p.gate.active for p in _policies.values() if p.gate))
+metrics.Gauge('srcc_admission_queued', 'Requests waiting for a slot on concurrency-limited routes',
+              lambda: sum(p.gate.queued for p in _policies.values() if p.gate))
+
+
+def _reject(result, retry_after):
+    response = jsonify({'error': 'Too many requests', 'reason': result, 'retry_after': retry_after})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+def admit(policy, client):
+    """Apply policy to a request from client: None if admitted (it then holds
+    a concurrency slot until release()), else the 429 response"""
+    result, wait = policy.check_rate(client)
+    if result == ADMITTED and policy.gate:
+        admitted, waited = policy.gate.enter()
+        if admitted:
+            queue_wait.observe(waited, endpoint=policy.endpoint)
+        else:
+            result, wait = SHED, policy.gate.expected_wait() or policy.gate.slo
+    admission_requests.inc(endpoint=policy.endpoint, result=result)
+    if result != ADMITTED:
+        return _reject(result, max(1, math.ceil(wait)))
+    return None
+
+
+def get_status():
+    """Per-endpoint limits in use and how often each outcome happened"""
+    with admission_requests.lock:
+        counts = dict(admission_requests.values)
+    status = {}
+    for endpoint, policy in _policies.items():
+        entry = policy.get_status()
+        entry['results'] = {result: count for (name, result), count in counts.items() if name == endpoint}
+        status[endpoint] = entry
+    return status
+
+
+def register(app):
+    """Apply ADMISSION_LIMITS to matching requests, and /admission/status"""
+
+    @app.before_request
+    def admit_request():
+        policy = _policies.get(request.endpoint)
+        if policy is None or not policy.applies(request.method):
+            return None
+        rejected = admit(policy, request.remote_addr or 'unknown')
+        if rejected is None and policy.gate:
+            request.environ['srcc.admission'] = (policy, time.monotonic())
+        return rejected
+
+    @app.teardown_request
+    def release_slot(exc=None):
+        held = request.environ.pop('srcc.admission', None)
+        if held is not None:
+            policy, start = held
+            policy.gate.leave(time.monotonic() - start)
+
+    @app.route('/admission/status')
+    def admission_status():
+        """Admission limits, queue state and outcome counts per endpoint"""
+        return jsonify(get_status())
@@ -0,0 +1,303 @@
+"""
+Article Archive - rolling store of every article the pipeline has seen
+Fed by sources.fetch_all_articles(). Articles are appended to a JSON-lines
+file and indexed incrementally in an in-memory inverted index so
+/news/search stays fast as the archive grows. Retention is bounded by age
+and by size, which also bounds memory use on the Pi.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import heapq
+import threading
+from flask import jsonify, request
+
+from config import ARCHIVE_RETENTION_DAYS, ARCHIVE_MAX_MB
+from .dedupe import STOPWORDS
+from . import memory, refresh, warmup
+
+# File paths
+ARCHIVE_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'articles_archive.jsonl')
+
+# BM25 parameters; title words count TITLE_WEIGHT times towards term frequency
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_WEIGHT = 3
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def tokenize(text):
+    """Lowercase search tokens, without stopwords"""
+    return [w for w in _WORD_RE.findall(_TAG_RE.sub(' ', text or '').lower()) if len(w) > 1 and w not in STOPWORDS]
+
+
+def _term_frequencies(doc):
+    tf = {}
+    for token in tokenize(doc.get('title', '')):
+        tf[token] = tf.get(token, 0) + TITLE_WEIGHT
+    for token in tokenize(doc.get('summary', '')):
+        tf[token] = tf.get(token, 0) + 1
+    return tf
+
+
+class ArticleArchive:
+    """Append-only article archive with an incremental inverted index"""
+
+    def __init__(self, path, retention_days=ARCHIVE_RETENTION_DAYS, max_bytes=ARCHIVE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.retention_seconds = retention_days * 86400
+        self.max_bytes = max_bytes
+        self.lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.loaded = False
+        self.synced = None      # (mtime, size) of the file as last read or written
+        self.docs = {}          # doc id -> article record, in archive order
+        self.by_link = {}       # link -> doc id
+        self.index = {}         # token -> {doc id: term frequency}
+        self.doc_lengths = {}   # doc id -> weighted token count
+        self.total_length = 0
+        self.live_bytes = 0     # bytes of live records in the file
+        self.dead_bytes = 0     # bytes of evicted records still in the file
+        self.next_id = 0
+
+    # Index maintenance
+
+    def _index_doc(self, doc):
+        doc_id = doc['id']
+        tf = _term_frequencies(doc)
+        for token, count in tf.items():
+            self.index.setdefault(token, {})[doc_id] = count
+        length = sum(tf.values())
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+        self.docs[doc_id] = doc
+        self.by_link[doc['link']] = doc_id
+        self.live_bytes += doc['_bytes']
+        self.next_id = max(self.next_id, doc_id + 1)
+
+    def _unindex_doc(self, doc_id):
+        doc = self.docs.pop(doc_id)
+        for token in _term_frequencies(doc):
+            postings = self.index.get(token)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.index[token]
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+        self.by_link.pop(doc['link'], None)
+        self.live_bytes -= doc['_bytes']
+        self.dead_bytes += doc['_bytes']
+
+    # Persistence
+
+    def _file_state(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """Load the archive file into memory (once), dropping expired records.
+        Reloads if another worker process has written to the file since."""
+        with self.lock:
+            if self.loaded:
+                if self._file_state() == self.synced:
+                    return
+                self._reset()
+            self.loaded = True
+            if not os.path.exists(self.path):
+                return
+            cutoff = time.time() - self.retention_seconds
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        doc = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    doc['_bytes'] = len(line.encode('utf-8'))
+                    if doc.get('archived_at', 0) < cutoff or doc.get('link') in self.by_link:
+                        self.dead_bytes += doc['_bytes']
+                        continue
+                    self._index_doc(doc)
+            # Only the primary worker rewrites the file (it's the one appending)
+            self._enforce_retention(compact=refresh.is_primary())
+            self.synced = self._file_state()
+
+    def _compact(self):
+        """Rewrite the file with only live records"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            for doc in self.docs.values():
+                f.write(self._serialize(doc))
+        os.replace(tmp_path, self.path)
+        self.dead_bytes = 0
+
+    @staticmethod
+    def _serialize(doc):
+        return json.dumps({k: v for k, v in doc.items() if k != '_bytes'}) + '\n'
+
+    def _enforce_retention(self, compact=True):
+        cutoff = time.time() - self.retention_seconds
+        # docs is insertion-ordered, so the oldest records come first
+        for doc_id in list(self.docs):
+            doc = self.docs[doc_id]
+            if doc['archived_at'] >= cutoff and self.live_bytes <= self.max_bytes:
+                break
+            self._unindex_doc(doc_id)
+        # Rewrite once evicted records make up a quarter of the file
+        if compact and self.dead_bytes and self.dead_bytes > (self.live_bytes + self.dead_bytes) / 4:
+            self._compact()
+
+    # Public API
+
+    def add_articles(self, articles):
+        """Archive articles not seen before. Returns the number added."""
+        self.load()
+        added = 0
+        now = time.time()
+        with self.lock:
+            lines = []
+            for article in articles:
+                link = article.get('link')
+                if not link or link == '#' or link in self.by_link:
+                    continue
+                doc = {
+                    'id': self.next_id,
+                    'title': article.get('title', ''),
+                    'link': link,
+                    'source': article.get('source', ''),
+                    'category': article.get('category', ''),
+                    'summary': article.get('summary', ''),
+                    'published': article.get('published', ''),
+                    'archived_at': now,
+                }
+                line = self._serialize(doc)
+                doc['_bytes'] = len(line.encode('utf-8'))
+                self._index_doc(doc)
+                lines.append(line)
+                added += 1
+
+            if lines:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, 'a') as f:
+                    f.writelines(lines)
+                self._enforce_retention()
+                self.synced = self._file_state()
+        return added
+
+    def search(self, query, limit=20):
+        """BM25-ranked search over titles and summaries. Documents matching every
+        query term are preferred; if there are none, any-term matches are ranked."""
+        self.load()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self.lock:
+            postings = [self.index.get(t, {}) for t in terms]
+            n_docs = len(self.docs)
+            if not n_docs:
+                return []
+
+            # Intersect starting from the rarest term
+            ordered = sorted(postings, key=len)
+            candidates = set(ordered[0])
+            for p in ordered[1:]:
+                if not candidates:
+                    break
+                candidates &= p.keys()
+            if not candidates:
+                candidates = set().union(*postings)
+
+            avg_length = self.total_length / n_docs
+            idfs = [math.log(1 + (n_docs - len(p) + 0.5) / (len(p) + 0.5)) for p in postings]
+
+            def score(doc_id):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / avg_length)
+                total = 0.0
+                for p, idf in zip(postings, idfs):
+                    tf = p.get(doc_id)
+                    if tf:
+                        total += idf * tf * (BM25_K1 + 1) / (tf + norm)
+                # Newer articles win ties
+                return total, doc_id
+
+            top = heapq.nlargest(limit, candidates, key=score)
+            results = []
+            for doc_id in top:
+                doc = {k: v for k, v in self.docs[doc_id].items() if k != '_bytes'}
+                doc['score'] = round(score(doc_id)[0], 3)
+                results.append(doc)
+            return results
+
+    def unload(self):
+        """Drop the in-memory index; the next search or add reloads the file"""
+        with self.lock:
+            self._reset()
+
+    def stats(self):
+        """Archive size summary"""
+        self.load()
+        with self.lock:
+            return {
+                'articles': len(self.docs),
+                'terms': len(self.index),
+                'bytes': self.live_bytes,
+                'max_bytes': self.max_bytes,
+                'retention_days': self.retention_seconds / 86400,
+            }
+
+
+archive = ArticleArchive(ARCHIVE_FILE)
+
+
+def archive_articles(articles):
+    """Article pipeline hook - archive freshly fetched articles"""
+    archive.add_articles(articles)
+
+
+def register_routes(app):
+    """Register archive search routes and hook the archive into the article pipeline"""
+    # Imported here so importing the module doesn't pull in the fetch engine
+    from sources import register_article_hook
+    register_article_hook(archive_articles)
+    # The index is the largest cache and the slowest to rebuild, so it goes last
+    memory.register_cache('archive', lambda: {'entries': len(archive.docs), 'terms': len(archive.index),
+                                              'bytes': archive.live_bytes},
+                          archive.unload, priority=90)
+    # Read and index the archive file at startup rather than on the first search
+    warmup.task('archive', archive.stats)
+
+    @app.route('/news/search')
+    def news_search():
+        """Ranked full-text search over archived articles"""
+        query = request.args.get('q', '').strip()
+        try:
+            limit = max(1, min(100, int(request.args.get('limit', 20))))
+        except ValueError:
+            limit = 20
+        if not query:
+            return jsonify({'error': 'Missing query parameter q'}), 400
+
+        start = time.perf_counter()
+        results = archive.search(query, limit)
+        return jsonify({
+            'query': query,
+            'results': results,
+            'count': len(results),
+            'took_ms': round((time.perf_counter() - start) * 1000, 2),
+        })
+
+    @app.route('/news/archive')
+    def news_archive():
+        """Archive size and retention"""
+        return jsonify(archive.stats())
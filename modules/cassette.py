@@ -0,0 +1,203 @@
+"""
+Cassettes - record and replay every upstream HTTP call
+upstream.get() fetches through fetch(). In 'live' mode (the default) that is
+plain requests.get(). In 'record' mode every response is also appended to a
+per-host cassette (one JSON line per call: status, headers, timing, and the
+body zlib-compressed). Failed calls are recorded too, and every so often a
+cassette is compacted to the newest CASSETTE_KEEP recordings per URL. In 'replay' mode nothing
+leaves the machine: each URL is answered from its recordings in turn, after
+the recorded latency times CASSETTE_LATENCY_SCALE (0 = instant), and
+unrecorded URLs fail like an unreachable host. With that the whole dashboard
+runs, and can be load-tested, on an air-gapped machine.
+
+The mode comes from config.UPSTREAM_MODE, or SRCC_UPSTREAM_MODE in the
+environment so a one-off run needs no config edit:
+
+    SRCC_UPSTREAM_MODE=record python app.py    # browse a while, then
+    SRCC_UPSTREAM_MODE=replay python app.py
+"""
+
+import os
+import json
+import time
+import zlib
+import base64
+import threading
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from config import UPSTREAM_MODE, CASSETTE_LATENCY_SCALE, CASSETTE_KEEP
+
+CASSETTE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'cassettes')
+MODES = ('live', 'record', 'replay')
+
+# A host file is rewritten with only the newest CASSETTE_KEEP recordings per
+# URL after this many appends, so a long recording session stays bounded
+COMPACT_EVERY = 50
+
+# Headers worth keeping; the rest (cookies, CDN ids, dates) only add noise
+KEPT_HEADERS = {'content-type', 'content-encoding', 'etag', 'last-modified', 'cache-control', 'retry-after'}
+
+
+class NoRecording(requests.exceptions.ConnectionError):
+    """Replay mode was asked for a URL that was never recorded"""
+
+
+def _key(url):
+    """Recordings are matched on the URL with its query parameters sorted"""
+    parts = urlsplit(url)
+    query = '&'.join(sorted(parts.query.split('&'))) if parts.query else ''
+    return f'{parts.netloc}{parts.path}?{query}'
+
+
+def _host_file(directory, url):
+    host = urlsplit(url).netloc.replace(':', '_') or 'unknown'
+    return os.path.join(directory, f'{host}.jsonl')
+
+
+class Cassettes:
+    """Recordings for every host under one directory"""
+
+    def __init__(self, mode=UPSTREAM_MODE, directory=CASSETTE_DIR, latency_scale=CASSETTE_LATENCY_SCALE,
+                 keep=CASSETTE_KEEP):
+        if mode not in MODES:
+            raise ValueError(f'Unknown upstream mode {mode!r}; expected one of {MODES}')
+        self.mode = mode
+        self.directory = directory
+        self.latency_scale = latency_scale
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.loaded = {}   # host file -> {key: [recording, ...]}
+        self.cursor = {}   # key -> index of the next recording to replay
+        self.appends = {}  # host file -> appends since it was last compacted
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+    # Recording
+
+    def record(self, url, started, resp=None, error=None):
+        entry = {'key': _key(url), 'url': url, 'at': time.time(),
+                 'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)}
+        if error is not None:
+            entry['error'] = type(error).__name__
+            entry['message'] = str(error)[:200]
+        else:
+            entry['status'] = resp.status_code
+            entry['headers'] = {k: v for k, v in resp.headers.items() if k.lower() in KEPT_HEADERS}
+            entry['headers'].pop('Content-Encoding', None)  # requests has already decoded the body
+            entry['body'] = base64.b64encode(zlib.compress(resp.content, 6)).decode('ascii')
+        path = _host_file(self.directory, url)
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, 'a') as f:
+                f.write(line)
+            self.recorded += 1
+            self.loaded.pop(path, None)
+            self.appends[path] = self.appends.get(path, 0) + 1
+            if self.appends[path] >= COMPACT_EVERY:
+                self._compact(path)
+
+    def _compact(self, path):
+        """Rewrite a host file with only what _load() would replay (caller holds the lock)"""
+        entries = sorted((e for kept in self._load(path).values() for e in kept), key=lambda e: e['at'])
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w') as f:
+            f.writelines(json.dumps(entry, separators=(',', ':')) + '\n' for entry in entries)
+        os.replace(tmp, path)
+        self.appends[path] = 0
+
+    # Replay
+
+    def _load(self, path):
+        """{key: [recording, ...]} for one host file, newest CASSETTE_KEEP per URL"""
+        recordings = {}
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    recordings.setdefault(entry['key'], []).append(entry)
+        except OSError:
+            pass
+        return {key: entries[-self.keep:] for key, entries in recordings.items()}
+
+    def next_recording(self, url):
+        """The next recording for url (cycling through them in order), or None"""
+        path = _host_file(self.directory, url)
+        key = _key(url)
+        with self.lock:
+            if path not in self.loaded:
+                self.loaded[path] = self._load(path)
+            entries = self.loaded[path].get(key)
+            if not entries:
+                self.misses += 1
+                return None
+            index = self.cursor.get(key, 0)
+            self.cursor[key] = index + 1
+            self.replayed += 1
+            return entries[index % len(entries)]
+
+    def replay(self, url, timeout=None):
+        entry = self.next_recording(url)
+        if entry is None:
+            raise NoRecording(f'No recording for {url}')
+        delay = entry['elapsed_ms'] / 1000 * self.latency_scale
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise requests.exceptions.ReadTimeout(f'Replayed {url} took longer than {timeout}s')
+        if delay:
+            time.sleep(delay)
+        if 'error' in entry:
+            error = getattr(requests.exceptions, entry['error'], requests.exceptions.ConnectionError)
+            raise error(entry.get('message', 'Recorded failure'))
+
+        resp = requests.models.Response()
+        resp.status_code = entry['status']
+        resp.headers = CaseInsensitiveDict(entry['headers'])
+        resp._content = zlib.decompress(base64.b64decode(entry['body']))
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.url = url
+        resp.elapsed = timedelta(milliseconds=entry['elapsed_ms'])
+        resp.reason = 'Replayed'
+        return resp
+
+    def fetch(self, url, **kwargs):
+        """requests.get() in live mode, recorded or replayed otherwise"""
+        if self.mode == 'replay':
+            return self.replay(url, kwargs.get('timeout'))
+        if self.mode == 'live':
+            return requests.get(url, **kwargs)
+        started = time.perf_counter()
+        try:
+            resp = requests.get(url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self.record(url, started, error=e)
+            raise
+        self.record(url, started, resp)
+        return resp
+
+    def get_status(self):
+        return {'mode': self.mode, 'recorded': self.recorded, 'replayed': self.replayed, 'misses': self.misses}
+
+
+cassettes = Cassettes(os.environ.get('SRCC_UPSTREAM_MODE', UPSTREAM_MODE))
+
+
+def fetch(url, **kwargs):
+    """Fetch through the active cassettes"""
+    return cassettes.fetch(url, **kwargs)
+
+
+def use(mode, directory=CASSETTE_DIR, latency_scale=CASSETTE_LATENCY_SCALE):
+    """Switch mode (and cassette directory) at runtime, e.g. from a benchmark"""
+    global cassettes
+    cassettes = Cassettes(mode, directory, latency_scale)
+    return cassettes
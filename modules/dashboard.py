@@ -0,0 +1,78 @@
+"""
+Dashboard Bundle - every widget the kiosk shows in one /dashboard response
+Widgets are registered by the module that owns their data. A bundle builds
+each enabled widget in one pass with a shared per-request document cache, so
+data.json or life.json is read once per bundle instead of once per widget.
+Widgets whose config.FEATURES flag is off are skipped entirely.
+"""
+
+import time
+from flask import jsonify, request
+
+from config import FEATURES
+
+# name -> {'build': fn(docs) -> (payload, updated_at), 'feature': FEATURES key,
+#          'prefetch': fn() or None}
+_widgets = {}
+
+
+def register_widget(name, build, feature=None, prefetch=None):
+    """Add a widget to the bundle. build(docs) returns (payload, updated_at)
+    where updated_at is the epoch time the underlying data last changed (or
+    None if unknown). `feature` is the config.FEATURES flag that gates it.
+    prefetch() is called for every widget before any is built, so slow
+    upstream work can start in the background and overlap."""
+    _widgets[name] = {'build': build, 'feature': feature, 'prefetch': prefetch}
+
+
+def is_enabled(name):
+    """Whether a registered widget is enabled in config.FEATURES"""
+    feature = _widgets[name]['feature']
+    return feature is None or FEATURES.get(feature, True) is not False
+
+
+class Documents:
+    """Per-bundle memo of loaded documents: docs.get('data', load_data) calls
+    load_data at most once per bundle"""
+
+    def __init__(self):
+        self._loaded = {}
+
+    def get(self, name, load):
+        if name not in self._loaded:
+            self._loaded[name] = load()
+        return self._loaded[name]
+
+
+def build_bundle(names=None):
+    """Build every enabled widget (or just `names`). A widget that fails is
+    reported with an error instead of failing the whole bundle."""
+    docs = Documents()
+    selected = [name for name in _widgets if (names is None or name in names) and is_enabled(name)]
+    for name in selected:
+        if _widgets[name]['prefetch']:
+            _widgets[name]['prefetch']()
+
+    widgets = {}
+    for name in selected:
+        try:
+            payload, updated = _widgets[name]['build'](docs)
+            widgets[name] = {'data': payload, 'updated': updated}
+        except Exception as e:
+            print(f"Dashboard widget {name} failed: {e}")
+            widgets[name] = {'data': None, 'updated': None, 'error': str(e)}
+    return {
+        'features': FEATURES,
+        'generated': time.time(),
+        'widgets': widgets,
+    }
+
+
+def register_routes(app):
+    """Register /dashboard"""
+
+    @app.route('/dashboard')
+    def dashboard():
+        """All enabled widgets in one response; ?widgets=a,b limits the bundle"""
+        names = request.args.get('widgets')
+        return jsonify(build_bundle(set(names.split(',')) if names else None))
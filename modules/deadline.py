@@ -0,0 +1,133 @@
+"""
+Request Deadlines - bound how long any request can spend on upstream work
+Every request gets a latency budget (config.REQUEST_BUDGET, overridable per
+endpoint). Routes that depend on slow upstreams use run_within(), which
+gives the work the remaining budget and, if it doesn't finish, answers with
+whatever was assembled so far (marked partial) while the work carries on in
+the background to warm the cache. upstream.get() clamps its timeout to what's
+left for calls made on the request thread itself.
+"""
+
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import request
+
+from config import REQUEST_BUDGET, REQUEST_BUDGETS
+
+# Per-context deadline: {'at': absolute time.time() deadline, 'partial': bool}.
+# Deliberately not copied into background threads: refreshers and run_within()
+# workers run to completion so their results can warm the snapshots.
+_current = contextvars.ContextVar('srcc_deadline', default=None)
+
+# Background workers for run_within(); one in-flight job per key
+BACKGROUND_WORKERS = 4
+_executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix='deadline')
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class DeadlineExceeded(Exception):
+    """The current request's latency budget has run out"""
+
+
+def start(seconds):
+    """Start a deadline `seconds` from now in the current context. Returns a
+    token for stop()."""
+    return _current.set({'at': time.time() + seconds, 'partial': False})
+
+
+def stop(token):
+    """Restore the context's previous deadline"""
+    _current.reset(token)
+
+
+def remaining():
+    """Seconds left in the current deadline, or None if there isn't one"""
+    current = _current.get()
+    if current is None:
+        return None
+    return current['at'] - time.time()
+
+
+def expired():
+    """True once the current deadline has passed (False if there is none)"""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def check():
+    """Raise DeadlineExceeded if the current deadline has passed"""
+    if expired():
+        mark_partial()
+        raise DeadlineExceeded()
+
+
+def mark_partial():
+    """Record that work was cut short by the deadline"""
+    current = _current.get()
+    if current is not None:
+        current['partial'] = True
+
+
+def is_partial():
+    """Whether anything in this context was cut short"""
+    current = _current.get()
+    return bool(current and current['partial'])
+
+
+def submit(key, fn):
+    """Start fn(progress) on a background worker without waiting for it, or join
+    the job already running under key. Returns (future, progress)."""
+    submitted = False
+    with _inflight_lock:
+        entry = _inflight.get(key)
+        if entry is None:
+            progress = []
+            entry = _inflight[key] = (_executor.submit(fn, progress), progress)
+            submitted = True
+
+    future, progress = entry
+    if submitted:
+        # Outside the lock: the callback runs immediately if fn already finished
+        def done(f):
+            with _inflight_lock:
+                if _inflight.get(key) is entry:
+                    del _inflight[key]
+        future.add_done_callback(done)
+    return entry
+
+
+def run_within(key, fn, assemble):
+    """Run fn(progress) on a background worker and wait for it until the current
+    deadline. fn may append results to the `progress` list as it goes. If it
+    finishes in time returns (result, False); otherwise returns
+    (assemble(copy of progress), True) and fn keeps running. Concurrent callers
+    with the same key share one job."""
+    future, progress = submit(key, fn)
+    left = remaining()
+    try:
+        return future.result(timeout=None if left is None else max(0, left)), False
+    except FutureTimeout:
+        mark_partial()
+        return assemble(list(progress)), True
+
+
+def register(app):
+    """Give every request a deadline from REQUEST_BUDGET / REQUEST_BUDGETS"""
+
+    @app.before_request
+    def start_request_deadline():
+        budget = REQUEST_BUDGETS.get(request.endpoint, REQUEST_BUDGET)
+        if budget:
+            request.environ['srcc.deadline_token'] = start(budget / 1000)
+
+    @app.teardown_request
+    def stop_request_deadline(exc=None):
+        token = request.environ.pop('srcc.deadline_token', None)
+        if token is not None:
+            try:
+                stop(token)
+            except ValueError:
+                pass  # token was created in a different context
@@ -0,0 +1,130 @@
+"""
+Near-Duplicate Detection - cluster the same story reported by different sources
+Uses one-permutation MinHash signatures over title + summary shingles and an
+LSH band index, so candidate pairs are found in roughly linear time. Every
+candidate pair is confirmed with an exact Jaccard check before merging.
+"""
+
+import re
+import zlib
+
+# Signature layout: NUM_BINS minhash values split into BANDS bands of ROWS rows.
+# Two articles become candidates if any band matches exactly; with 8 bands of
+# 2 rows a pair at Jaccard 0.4 is caught ~75% of the time, at 0.6 ~97%.
+NUM_BINS = 16
+BANDS = 8
+ROWS = NUM_BINS // BANDS
+
+# Minimum Jaccard similarity between shingle sets to treat two articles as one story
+SIMILARITY_THRESHOLD = 0.4
+
+# Words are truncated to this many characters - a cheap stemmer that makes
+# "agree"/"agreement" and "cease"/"ceasefire" collide
+STEM_LENGTH = 5
+
+STOPWORDS = frozenset([
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'any', 'can', 'her', 'was', 'one',
+    'our', 'out', 'has', 'his', 'how', 'its', 'may', 'new', 'now', 'who', 'why', 'did', 'get',
+    'him', 'she', 'too', 'use', 'with', 'from', 'that', 'this', 'they', 'them', 'have', 'been',
+    'will', 'what', 'when', 'were', 'than', 'then', 'into', 'over', 'after', 'about', 'their',
+    'there', 'could', 'would', 'says', 'said', 'more', 'just', 'amp', 'quot',
+])
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# Offset added to a borrowed value during densification so a filled bin never
+# equals the bin it was copied from by accident
+_DENSIFY_OFFSET = 0x9E3779B1
+
+
+def shingles(article):
+    """Set of stemmed word shingles from an article's title and summary"""
+    text = f"{article.get('title', '')} {_TAG_RE.sub(' ', article.get('summary', '') or '')}".lower()
+    return {w[:STEM_LENGTH] for w in _WORD_RE.findall(text) if len(w) > 2 and w not in STOPWORDS}
+
+
+def minhash(tokens):
+    """One-permutation MinHash signature (tuple of NUM_BINS ints), or None if
+    there are no tokens. Each token is hashed once; empty bins are densified by
+    borrowing from the next non-empty bin."""
+    if not tokens:
+        return None
+
+    bins = [None] * NUM_BINS
+    for token in tokens:
+        h = zlib.crc32(token.encode('utf-8'))
+        b = h % NUM_BINS
+        v = h // NUM_BINS
+        if bins[b] is None or v < bins[b]:
+            bins[b] = v
+
+    signature = list(bins)
+    for i in range(NUM_BINS):
+        if bins[i] is None:
+            distance = 1
+            while bins[(i + distance) % NUM_BINS] is None:
+                distance += 1
+            signature[i] = bins[(i + distance) % NUM_BINS] + distance * _DENSIFY_OFFSET
+    return tuple(signature)
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def cluster_articles(articles, threshold=SIMILARITY_THRESHOLD):
+    """Group near-duplicate articles. Returns a list of clusters (lists of
+    articles), each in input order; clusters are ordered by their first article."""
+    parent = list(range(len(articles)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    token_sets = [shingles(a) for a in articles]
+    buckets = {}
+    checked = set()
+
+    for i, tokens in enumerate(token_sets):
+        signature = minhash(tokens)
+        if signature is None:
+            continue
+        for band in range(BANDS):
+            key = (band,) + signature[band * ROWS:(band + 1) * ROWS]
+            bucket = buckets.setdefault(key, [])
+            for j in bucket:
+                if (j, i) in checked:
+                    continue
+                checked.add((j, i))
+                if find(i) != find(j) and jaccard(tokens, token_sets[j]) >= threshold:
+                    parent[find(i)] = find(j)
+            bucket.append(i)
+
+    clusters = {}
+    for i, article in enumerate(articles):
+        clusters.setdefault(find(i), []).append(article)
+    return list(clusters.values())
+
+
+def dedupe_articles(articles, threshold=SIMILARITY_THRESHOLD):
+    """Keep one representative per near-duplicate cluster (the first one seen,
+    so source order sets priority). The other sources' badges are listed in
+    the representative's 'also_from' field."""
+    result = []
+    for cluster in cluster_articles(articles, threshold):
+        representative = dict(cluster[0])
+        others = []
+        for article in cluster[1:]:
+            source = article.get('source', '')
+            if source and source != representative.get('source') and source not in others:
+                others.append(source)
+        if others:
+            representative['also_from'] = others
+        result.append(representative)
+    return result
@@ -0,0 +1,242 @@
+"""
+Digest Module - Prebuilt news digests for /digest and /ai-digest
+The RSS digest is rebuilt on a schedule from the cached article pool and the
+AI digest is rebuilt whenever the morning job posts to /digest-cache. Routes
+only ever return the prebuilt payloads; digest.json is write-through
+persistence so a restart starts with yesterday's digest already in memory.
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from flask import jsonify, request
+
+from config import DIGEST_REFRESH_INTERVAL, REFRESH_INTERVAL_NEWS
+from . import refresh, dashboard, events, httpcache, metrics, warmup, snapshots
+
+# File paths
+DIGEST_FILE = os.path.join(os.path.dirname(__file__), '..', 'digest.json')
+
+# How many dated RSS digests to keep in memory / on disk
+HISTORY_DAYS = 14
+
+
+def build_rss_digest(articles):
+    """Group articles by category into the /digest payload"""
+    themes = {}
+    for article in articles:
+        cat = article.get('category', 'Other')
+        if cat not in themes:
+            themes[cat] = []
+        themes[cat].append({
+            'title': article.get('title', ''),
+            'link': article.get('link', ''),
+            'source': article.get('source', '')
+        })
+
+    return {
+        'themes': [{'theme': k, 'headlines': v} for k, v in themes.items()],
+        'generated': datetime.now().strftime('%Y-%m-%d %H:%M')
+    }
+
+
+def build_ai_digest(digest):
+    """Reshape a cached AI digest (old summary format or new categorized format)
+    into the /ai-digest payload"""
+    if not digest:
+        return {
+            'summary': 'No cached digest available. Morning digest runs at 5am.',
+            'categories': [],
+            'generated': None
+        }
+
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+
+    # Check for new categorized format first
+    categories = digest.get('categories', [])
+    if categories:
+        return {
+            'categories': categories,
+            'date': digest.get('date', ''),
+            'generated': generated
+        }
+
+    # Fall back to old single-summary format
+    summary_parts = []
+    for theme in digest.get('themes', []):
+        headlines = theme.get('headlines', [])
+        if headlines:
+            summary_parts.append({
+                'theme': theme.get('theme', ''),
+                'headlines': headlines[:5],
+                'count': len(headlines)
+            })
+
+    return {
+        'summary': digest.get('summary', ''),
+        'categories': summary_parts,
+        'generated': generated
+    }
+
+
+class DigestStore:
+    """In-memory digests with write-through persistence to digest.json.
+
+    digest.json keeps the AI digest exactly as it was posted, plus two extra
+    keys owned by this store: 'rss' (current RSS digest) and 'history'
+    (date -> RSS digest)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.raw = {}           # AI digest as posted to /digest-cache
+        self.ai = build_ai_digest({})
+        self.rss = None
+        self.history = {}
+        self.updated = {'ai': None, 'rss': None}  # epoch time each was last set
+        self.mtime = None
+
+    def load(self):
+        """Load digest.json into memory"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with metrics.timed_json('digest', 'load'), open(self.path, 'r') as f:
+                stored = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+        with self.lock:
+            self.rss = stored.pop('rss', None)
+            self.history = stored.pop('history', {})
+            self.raw = stored
+            self.ai = build_ai_digest(stored)
+            mtime = self.mtime = os.path.getmtime(self.path)
+            self.updated = {'ai': mtime if stored else None, 'rss': mtime if self.rss else None}
+
+    def sync(self):
+        """Reload digest.json if another worker process has rewritten it"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self.mtime:
+            self.load()
+
+    def _save(self):
+        document = dict(self.raw)
+        if self.rss:
+            document['rss'] = self.rss
+        if self.history:
+            document['history'] = self.history
+        tmp_path = self.path + '.tmp'
+        with metrics.timed_json('digest', 'save'), open(tmp_path, 'w') as f:
+            json.dump(document, f)
+        os.replace(tmp_path, self.path)
+        self.mtime = os.path.getmtime(self.path)
+
+    def set_ai_digest(self, digest):
+        """Replace the AI digest (posted by the morning job)"""
+        with self.lock:
+            self.raw = digest
+            self.ai = build_ai_digest(digest)
+            self.updated['ai'] = time.time()
+            self._save()
+
+    def set_rss_digest(self, payload):
+        """Replace the current RSS digest and record it in the dated history"""
+        with self.lock:
+            self.rss = payload
+            self.updated['rss'] = time.time()
+            self.history[datetime.now().strftime('%Y-%m-%d')] = payload
+            for day in sorted(self.history)[:-HISTORY_DAYS]:
+                del self.history[day]
+            self._save()
+
+
+store = DigestStore(DIGEST_FILE)
+
+
+def rebuild_digest():
+    """Rebuild the RSS digest from the cached article pool"""
+    # Imported here so the article pipeline isn't loaded until it's needed
+    from sources import get_cached_articles
+    payload = build_rss_digest(get_cached_articles())
+    store.set_rss_digest(payload)
+    events.publish_widgets(['digest'])
+    return payload
+
+
+def warm_digest():
+    """Startup warm-up: poll the sources once so the first digest isn't built
+    from an empty article pool. Other worker processes read the primary's."""
+    if not refresh.is_primary():
+        return store.rss or True
+    refresh.run_job('sources')
+    return refresh.run_job('digest')
+
+
+def building_payload():
+    """Placeholder /digest payload while the first RSS digest is built. Wakes
+    the digest refresher so nothing is ever built on a request thread."""
+    refresh.trigger('digest')
+    return {'themes': [], 'generated': None, 'building': True}
+
+
+def _cached(payload, max_age):
+    response = jsonify(payload)
+    response.headers['Cache-Control'] = f'public, max-age={int(max_age)}'
+    return response
+
+
+def register_routes(app):
+    """Register digest routes and the background digest refresher"""
+    store.load()
+    refresh.schedule('digest', rebuild_digest, DIGEST_REFRESH_INTERVAL / 1000, primary_only=True)
+    if snapshots.store.shared:
+        # Pick up digests built or posted in another worker process
+        refresh.schedule('digest-sync', store.sync, 5)
+    warmup.task('digest', warm_digest)
+    dashboard.register_widget('ai_digest', lambda docs: (store.ai, store.updated['ai']), feature='ai_digest')
+    dashboard.register_widget('digest', lambda docs: (store.rss or building_payload(), store.updated['rss']),
+                              feature='news_digest')
+
+    @app.route('/digest-cache', methods=['GET', 'POST'])
+    def digest_cache():
+        if request.method == 'GET':
+            return jsonify(store.raw)
+        data = request.get_json()
+        if data:
+            store.set_ai_digest(data)
+            events.publish_widgets(['ai_digest'])
+            return jsonify({"status": "ok", "message": "Digest cached"})
+        return jsonify({"status": "error", "message": "No data provided"}), 400
+
+    @app.route('/ai-digest')
+    @httpcache.validated(lambda: store.updated['ai'])
+    def ai_digest():
+        """AI-powered summary of daily news - supports both old summary format and new categorized format"""
+        return _cached(store.ai, REFRESH_INTERVAL_NEWS / 1000)
+
+    @app.route('/digest')
+    @httpcache.validated(lambda: store.updated['rss'])
+    def digest():
+        """RSS-based news digest with themes"""
+        if store.rss:
+            return _cached(store.rss, DIGEST_REFRESH_INTERVAL / 1000)
+        # Cold start: tell the client to come back once the refresher has run
+        response = jsonify(building_payload())
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    @app.route('/digest/history')
+    @httpcache.validated(lambda: store.updated['rss'])
+    def digest_history():
+        """Dated RSS digests; ?date=YYYY-MM-DD returns a single day"""
+        date = request.args.get('date')
+        if date:
+            if date not in store.history:
+                return jsonify({'error': f'No digest for {date}'}), 404
+            return _cached(store.history[date], DIGEST_REFRESH_INTERVAL / 1000)
+        return jsonify({'dates': sorted(store.history, reverse=True)})
@@ -0,0 +1,158 @@
+"""
+Events Module - Server-Sent Events push channel for dashboard widgets
+Background refreshers and write routes publish rebuilt widget payloads to a
+single EventBus. A payload identical to the last one published for that
+widget is dropped, so screens only hear about real changes. Every open
+/events stream waits on the same condition variable and is woken once per
+change; each event is serialized once no matter how many screens listen.
+With several worker processes, changes are also announced through the shared
+snapshot store so screens connected to the other workers hear them too.
+"""
+
+import json
+import hashlib
+import threading
+from collections import deque
+from flask import Response, request, jsonify
+
+from config import EVENTS_HEARTBEAT, EVENTS_BACKLOG
+from . import dashboard, refresh, memory, snapshots
+
+
+class EventBus:
+    """Versioned widget payloads with a bounded backlog of recent events.
+
+    Each widget has its own version, bumped whenever its payload changes;
+    events also carry a bus-wide sequence number used as the SSE id so a
+    reconnecting client can resume with Last-Event-ID."""
+
+    def __init__(self, backlog=EVENTS_BACKLOG):
+        self.cond = threading.Condition()
+        self.seq = 0
+        self.events = deque(maxlen=backlog)  # (seq, widget, encoded SSE message)
+        self.latest = {}      # widget -> (seq, encoded SSE message)
+        self.versions = {}    # widget -> version
+        self.hashes = {}      # widget -> hash of the last published payload
+        self.subscribers = 0
+        self.closed = False
+
+    def publish(self, widget, payload, updated=None):
+        """Publish a widget payload if it changed. Returns the new version, or
+        None if the payload was identical to the last one. `updated` is sent
+        along but doesn't count as a change."""
+        body = json.dumps(payload, sort_keys=True, default=str)
+        digest = hashlib.sha1(body.encode()).hexdigest()
+        with self.cond:
+            if self.hashes.get(widget) == digest:
+                return None
+            self.hashes[widget] = digest
+            version = self.versions[widget] = self.versions.get(widget, 0) + 1
+            self.seq += 1
+            message = (f'id: {self.seq}\nevent: {widget}\n'
+                       f'data: {{"version": {version}, "updated": {json.dumps(updated)}, "data": {body}}}\n\n')
+            self.events.append((self.seq, widget, message))
+            self.latest[widget] = (self.seq, message)
+            self.cond.notify_all()
+            return version
+
+    def since(self, last_seq):
+        """Messages after last_seq. If last_seq has already fallen out of the
+        backlog (or is from before a restart), the latest message for every
+        widget is returned instead."""
+        oldest = self.events[0][0] if self.events else self.seq + 1
+        if last_seq is None or last_seq > self.seq or last_seq < oldest - 1:
+            return [message for _, message in sorted(self.latest.values())]
+        return [message for seq, _, message in self.events if seq > last_seq]
+
+    def wait(self, last_seq, timeout):
+        """Block until something newer than last_seq is published or timeout
+        passes. Returns (messages, current seq)."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq != last_seq or self.closed, timeout)
+            return self.since(last_seq), self.seq
+
+    def stream(self, last_seq=None, heartbeat=EVENTS_HEARTBEAT / 1000):
+        """SSE generator: current state (or what was missed since last_seq),
+        then every change, with a comment line as heartbeat while idle"""
+        with self.cond:
+            self.subscribers += 1
+            messages, last_seq = self.since(last_seq), self.seq
+        try:
+            yield f'retry: {int(heartbeat * 1000)}\n\n'
+            for message in messages:
+                yield message
+            while not self.closed:
+                messages, last_seq = self.wait(last_seq, heartbeat)
+                if not messages and not self.closed:
+                    yield ': heartbeat\n\n'
+                for message in messages:
+                    yield message
+        finally:
+            with self.cond:
+                self.subscribers -= 1
+
+    def close(self):
+        """End every open stream (screens reconnect after the retry delay), e.g.
+        when this worker is draining for a restart"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def get_status(self):
+        with self.cond:
+            return {'subscribers': self.subscribers, 'seq': self.seq, 'versions': dict(self.versions)}
+
+
+bus = EventBus()
+
+
+def publish_widgets(names, notify=True):
+    """Rebuild dashboard widgets and publish the ones that changed, telling
+    the other worker processes (if any) to do the same"""
+    bundle = dashboard.build_bundle(set(names))
+    changed = [name for name, widget in bundle['widgets'].items()
+               if 'error' not in widget and bus.publish(name, widget['data'], widget['updated'])]
+    if notify and changed:
+        snapshots.store.notify(changed)
+
+
+_synced = {'seq': None}
+
+
+def sync_from_workers():
+    """Republish widgets another worker process announced as changed"""
+    _synced['seq'], names = snapshots.store.changes(_synced['seq'])
+    if names and bus.subscribers:
+        publish_widgets(names, notify=False)
+
+
+def schedule_widget(name, interval, only_when_watched=False):
+    """Background job that republishes a widget every `interval` seconds.
+    With only_when_watched the rebuild is skipped while no screen is listening."""
+    def push():
+        if only_when_watched and not bus.subscribers:
+            return
+        publish_widgets([name])
+    refresh.schedule(f'push-{name}', push, interval)
+
+
+def register_routes(app):
+    """Register /events and /events/status"""
+    memory.register_cache('events', lambda: {'entries': len(bus.events), 'subscribers': bus.subscribers})
+    if snapshots.store.shared:
+        refresh.schedule('events-sync', sync_from_workers, 1)
+
+    @app.route('/events')
+    def events():
+        """Server-Sent Events stream of changed widget payloads"""
+        last_id = request.headers.get('Last-Event-ID') or request.args.get('last_id')
+        last_seq = int(last_id) if last_id and last_id.isdigit() else None
+        return Response(bus.stream(last_seq), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        })
+
+    @app.route('/events/status')
+    def events_status():
+        """Subscriber count and current widget versions"""
+        return jsonify(bus.get_status())
@@ -0,0 +1,101 @@
+"""
+Feature Modules - import and register only the widgets config.FEATURES enables
+app.py lists each widget's module with register(); load() imports the enabled
+ones and calls their register_routes(app), which adds the routes, dashboard
+widget, refreshers and warm-up tasks. A disabled widget's module, and anything
+only it imports (requests for the upstream widgets, pytz for weather), is
+never loaded.
+
+Every step is timed: format_report() is printed at startup and /debug/startup
+serves the same numbers, next to the core imports app.py records itself.
+"""
+
+import sys
+import time
+import importlib
+from flask import jsonify
+
+from config import FEATURES
+
+# Registered feature modules, in load order
+_features = []
+# Timed startup steps: {'name', 'enabled', 'import_ms', 'register_ms', 'modules'}
+_steps = []
+
+
+def is_enabled(flags):
+    """Whether any of these config.FEATURES flags is on (missing means on)"""
+    return any(FEATURES.get(flag, True) is not False for flag in flags)
+
+
+def register(name, target, flags=None):
+    """Load `target` at startup if any of `flags` (config.FEATURES keys,
+    default: name) is on. target is 'package.module' (its register_routes is
+    called with the app), 'package.module:function', or a callable."""
+    _features.append({'name': name, 'target': target, 'flags': tuple(flags or (name,))})
+
+
+def _resolve(target):
+    if callable(target):
+        return target
+    module, _, function = target.partition(':')
+    return getattr(importlib.import_module(module), function or 'register_routes')
+
+
+def record(name, seconds, modules=None):
+    """Add a step timed elsewhere (e.g. app.py's own imports) to the report"""
+    _steps.append({'name': name, 'enabled': True, 'import_ms': round(seconds * 1000, 1),
+                   'register_ms': None, 'modules': modules})
+
+
+def load(app):
+    """Import and register every enabled feature, in registration order"""
+    for feature in _features:
+        step = {'name': feature['name'], 'enabled': is_enabled(feature['flags']),
+                'import_ms': None, 'register_ms': None, 'modules': None}
+        _steps.append(step)
+        if not step['enabled']:
+            continue
+        loaded = len(sys.modules)
+        start = time.perf_counter()
+        register_routes = _resolve(feature['target'])
+        imported = time.perf_counter()
+        register_routes(app)
+        step.update(import_ms=round((imported - start) * 1000, 1),
+                    register_ms=round((time.perf_counter() - imported) * 1000, 1),
+                    modules=len(sys.modules) - loaded)
+
+
+def get_report():
+    total = sum((step['import_ms'] or 0) + (step['register_ms'] or 0) for step in _steps)
+    return {
+        'total_ms': round(total, 1),
+        'steps': [dict(step) for step in _steps],
+        'disabled': [step['name'] for step in _steps if not step['enabled']],
+    }
+
+
+def format_report():
+    """The startup timing report as printable lines"""
+    report = get_report()
+    lines = [f"Startup took {report['total_ms']:.1f} ms"]
+    for step in report['steps']:
+        if not step['enabled']:
+            lines.append(f"  {step['name']:<16} off")
+            continue
+        line = f"  {step['name']:<16} {step['import_ms']:7.1f} ms import"
+        if step['register_ms'] is not None:
+            line += f"  {step['register_ms']:7.1f} ms register"
+        if step['modules'] is not None:
+            line += f"  ({step['modules']} modules)"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def register_routes(app):
+    """Register /debug/startup"""
+
+    @app.route('/debug/startup')
+    def debug_startup():
+        """What each feature module cost to import and register at startup"""
+        return jsonify(get_report())
@@ -0,0 +1,138 @@
+"""
+HTTP Caching - ETags, Cache-Control and gzip for JSON routes
+Routes declare the version of the data they serve (a file mtime, a digest
+timestamp, a widget version) instead of the middleware hashing every body.
+The ETag is derived from that version, so If-None-Match can be answered with
+304 before the payload is even built. Large JSON bodies are gzipped once per
+ETag and the compressed bytes are reused until the version changes.
+"""
+
+import os
+import gzip
+import zlib
+import functools
+import threading
+from collections import OrderedDict
+from flask import g, request
+
+from config import CACHE_MAX_AGE, GZIP_MIN_SIZE, GZIP_CACHE_ENTRIES
+from . import metrics, memory
+
+# Compressed bodies by ETag, least recently used first
+_gzip_cache = OrderedDict()
+_gzip_lock = threading.Lock()
+
+
+def etag_for(version):
+    """Strong ETag for the current endpoint + query string at `version`"""
+    tag = f'{request.endpoint}-{version}'
+    if request.query_string:
+        tag += f'-{zlib.crc32(request.query_string):08x}'
+    return tag
+
+
+def _client_has(tag):
+    # The gzipped variant has its own ETag; either means the client is current
+    return tag in request.if_none_match or f'{tag}-gz' in request.if_none_match
+
+
+def set_version(version):
+    """Declare the version of the data this response is built from"""
+    g.cache_version = version
+
+
+def file_mtime(path):
+    """Epoch mtime of a file, or None if it doesn't exist - the usual version
+    for a route serving that file"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def validated(version_fn):
+    """Route decorator: version_fn() gives the current version of the route's
+    data (or None if unknown). A client that already has it gets 304 without
+    the view running."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            version = version_fn()
+            if version is not None:
+                set_version(version)
+                if _client_has(etag_for(version)):
+                    metrics.cache_result('http_etag', True)
+                    return '', 304
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _gzip(response):
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return
+    tag, _ = response.get_etag()
+    compressed = None
+    if tag:
+        with _gzip_lock:
+            compressed = _gzip_cache.get(tag)
+            if compressed is not None:
+                _gzip_cache.move_to_end(tag)
+        metrics.cache_result('gzip', compressed is not None)
+    if compressed is None:
+        compressed = gzip.compress(data, compresslevel=6)
+        if tag:
+            with _gzip_lock:
+                _gzip_cache[tag] = compressed
+                while len(_gzip_cache) > GZIP_CACHE_ENTRIES:
+                    _gzip_cache.popitem(last=False)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = 'gzip'
+    if tag:
+        response.set_etag(f'{tag}-gz')
+
+
+def finish(response):
+    """after_request: ETag / 304, Cache-Control, then gzip"""
+    version = g.get('cache_version')
+    if response.status_code == 304 and version is not None:
+        response.set_etag(etag_for(version))
+    elif response.status_code == 200 and version is not None and 'ETag' not in response.headers:
+        tag = etag_for(version)
+        hit = _client_has(tag)
+        metrics.cache_result('http_etag', hit)
+        if hit:
+            response.status_code = 304
+            response.set_data(b'')
+        response.set_etag(tag)
+
+    if 'Cache-Control' not in response.headers:
+        max_age = CACHE_MAX_AGE.get(request.endpoint)
+        if max_age:
+            response.headers['Cache-Control'] = f'public, max-age={int(max_age / 1000)}'
+        elif version is not None:
+            response.headers['Cache-Control'] = 'no-cache'  # always revalidate
+
+    if response.mimetype == 'application/json' and not response.direct_passthrough:
+        response.vary.add('Accept-Encoding')
+        if (response.status_code == 200 and 'Content-Encoding' not in response.headers
+                and 'gzip' in request.headers.get('Accept-Encoding', '')):
+            _gzip(response)
+    return response
+
+
+def gzip_cache_size():
+    with _gzip_lock:
+        return {'entries': len(_gzip_cache), 'bytes': sum(len(body) for body in _gzip_cache.values())}
+
+
+def clear_gzip_cache():
+    with _gzip_lock:
+        _gzip_cache.clear()
+
+
+def register(app):
+    """Install the caching middleware"""
+    app.after_request(finish)
+    memory.register_cache('gzip', gzip_cache_size, clear_gzip_cache, priority=0)
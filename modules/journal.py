@@ -0,0 +1,74 @@
+"""
+Journal and Tasks - the journal document and the pending ranch tasks
+/journal serves data/journal.json; /future and /rancher/tasks list the open
+"- [ ]" lines of RANCH_TASKS.md. Both are revalidated by file mtime and are
+dashboard widgets behind their own FEATURES flags (journal,
+future_improvements).
+"""
+
+import os
+import re
+import json
+from flask import jsonify
+
+from config import REFRESH_INTERVAL_NEWS
+from . import dashboard, events, httpcache, warmup
+from .httpcache import file_mtime
+
+JOURNAL_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'journal.json')
+# RANCH_TASKS.md in the nanobot workspace
+RANCH_TASKS_FILE = '/home/juanpaez/.nanobot/workspace/memory/RANCH_TASKS.md'
+
+
+def load_journal():
+    """Journal document from data/journal.json"""
+    if os.path.exists(JOURNAL_FILE):
+        with open(JOURNAL_FILE, 'r') as f:
+            return json.load(f)
+    return {'version': '1.0', 'entries': []}
+
+
+def get_pending_tasks():
+    """Pending task lines ("- [ ] ...") from RANCH_TASKS.md"""
+    tasks = []
+    if os.path.exists(RANCH_TASKS_FILE):
+        with open(RANCH_TASKS_FILE, 'r') as f:
+            content = f.read()
+            # Extract pending task lines: "- [ ]" (pending)
+            matches = re.findall(r'- \[ \] (.+)', content)
+            for task in matches:
+                tasks.append(task.strip())
+    return tasks
+
+
+def register_routes(app):
+    """Register /journal, its dashboard widget, /events job and warm-up task"""
+    dashboard.register_widget('journal', lambda docs: (load_journal(), file_mtime(JOURNAL_FILE)), feature='journal')
+    # Picks up files edited outside the app
+    events.schedule_widget('journal', REFRESH_INTERVAL_NEWS / 1000, only_when_watched=True)
+    warmup.task('journal', load_journal)
+
+    @app.route('/journal')
+    @httpcache.validated(lambda: file_mtime(JOURNAL_FILE))
+    def journal():
+        """Return journal entries"""
+        return jsonify(load_journal())
+
+
+def register_task_routes(app):
+    """Register /future, /rancher/tasks, the tasks widget and its /events job"""
+    dashboard.register_widget('tasks', lambda docs: ({'active_tasks': get_pending_tasks()}, file_mtime(RANCH_TASKS_FILE)),
+                              feature='future_improvements')
+    events.schedule_widget('tasks', REFRESH_INTERVAL_NEWS / 1000, only_when_watched=True)
+
+    @app.route('/future')
+    @httpcache.validated(lambda: file_mtime(RANCH_TASKS_FILE))
+    def future():
+        """Return future improvements / pending tasks"""
+        return jsonify({'tasks': get_pending_tasks()})
+
+    @app.route('/rancher/tasks')
+    @httpcache.validated(lambda: file_mtime(RANCH_TASKS_FILE))
+    def rancher_tasks():
+        """Alias for /future - return active tasks from RANCH_TASKS.md"""
+        return jsonify({'active_tasks': get_pending_tasks()})
@@ -4,10 +4,17 @@ Handles: fitness, mood, learning, social tracking
 """
 
 import os
+import sys
+import copy
 import json
+import time
+import threading
 from datetime import datetime, timedelta
 from flask import jsonify, request
 
+from config import REFRESH_INTERVAL_NEWS
+from . import dashboard, events, versions, httpcache, metrics, memory
+
 # Module version - bump when schema changes
 CURRENT_VERSION = '1.0'
 
@@ -24,6 +31,55 @@ def get_default_life_data():
         'social': {'interactions': []}
     }
 
+def _migrate_0_0_to_1_0(data):
+    """0.0 -> 1.0: unversioned files predate the section layout, so just stamp
+    the version; normalize_life_data() fills in any missing sections."""
+    data['version'] = '1.0'
+    return data
+
+# Migration chain: (from_version, to_version, step). Each step upgrades the
+# document by exactly one schema version; add new steps to the end.
+MIGRATIONS = [
+    ('0.0', '1.0', _migrate_0_0_to_1_0),
+]
+
+def normalize_life_data(data):
+    """Validate life data against the current schema and fill in anything missing.
+    Returns (data, issues) where issues lists what had to be repaired."""
+    defaults = get_default_life_data()
+    issues = []
+    
+    sections = {
+        'fitness': ['workouts'],
+        'mood': ['entries'],
+        'learning': ['books', 'courses', 'skills'],
+        'social': ['interactions'],
+    }
+    for section, list_keys in sections.items():
+        if not isinstance(data.get(section), dict):
+            if section in data:
+                issues.append(f"{section}: expected object, replaced with default")
+            data[section] = defaults[section]
+            continue
+        for key in list_keys:
+            value = data[section].get(key)
+            if not isinstance(value, list):
+                if key in data[section]:
+                    issues.append(f"{section}.{key}: expected list, reset")
+                data[section][key] = []
+                continue
+            # Drop entries that are not objects - every route expects dicts
+            kept = [e for e in value if isinstance(e, dict)]
+            if len(kept) != len(value):
+                issues.append(f"{section}.{key}: dropped {len(value) - len(kept)} malformed entries")
+                data[section][key] = kept
+    
+    fitness = data['fitness']
+    if not isinstance(fitness.get('goals'), dict):
+        fitness['goals'] = defaults['fitness']['goals']
+    
+    return data, issues
+
 def migrate_life_data(data):
     """Migrate life data from older versions to current schema.
     Returns migrated data dictionary."""
@@ -33,69 +89,135 @@ def migrate_life_data(data):
     version = data.get('version', '0.0')
     
     # Migration chain: apply all needed migrations in order
-    if version == '0.0' or version == '1.0':
-        # Already at current version or no version - ensure all fields exist
-        defaults = get_default_life_data()
-        
-        # Ensure version field
-        data['version'] = CURRENT_VERSION
-        
-        # Ensure fitness structure
-        if 'fitness' not in data:
-            data['fitness'] = defaults['fitness']
-        else:
-            if 'goals' not in data['fitness']:
-                data['fitness']['goals'] = defaults['fitness']['goals']
-            if 'workouts' not in data['fitness']:
-                data['fitness']['workouts'] = []
-        
-        # Ensure mood structure
-        if 'mood' not in data:
-            data['mood'] = defaults['mood']
-        elif 'entries' not in data['mood']:
-            data['mood']['entries'] = []
-        
-        # Ensure learning structure
-        if 'learning' not in data:
-            data['learning'] = defaults['learning']
-        else:
-            for key in ['books', 'courses', 'skills']:
-                if key not in data['learning']:
-                    data['learning'][key] = []
-        
-        # Ensure social structure
-        if 'social' not in data:
-            data['social'] = defaults['social']
-        elif 'interactions' not in data['social']:
-            data['social']['interactions'] = []
-    
-    # Future migrations would go here:
-    # if version == '1.0':
-    #     # migrate 1.0 -> 1.1
-    #     ...
+    for from_version, to_version, step in MIGRATIONS:
+        if version == from_version:
+            data = step(data)
+            version = to_version
     
+    data['version'] = version
+    data, _ = normalize_life_data(data)
     return data
 
+# In-memory copy of life.json. The file is read, migrated and normalized once
+# (at startup or when its mtime changes) and every route is served from here.
+_life_lock = threading.RLock()
+_life_cache = {'data': None, 'mtime': None}
+
+def _file_mtime():
+    try:
+        return os.stat(LIFE_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+def _read_life_file():
+    """Read, migrate and normalize life.json. Returns (data, needs_save)."""
+    try:
+        with metrics.timed_json('life', 'load'), open(LIFE_FILE, 'r') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return get_default_life_data(), False
+    if not isinstance(data, dict):
+        return get_default_life_data(), False
+    
+    old_version = data.get('version')
+    data = migrate_life_data(data)
+    return data, old_version != data.get('version')
+
+def _drop_life_cache():
+    """Forget the in-memory copy; the next read reloads life.json"""
+    with _life_lock:
+        _life_cache['data'] = None
+        _life_cache['mtime'] = None
+
+def init_life_data():
+    """Load life.json into memory, persisting the migrated document if the
+    schema version changed. Called once at startup."""
+    with _life_lock:
+        _drop_life_cache()
+        return load_life_data()
+
 def load_life_data():
-    """Load personal life tracking data with automatic migration"""
-    if os.path.exists(LIFE_FILE):
-        try:
-            with open(LIFE_FILE, 'r') as f:
-                data = json.load(f)
-                # Run migrations if needed
-                if data.get('version') != CURRENT_VERSION:
-                    data = migrate_life_data(data)
-                    save_life_data(data)  # Save migrated version
-                return data
-        except (json.JSONDecodeError, IOError):
-            pass
-    return get_default_life_data()
+    """Load personal life tracking data with automatic migration.
+    The returned dict is shared by every reader - treat it as read-only and
+    make changes through update_life_data()."""
+    mtime = _file_mtime()
+    with _life_lock:
+        if _life_cache['data'] is not None and _life_cache['mtime'] == mtime:
+            metrics.cache_result('life', True)
+            return _life_cache['data']
+        metrics.cache_result('life', False)
+        
+        if mtime is None:
+            data, needs_save = get_default_life_data(), False
+        else:
+            data, needs_save = _read_life_file()
+        
+        _life_cache['data'] = data
+        _life_cache['mtime'] = mtime
+        if needs_save:
+            save_life_data(data)  # Save migrated version once, not per read
+        return data
 
 def save_life_data(data):
     """Save personal life tracking data"""
     os.makedirs(os.path.dirname(LIFE_FILE), exist_ok=True)
-    with open(LIFE_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+    with _life_lock:
+        tmp_file = LIFE_FILE + '.tmp'
+        with metrics.timed_json('life', 'save'), open(tmp_file, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_file, LIFE_FILE)
+        _life_cache['data'] = data
+        _life_cache['mtime'] = _file_mtime()
+
+def update_life_data(fn):
+    """Apply fn to a private copy of the life data and save it, all under the
+    life lock so concurrent writers can't lose each other's changes and readers
+    never see a half-applied update. Returns whatever fn returns."""
+    with _life_lock:
+        data = copy.deepcopy(load_life_data())
+        result = fn(data)
+        save_life_data(data)
+    events.publish_widgets(['life'])
+    return result
+
+def dry_run_migration(path=None):
+    """Time the migration chain against a copy of a life.json file without
+    writing anything. Returns a report dict."""
+    path = path or LIFE_FILE
+    t0 = time.perf_counter()
+    with open(path, 'r') as f:
+        original = json.load(f)
+    load_ms = (time.perf_counter() - t0) * 1000
+    
+    data = copy.deepcopy(original)
+    version = data.get('version', '0.0')
+    report = {
+        'file': path,
+        'from_version': version,
+        'load_ms': round(load_ms, 3),
+        'steps': [],
+    }
+    
+    for from_version, to_version, step in MIGRATIONS:
+        if version == from_version:
+            t0 = time.perf_counter()
+            data = step(data)
+            report['steps'].append({
+                'from': from_version,
+                'to': to_version,
+                'ms': round((time.perf_counter() - t0) * 1000, 3)
+            })
+            version = to_version
+    data['version'] = version
+    
+    t0 = time.perf_counter()
+    data, issues = normalize_life_data(data)
+    report['normalize_ms'] = round((time.perf_counter() - t0) * 1000, 3)
+    report['to_version'] = version
+    report['issues'] = issues
+    report['changed'] = data != original
+    report['total_ms'] = round(load_ms + report['normalize_ms'] + sum(s['ms'] for s in report['steps']), 3)
+    return report
 
 def calculate_streak(workouts, target=4):
     """Calculate current streak and weekly progress for gym/working out.
@@ -196,19 +318,54 @@ def calculate_achievements(workouts):
     }
 
 
+def get_streaks(data):
+    """/life/streaks payload: fitness streak, achievements and goals"""
+    fitness = data.get('fitness', {})
+    workouts = fitness.get('workouts', [])
+    
+    # Get weekly gym target (default 4)
+    target = fitness.get('goals', {}).get('weekly_gym_target', 4)
+    
+    return {
+        'fitness': calculate_streak(workouts, target),
+        'achievements': calculate_achievements(workouts),
+        'goals': fitness.get('goals', {})
+    }
+
+def build_life_widget(docs):
+    """Dashboard widget: every /life/* payload the kiosk shows, from one load"""
+    data = docs.get('life', load_life_data)
+    mtime = _life_cache['mtime']
+    payload = {
+        'streaks': get_streaks(data),
+        'mood': data.get('mood', {}),
+        'fitness': data.get('fitness', {}),
+        'learning': data.get('learning', {}),
+        'social': data.get('social', {}),
+    }
+    return payload, mtime / 1e9 if mtime else None
+
+
 def register_routes(app):
-    """Register all life tracking routes with the Flask app"""
+    """Register all life tracking routes with the Flask app; life.json is
+    loaded and migrated here and served from memory afterwards"""
+    dashboard.register_widget('life', build_life_widget, feature='life')
+    memory.register_cache('life', lambda: {'entries': int(_life_cache['data'] is not None)},
+                          _drop_life_cache, priority=20)
+    # Picks up day rollovers and edits made outside the app
+    events.schedule_widget('life', REFRESH_INTERVAL_NEWS / 1000, only_when_watched=True)
+    init_life_data()
     
     @app.route('/life')
+    @httpcache.validated(_file_mtime)
     def life():
         """Get all life data"""
         return load_life_data()
 
     @app.route('/life/fitness', methods=['GET', 'POST'])
+    @versions.validated('life.fitness', _file_mtime)
     def life_fitness():
         """Log or get fitness data"""
-        data = load_life_data()
-        
         if request.method == 'POST':
             workout = {
                 'date': request.json.get('date', datetime.now().strftime('%Y-%m-%d')),
@@ -216,34 +373,30 @@ def register_routes(app):
                 'duration': request.json.get('duration'),
                 'notes': request.json.get('notes', '')
             }
-            data['fitness']['workouts'].append(workout)
-            save_life_data(data)
+            update_life_data(lambda data: data['fitness']['workouts'].append(workout))
             return jsonify({'success': True, 'workout': workout})
         
-        return jsonify(data.get('fitness', {}))
+        return versions.respond('life.fitness', load_life_data().get('fitness', {}))
 
     @app.route('/life/mood', methods=['GET', 'POST'])
+    @versions.validated('life.mood', _file_mtime)
     def life_mood():
         """Log or get mood data"""
-        data = load_life_data()
-        
         if request.method == 'POST':
             entry = {
                 'date': request.json.get('date', datetime.now().strftime('%Y-%m-%d')),
                 'mood': request.json.get('mood'),  # 1-10 scale
                 'notes': request.json.get('notes', '')
             }
-            data['mood']['entries'].append(entry)
-            save_life_data(data)
+            update_life_data(lambda data: data['mood']['entries'].append(entry))
             return jsonify({'success': True, 'entry': entry})
         
-        return jsonify(data.get('mood', {}))
+        return versions.respond('life.mood', load_life_data().get('mood', {}))
 
     @app.route('/life/learning', methods=['GET', 'POST'])
+    @versions.validated('life.learning', _file_mtime)
     def life_learning():
         """Log or get learning data"""
-        data = load_life_data()
-        
         if request.method == 'POST':
             item = {
                 'date': request.json.get('date', datetime.now().strftime('%Y-%m-%d')),
@@ -252,19 +405,15 @@ def register_routes(app):
                 'notes': request.json.get('notes', '')
             }
             item_type = item['type'] + 's'  # books, courses, skills
-            if item_type not in data['learning']:
-                data['learning'][item_type] = []
-            data['learning'][item_type].append(item)
-            save_life_data(data)
+            update_life_data(lambda data: data['learning'].setdefault(item_type, []).append(item))
             return jsonify({'success': True, 'item': item})
         
-        return jsonify(data.get('learning', {}))
+        return versions.respond('life.learning', load_life_data().get('learning', {}))
 
     @app.route('/life/social', methods=['GET', 'POST'])
+    @versions.validated('life.social', _file_mtime)
     def life_social():
         """Log or get social data"""
-        data = load_life_data()
-        
         if request.method == 'POST':
             interaction = {
                 'date': request.json.get('date', datetime.now().strftime('%Y-%m-%d')),
@@ -272,30 +421,16 @@ def register_routes(app):
                 'with': request.json.get('with'),
                 'notes': request.json.get('notes', '')
             }
-            data['social']['interactions'].append(interaction)
-            save_life_data(data)
+            update_life_data(lambda data: data['social']['interactions'].append(interaction))
             return jsonify({'success': True, 'interaction': interaction})
         
-        return jsonify(data.get('social', {}))
+        return versions.respond('life.social', load_life_data().get('social', {}))
 
     @app.route('/life/streaks')
+    @httpcache.validated(lambda: f"{_file_mtime()}-{datetime.now().date()}")  # streaks roll over daily
     def life_streaks():
         """Get streak info for fitness and other tracked activities"""
-        data = load_life_data()
-        fitness = data.get('fitness', {})
-        workouts = fitness.get('workouts', [])
-        
-        # Get weekly gym target (default 4)
-        target = fitness.get('goals', {}).get('weekly_gym_target', 4)
-        
-        streak = calculate_streak(workouts, target)
-        achievements = calculate_achievements(workouts)
-        
-        return jsonify({
-            'fitness': streak,
-            'achievements': achievements,
-            'goals': fitness.get('goals', {})
-        })
+        return jsonify(get_streaks(load_life_data()))
 
     @app.route('/log', methods=['POST'])
     def log_activity():
@@ -307,8 +442,7 @@ def register_routes(app):
         
         today = datetime.now().strftime('%Y-%m-%d')
         logged = []
-        
-        life = load_life_data()
+        additions = []  # (section, key, entry), applied together below
         
         # Fitness keywords
         fitness_kw = ['gym', 'workout', 'lift', 'ran', 'run', 'soccer', 'tennis', 'exercise', 'training', 'push day', 'leg day']
@@ -319,7 +453,7 @@ def register_routes(app):
                 'duration': 60,  # default
                 'notes': text[:100]
             }
-            life['fitness']['workouts'].append(workout)
+            additions.append(('fitness', 'workouts', workout))
             logged.append(f"workout logged")
         
         # Mood keywords
@@ -327,7 +461,7 @@ def register_routes(app):
         for kw, val in mood_kw.items():
             if kw in text:
                 entry = {'date': today, 'mood': val, 'notes': text[:100]}
-                life['mood']['entries'].append(entry)
+                additions.append(('mood', 'entries', entry))
                 logged.append(f"mood: {val}/10")
                 break
         
@@ -335,20 +469,22 @@ def register_routes(app):
         learn_kw = ['read', 'book', 'course', 'learned', 'studied', 'article']
         if any(kw in text for kw in learn_kw):
             item = {'date': today, 'type': 'book' if 'book' in text else 'article', 'title': text[:50], 'notes': ''}
-            if 'books' not in life['learning']:
-                life['learning']['books'] = []
-            life['learning']['books'].append(item)
+            additions.append(('learning', 'books', item))
             logged.append("learning item logged")
         
         # Social keywords
         social_kw = ['hung out', 'met', 'call', 'dinner', 'lunch', 'coffee', 'friend', 'family']
         if any(kw in text for kw in social_kw):
             interaction = {'date': today, 'type': 'friend', 'with': text[:30], 'notes': ''}
-            life['social']['interactions'].append(interaction)
+            additions.append(('social', 'interactions', interaction))
             logged.append("social interaction logged")
         
         if logged:
-            save_life_data(life)
+            def apply(data):
+                for section, key, entry in additions:
+                    data[section].setdefault(key, []).append(entry)
+                return data
+            life = update_life_data(apply)
             
             # Build friendly response
             response_msg = "Got it! "
@@ -377,3 +513,11 @@ def register_routes(app):
             return jsonify({'success': True, 'logged': logged, 'message': response_msg.strip()})
         
         return jsonify({'success': False, 'message': "Didn't recognize that activity. Try: 'went to gym', 'feeling great', 'read a book', 'hung out with friend'"})
+
+
+if __name__ == '__main__':
+    # python -m modules.life --dry-run [path/to/life.json]
+    if len(sys.argv) > 1 and sys.argv[1] == '--dry-run':
+        print(json.dumps(dry_run_migration(sys.argv[2] if len(sys.argv) > 2 else None), indent=2))
+    else:
+        print("Usage: python -m modules.life --dry-run [life.json]")
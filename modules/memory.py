@@ -0,0 +1,166 @@
+"""
+Memory Diagnostics - cache sizes, tracemalloc snapshots and soft limits
+Modules register their in-memory caches with register_cache(). /debug/memory
+reports process RSS and each cache's size, and when config.MEMORY_TRACING is
+on, the top allocation sites from periodic tracemalloc snapshots plus what
+grew since the previous one. A background check compares RSS with
+MEMORY_SOFT_LIMIT_MB and evicts caches (cheapest to rebuild first) until the
+process is back under the limit, long before the OOM killer would step in.
+"""
+
+import gc
+import time
+import ctypes
+import threading
+import tracemalloc
+from collections import deque
+from flask import jsonify, request
+
+import psutil
+
+from config import (MEMORY_TRACING, MEMORY_TRACE_FRAMES, MEMORY_SNAPSHOT_INTERVAL,
+                    MEMORY_SOFT_LIMIT_MB, MEMORY_CHECK_INTERVAL)
+from . import refresh, metrics
+
+# Allocation sites reported per snapshot
+TOP_SITES = 15
+
+# A cache isn't evicted again this soon (seconds), so a process that stays
+# over the limit doesn't thrash reloading the same data every check
+EVICTION_COOLDOWN = 600
+
+# name -> {'size': fn() -> dict, 'evict': fn() or None, 'priority': int, 'evicted_at': time}
+_caches = {}
+_process = psutil.Process()
+_evictions = deque(maxlen=20)  # recent soft-limit evictions, oldest first
+
+evictions = metrics.Counter('srcc_cache_evictions_total', 'Caches evicted by the memory soft limit', ('cache',))
+
+
+def register_cache(name, size, evict=None, priority=50):
+    """Report a cache on /debug/memory. size() returns a dict such as
+    {'entries': n, 'bytes': b}. evict() drops the cache's contents (it must be
+    safe to rebuild lazily); caches are evicted in increasing `priority`, so
+    cheap-to-rebuild caches go first. Caches without evict are only reported."""
+    _caches[name] = {'size': size, 'evict': evict, 'priority': priority, 'evicted_at': None}
+
+
+def rss_mb():
+    """Resident set size of this process in MB"""
+    return _process.memory_info().rss / 2**20
+
+
+def cache_sizes():
+    """size() of every registered cache"""
+    sizes = {}
+    for name, cache in _caches.items():
+        try:
+            sizes[name] = dict(cache['size'](), evictable=cache['evict'] is not None)
+        except Exception as e:
+            sizes[name] = {'error': str(e)}
+    return sizes
+
+
+def _release():
+    """Collect garbage and hand freed heap pages back to the OS where glibc allows"""
+    gc.collect()
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def enforce_soft_limit(limit_mb=None):
+    """Evict caches until RSS is under the soft limit. Returns the names evicted."""
+    limit_mb = MEMORY_SOFT_LIMIT_MB if limit_mb is None else limit_mb
+    if not limit_mb or rss_mb() <= limit_mb:
+        return []
+    evicted = []
+    now = time.time()
+    for name, cache in sorted(_caches.items(), key=lambda item: item[1]['priority']):
+        if not cache['evict'] or (cache['evicted_at'] and now - cache['evicted_at'] < EVICTION_COOLDOWN):
+            continue
+        before = rss_mb()
+        try:
+            cache['evict']()
+        except Exception as e:
+            print(f"Evicting {name} failed: {e}")
+            continue
+        _release()
+        after = rss_mb()
+        cache['evicted_at'] = now
+        evicted.append(name)
+        evictions.inc(cache=name)
+        _evictions.append({'cache': name, 'at': time.time(),
+                           'rss_before_mb': round(before, 1), 'rss_after_mb': round(after, 1)})
+        print(f"Memory soft limit ({limit_mb} MB): evicted {name}, RSS {before:.0f} -> {after:.0f} MB")
+        if after <= limit_mb:
+            break
+    return evicted
+
+
+class Tracer:
+    """Periodic tracemalloc snapshots: the latest top sites and the growth
+    since the previous snapshot"""
+
+    def __init__(self, frames=MEMORY_TRACE_FRAMES):
+        self.frames = frames
+        self.lock = threading.Lock()
+        self.previous = None
+        self.report = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def snapshot(self, limit=TOP_SITES):
+        """Take a snapshot and diff it against the previous one"""
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+        top = snapshot.statistics('lineno')[:limit]
+        with self.lock:
+            growth = snapshot.compare_to(self.previous, 'lineno')[:limit] if self.previous else []
+            self.previous = snapshot
+            traced, peak = tracemalloc.get_traced_memory()
+            self.report = {
+                'taken': time.time(),
+                'traced_mb': round(traced / 2**20, 2),
+                'peak_mb': round(peak / 2**20, 2),
+                'top': [{'site': str(s.traceback), 'kb': round(s.size / 1024, 1), 'count': s.count} for s in top],
+                'growth': [{'site': str(s.traceback), 'kb': round(s.size_diff / 1024, 1), 'count': s.count_diff}
+                           for s in growth if s.size_diff > 0],
+            }
+            return self.report
+
+
+tracer = Tracer()
+
+
+def register_routes(app):
+    """Register /debug/memory and the snapshot and soft-limit jobs"""
+    if MEMORY_TRACING:
+        tracer.start()
+        refresh.schedule('memory-snapshot', tracer.snapshot, MEMORY_SNAPSHOT_INTERVAL / 1000)
+    if MEMORY_SOFT_LIMIT_MB:
+        refresh.schedule('memory-limit', enforce_soft_limit, MEMORY_CHECK_INTERVAL / 1000)
+
+    @app.route('/debug/memory')
+    def debug_memory():
+        """RSS, cache sizes, recent evictions and (if tracing) allocation sites;
+        ?snapshot=1 takes a fresh snapshot instead of the last periodic one"""
+        report = tracer.report
+        if request.args.get('snapshot') == '1':
+            report = tracer.snapshot()
+        return jsonify({
+            'rss_mb': round(rss_mb(), 1),
+            'soft_limit_mb': MEMORY_SOFT_LIMIT_MB,
+            'caches': cache_sizes(),
+            'evictions': list(_evictions),
+            'tracing': tracemalloc.is_tracing(),
+            'snapshot': report,
+        })
@@ -0,0 +1,180 @@
+"""
+Metrics Module - Prometheus text-format instrumentation at /metrics
+Counters and histograms are plain in-process objects (no client library):
+recording is a dict lookup, a bisect and an add under a lock, so the cost
+per request is a few microseconds. Gauges are computed when /metrics is
+scraped. Other modules record through the helpers at the bottom.
+"""
+
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from flask import Response, g, request
+
+import psutil
+
+# Latency buckets in seconds - the Pi's routes range from sub-millisecond
+# cache hits to multi-second upstream fetches
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_registry = []
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.lock = threading.Lock()
+        self.values = {}
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        with self.lock:
+            items = sorted(self.values.items())
+        return [f'{self.name}{_format_labels(self.labels, key)} {value}' for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.values = {}  # label values -> [per-bucket counts..., +Inf count, sum]
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        with self.lock:
+            items = sorted((key, list(counts)) for key, counts in self.values.items())
+        lines = []
+        for key, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, [("le", bound)])} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {counts[-1]:.6f}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {cumulative}')
+        return lines
+
+
+class Gauge:
+    """Value computed by fn() at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help, fn):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        _registry.append(self)
+
+    def render(self):
+        try:
+            return [f'{self.name} {self.fn()}']
+        except Exception:
+            return []
+
+
+def render():
+    """Every registered metric in Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.append(f'# HELP {metric.name} {metric.help}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+_process = psutil.Process()
+_started = time.time()
+
+http_requests = Counter('srcc_http_requests_total', 'HTTP requests by endpoint, method and status',
+                        ('endpoint', 'method', 'status'))
+http_latency = Histogram('srcc_http_request_duration_seconds', 'Time spent handling HTTP requests',
+                         ('endpoint', 'method'))
+upstream_latency = Histogram('srcc_upstream_request_duration_seconds', 'Outbound HTTP request latency by host',
+                             ('host',))
+upstream_errors = Counter('srcc_upstream_errors_total', 'Failed outbound HTTP requests by host and kind',
+                          ('host', 'kind'))
+cache_lookups = Counter('srcc_cache_lookups_total', 'Cache lookups by cache and result (hit/miss)',
+                        ('cache', 'result'))
+json_io = Histogram('srcc_json_io_duration_seconds', 'JSON file load/save time by file and operation',
+                    ('file', 'op'))
+Gauge('srcc_process_resident_memory_bytes', 'Resident set size of the app process',
+      lambda: _process.memory_info().rss)
+Gauge('srcc_process_threads', 'Threads in the app process', lambda: _process.num_threads())
+Gauge('srcc_process_uptime_seconds', 'Seconds since the app started', lambda: round(time.time() - _started, 1))
+
+
+def cache_result(cache, hit):
+    """Record a cache hit or miss"""
+    cache_lookups.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def timed_json(file, op):
+    """Context manager timing a JSON file load or save"""
+    return json_io.time(file=file, op=op)
+
+
+def register(app):
+    """Per-endpoint request counts and latency, and the /metrics route"""
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            endpoint = request.endpoint or 'unmatched'
+            http_latency.observe(time.perf_counter() - start, endpoint=endpoint, method=request.method)
+            http_requests.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus scrape endpoint"""
+        return Response(render(), mimetype='text/plain; version=0.0.4')
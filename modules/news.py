@@ -0,0 +1,120 @@
+"""
+News - headlines from config.NEWS_FEEDS for /news
+Feeds are fetched in order into a shared upstream snapshot
+(modules/upstream.py); if the request deadline hits mid-fetch, the articles
+parsed so far are served. The digest's article pool lives in sources.py.
+"""
+
+import re
+from datetime import datetime
+
+from config import NEWS_FEEDS, REFRESH_INTERVAL_NEWS
+from . import upstream, deadline, versions
+from .dedupe import dedupe_articles
+
+NEWS_FEED_URLS = [url for feed in NEWS_FEEDS.values() for url in feed['feeds']]
+
+# A snapshot younger than half the refresh interval is served as-is
+NEWS_FRESH_FOR = REFRESH_INTERVAL_NEWS / 2000
+
+
+def get_news():
+    return get_news_payload()['articles']
+
+
+def get_news_payload(progress=None):
+    """Recent articles from NEWS_FEEDS; the last good list is served (stale: true)
+    while every feed is failing"""
+    articles, stale = upstream.serve('news', lambda: fetch_news(progress), NEWS_FEED_URLS, NEWS_FRESH_FOR)
+    return {'articles': articles or [], 'stale': stale}
+
+
+def partial_news_payload(progress):
+    """/news answer when the deadline hits: articles fetched so far, else the
+    last good list"""
+    if progress:
+        # Copies: the background fetch is still using these articles
+        return {'articles': finish_news([dict(a) for a in progress]), 'stale': False, 'partial': True}
+    snapshot = upstream.get_snapshot('news')
+    return {'articles': snapshot['value'] if snapshot else [], 'stale': bool(snapshot), 'partial': True}
+
+
+def finish_news(articles):
+    """Collapse the same story from several feeds, then keep the top 20"""
+    articles = dedupe_articles(articles)[:20]
+    for article in articles:
+        title = article['title']
+        article['title'] = title[:75] + ('...' if len(title) > 75 else '')
+    return articles
+
+
+def fetch_news(progress=None):
+    """Fetch NEWS_FEEDS in order. Articles are appended to `progress` (if given)
+    as they are parsed so a deadline-bound caller can use them early. Feeds
+    whose circuit is open are skipped and probed in the background."""
+    articles = progress if progress is not None else []
+    seen_titles = set()
+
+    for category, config in NEWS_FEEDS.items():
+        for feed_url in config['feeds']:
+            if upstream.skip_if_open(feed_url, timeout=5):
+                continue
+            try:
+                resp = upstream.get(feed_url, timeout=5)
+                content = resp.text
+
+                source = ""
+                if 'bbc' in feed_url:
+                    source = "BBC"
+                elif 'reuters' in feed_url:
+                    source = "Reuters"
+                elif 'nytimes' in feed_url:
+                    source = "NYT"
+                elif 'techcrunch' in feed_url:
+                    source = "TechCrunch"
+                elif 'verge' in feed_url:
+                    source = "The Verge"
+                elif 'wired' in feed_url:
+                    source = "Wired"
+
+                items = re.findall(r'<item>(.*?)</item>', content, re.DOTALL)
+
+                for item in items[:8]:
+                    title_match = re.search(r'<title><!\[CDATA\[(.*?)\]\]></title>|<title>(.*?)</title>', item)
+                    link_match = re.search(r'<link>(.*?)</link>', item)
+                    pub_match = re.search(r'<pubDate>(.*?)</pubDate>', item)
+
+                    title = (title_match.group(1) or title_match.group(2) or "No title").strip()
+                    link = link_match.group(1).strip() if link_match else "#"
+                    pub_date = pub_match.group(1).strip() if pub_match else ""
+
+                    if title not in seen_titles:
+                        try:
+                            pub_dt = datetime.strptime(pub_date[:25], '%a, %d %b %Y %H:%M:%S')
+                            pub_dt = pub_dt.replace(tzinfo=None)
+                            if (datetime.now() - pub_dt).days <= 1:
+                                articles.append({
+                                    'title': title,
+                                    'link': link,
+                                    'category': category,
+                                    'source': source
+                                })
+                                seen_titles.add(title)
+                        except:
+                            pass
+            except Exception as e:
+                print(f"Error fetching {feed_url}: {e}")
+                continue
+
+    return finish_news(articles)
+
+
+def register_routes(app):
+    """Register /news and its warm-up task"""
+    upstream.warm_task('news', lambda: get_news_payload()['articles'], REFRESH_INTERVAL_NEWS / 1000)
+
+    @app.route('/news')
+    @versions.validated('news', lambda: upstream.fresh_stamp('news', NEWS_FRESH_FOR))
+    def news():
+        payload, _ = deadline.run_within('news', get_news_payload, partial_news_payload)
+        return versions.respond('news', payload, keys={'articles': 'link'})
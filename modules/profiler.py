@@ -0,0 +1,142 @@
+"""
+Request Profiler - opt-in cProfile capture for individual requests
+With config.PROFILING on, a request carrying ?__profile=1 or an
+X-Profile: 1 header runs under cProfile and its stats are written to
+data/profiles/ as a .pstats file. Only the newest PROFILE_KEEP files are kept.
+/debug/profiles lists them, /debug/profiles/<name> shows the top functions
+and ?download=1 returns the raw file for snakeviz or flameprof.
+With PROFILING off nothing is installed: no hook, no route, no overhead.
+
+Only the request thread is profiled. Work handed to deadline.run_within()
+workers or the refreshers shows up as time spent waiting.
+"""
+
+import io
+import os
+import re
+import time
+import pstats
+import cProfile
+import threading
+from urllib.parse import parse_qs
+from flask import abort, jsonify, request, send_file, Response
+
+from config import PROFILING, PROFILE_KEEP
+
+PROFILE_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'profiles')
+
+# Rows shown by /debug/profiles/<name>
+TOP_FUNCTIONS = 40
+
+_NAME_RE = re.compile(r'^\d+-[\w.-]+\.pstats$')
+
+# Only one profiler can be active at a time; concurrent requests that ask for
+# a profile are served unprofiled (X-Profile: busy) rather than queued
+_profile_lock = threading.Lock()
+
+
+def wants_profile(environ):
+    """Whether the request asks to be profiled"""
+    if environ.get('HTTP_X_PROFILE') == '1':
+        return True
+    query = environ.get('QUERY_STRING', '')
+    return '__profile' in query and parse_qs(query).get('__profile') == ['1']
+
+
+def _file_name(environ):
+    path = environ.get('PATH_INFO', '/').strip('/').replace('/', '.') or 'index'
+    path = re.sub(r'[^\w.-]', '_', path)
+    return f"{time.time_ns() // 1000}-{path}.pstats"
+
+
+def list_profiles():
+    """Saved profiles, newest first"""
+    try:
+        names = [n for n in os.listdir(PROFILE_DIR) if _NAME_RE.match(n)]
+    except OSError:
+        return []
+    return sorted(names, reverse=True)
+
+
+def save(profile, name):
+    """Write a profile into the ring, dropping the oldest beyond PROFILE_KEEP"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profile.dump_stats(os.path.join(PROFILE_DIR, name))
+    for old in list_profiles()[PROFILE_KEEP:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, old))
+        except OSError:
+            pass
+
+
+class ProfilerMiddleware:
+    """WSGI wrapper so the profile covers the whole request, hooks included"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        if not wants_profile(environ):
+            return self.wsgi_app(environ, start_response)
+        if not _profile_lock.acquire(blocking=False):
+            return self.wsgi_app(environ, self._header(start_response, 'busy'))
+        name = _file_name(environ)
+        profile = cProfile.Profile()
+        try:
+            # Build the body inside the profiler; streamed responses are
+            # profiled only up to their first chunk
+            profile.enable()
+            try:
+                body = self.wsgi_app(environ, self._header(start_response, name))
+            finally:
+                profile.disable()
+            save(profile, name)
+        finally:
+            _profile_lock.release()
+        return body
+
+    @staticmethod
+    def _header(start_response, value):
+        def wrapped(status, headers, exc_info=None):
+            return start_response(status, headers + [('X-Profile', value)], exc_info)
+        return wrapped
+
+
+def summary(name, limit=TOP_FUNCTIONS):
+    """pstats report of the top functions by cumulative time"""
+    out = io.StringIO()
+    stats = pstats.Stats(os.path.join(PROFILE_DIR, name), stream=out)
+    stats.strip_dirs().sort_stats('cumulative').print_stats(limit)
+    return out.getvalue()
+
+
+def register(app):
+    """Install the profiling middleware and /debug/profiles when PROFILING is on"""
+    if not PROFILING:
+        return
+    app.wsgi_app = ProfilerMiddleware(app.wsgi_app)
+
+    @app.route('/debug/profiles')
+    def debug_profiles():
+        """Saved request profiles, newest first"""
+        profiles = []
+        for name in list_profiles():
+            path = os.path.join(PROFILE_DIR, name)
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                continue
+            stamp, _, route = name[:-len('.pstats')].partition('-')
+            profiles.append({'name': name, 'route': '/' + route.replace('.', '/'),
+                             'taken': int(stamp) / 1e6, 'bytes': size})
+        return jsonify({'profiles': profiles, 'keep': PROFILE_KEEP})
+
+    @app.route('/debug/profiles/<name>')
+    def debug_profile(name):
+        """One profile as a text report, or ?download=1 for the .pstats file"""
+        if not _NAME_RE.match(name) or name not in list_profiles():
+            abort(404)
+        if request.args.get('download') == '1':
+            return send_file(os.path.abspath(os.path.join(PROFILE_DIR, name)), as_attachment=True,
+                             mimetype='application/octet-stream')
+        return Response(summary(name), mimetype='text/plain')
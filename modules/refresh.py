@@ -0,0 +1,104 @@
+"""
+Background Refreshers - periodic jobs that keep widget data warm
+Modules register a job with schedule(); app.py starts them all at launch so
+request handlers only ever read prebuilt data. With several worker processes
+(modules/supervisor.py) jobs marked primary_only, the ones that poll
+upstreams and write shared files, run in the first worker only.
+"""
+
+import time
+import threading
+import traceback
+
+# name -> job state
+_jobs = {}
+_jobs_lock = threading.Lock()
+_role = {'primary': True}
+
+
+def schedule(name, fn, interval, run_at_start=True, primary_only=False):
+    """Register fn to run every `interval` seconds in a background thread"""
+    with _jobs_lock:
+        _jobs[name] = {
+            'name': name,
+            'fn': fn,
+            'interval': interval,
+            'run_at_start': run_at_start,
+            'primary_only': primary_only,
+            'last_run': None,
+            'last_duration': None,
+            'last_error': None,
+            'runs': 0,
+            'thread': None,
+            'wake': threading.Event(),
+        }
+
+
+def run_job(name):
+    """Run a registered job once in the calling thread. Returns the job's result."""
+    job = _jobs[name]
+    start = time.time()
+    try:
+        result = job['fn']()
+        job['last_error'] = None
+        return result
+    except Exception as e:
+        job['last_error'] = str(e)
+        print(f"Refresher {name} failed: {e}")
+        traceback.print_exc()
+    finally:
+        job['last_run'] = start
+        job['last_duration'] = time.time() - start
+        job['runs'] += 1
+
+
+def trigger(name):
+    """Wake a job early instead of waiting for its next interval"""
+    job = _jobs.get(name)
+    if job:
+        job['wake'].set()
+
+
+def _loop(job):
+    # Jobs the startup warm-up already ran wait a full interval
+    if not job['run_at_start'] or job['runs']:
+        job['wake'].wait(job['interval'])
+    while True:
+        job['wake'].clear()
+        run_job(job['name'])
+        job['wake'].wait(job['interval'])
+
+
+def set_primary(primary):
+    """Whether this process runs the primary_only jobs (default: yes)"""
+    _role['primary'] = primary
+
+
+def is_primary():
+    return _role['primary']
+
+
+def start_refreshers():
+    """Start a daemon thread for every registered job that isn't running yet"""
+    with _jobs_lock:
+        for job in _jobs.values():
+            if job['primary_only'] and not _role['primary']:
+                continue
+            if job['thread'] is None:
+                job['thread'] = threading.Thread(target=_loop, args=(job,), name=f"refresh-{job['name']}", daemon=True)
+                job['thread'].start()
+
+
+def get_status():
+    """Summary of every job for status endpoints"""
+    return {
+        name: {
+            'interval': job['interval'],
+            'running': job['thread'] is not None,
+            'last_run': job['last_run'],
+            'last_duration': round(job['last_duration'], 3) if job['last_duration'] is not None else None,
+            'last_error': job['last_error'],
+            'runs': job['runs'],
+        }
+        for name, job in _jobs.items()
+    }
@@ -0,0 +1,196 @@
+"""
+Snapshot Store - upstream snapshots, fetch leases and widget versions shared
+by every worker process
+A single process (python app.py) keeps everything in memory. Under the
+supervisor with SERVER_WORKERS > 1 each worker opens the same SQLite file
+(SRCC_SNAPSHOT_DB, WAL mode) instead, so:
+  - a snapshot fetched by one worker is served by all of them, and a fetch
+    lease lets only one worker at a time call an upstream for a key;
+  - widget versions (and so ETags and ?since deltas) mean the same payload in
+    every worker;
+  - a widget change published in one worker reaches /events streams held
+    open by the others.
+Decoded values are memoized per process until the row changes, so a read
+costs one indexed SELECT of the fetch time.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+SNAPSHOT_DB_ENV = 'SRCC_SNAPSHOT_DB'
+
+# Change notifications kept for workers to catch up on
+CHANGES_KEEP = 1000
+
+
+class MemoryStore:
+    """In-process store for a single server process"""
+
+    shared = False
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshots = {}   # key -> {'value', 'fetched_at'}
+        self.leases = {}      # key -> expiry
+
+    def get(self, key):
+        return self.snapshots.get(key)
+
+    def put(self, key, value, fetched_at=None):
+        with self.lock:
+            self.snapshots[key] = {'value': value, 'fetched_at': fetched_at or time.time()}
+
+    def items(self):
+        with self.lock:
+            return list(self.snapshots.items())
+
+    def clear(self):
+        with self.lock:
+            self.snapshots.clear()
+            self.leases.clear()
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def claim(self, key, ttl):
+        """Take the fetch lease for key for `ttl` seconds; False if held"""
+        now = time.time()
+        with self.lock:
+            if self.leases.get(key, 0) > now:
+                return False
+            self.leases[key] = now + ttl
+            return True
+
+    def release(self, key):
+        with self.lock:
+            self.leases.pop(key, None)
+
+    def leased(self, key):
+        return self.leases.get(key, 0) > time.time()
+
+    def next_version(self, name, digest, current):
+        """Version for a changed payload of widget `name`"""
+        return current + 1
+
+    def notify(self, names):
+        pass
+
+    def changes(self, after):
+        """(last seq, widget names changed by other workers since `after`)"""
+        return after, set()
+
+
+class SQLiteStore:
+    """Store in one SQLite file shared by every worker"""
+
+    shared = True
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.memo = {}   # key -> (fetched_at, decoded snapshot)
+        with self._db() as db:
+            db.executescript('''
+                CREATE TABLE IF NOT EXISTS snapshots (key TEXT PRIMARY KEY, value TEXT, fetched_at REAL);
+                CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, until REAL, pid INTEGER);
+                CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, digest TEXT, version INTEGER);
+                CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, widget TEXT,
+                                                    pid INTEGER);
+            ''')
+
+    def _db(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = self.local.db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def get(self, key):
+        db = self._db()
+        row = db.execute('SELECT fetched_at FROM snapshots WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        memo = self.memo.get(key)
+        if memo and memo[0] == row[0]:
+            return memo[1]
+        # Only read the blob when the memo is missing or out of date
+        row = db.execute('SELECT value, fetched_at FROM snapshots WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        snapshot = {'value': json.loads(row[0]), 'fetched_at': row[1]}
+        self.memo[key] = (row[1], snapshot)
+        return snapshot
+
+    def put(self, key, value, fetched_at=None):
+        self._db().execute('INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)',
+                           (key, json.dumps(value, default=str), fetched_at or time.time()))
+
+    def items(self):
+        rows = self._db().execute('SELECT key FROM snapshots').fetchall()
+        return [(key, snapshot) for (key,) in rows if (snapshot := self.get(key))]
+
+    def clear(self):
+        self._db().executescript('DELETE FROM snapshots; DELETE FROM leases;')
+        self.memo.clear()
+
+    def __len__(self):
+        return self._db().execute('SELECT COUNT(*) FROM snapshots').fetchone()[0]
+
+    def claim(self, key, ttl):
+        now = time.time()
+        cursor = self._db().execute(
+            'INSERT INTO leases VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE SET until = excluded.until, '
+            'pid = excluded.pid WHERE leases.until <= ?', (key, now + ttl, os.getpid(), now))
+        return cursor.rowcount == 1
+
+    def release(self, key):
+        self._db().execute('DELETE FROM leases WHERE key = ? AND pid = ?', (key, os.getpid()))
+
+    def leased(self, key):
+        row = self._db().execute('SELECT until FROM leases WHERE key = ?', (key,)).fetchone()
+        return bool(row) and row[0] > time.time()
+
+    def next_version(self, name, digest, current):
+        """The shared version for this payload: the current one if another
+        worker already recorded the same payload, else one past every version
+        handed out so far, so a version never stands for two payloads"""
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            row = db.execute('SELECT digest, version FROM versions WHERE name = ?', (name,)).fetchone()
+            if row and row[0] == digest:
+                version = row[1]
+            else:
+                version = max(row[1] if row else 0, current) + 1
+                db.execute('INSERT OR REPLACE INTO versions VALUES (?, ?, ?)', (name, digest, version))
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        return version
+
+    def notify(self, names):
+        db = self._db()
+        db.executemany('INSERT INTO changes (widget, pid) VALUES (?, ?)', [(n, os.getpid()) for n in names])
+        db.execute('DELETE FROM changes WHERE seq <= (SELECT MAX(seq) FROM changes) - ?', (CHANGES_KEEP,))
+
+    def changes(self, after):
+        rows = self._db().execute('SELECT seq, widget, pid FROM changes WHERE seq > ? ORDER BY seq',
+                                  (after,)).fetchall()
+        if after is None or not rows:
+            last = self._db().execute('SELECT COALESCE(MAX(seq), 0) FROM changes').fetchone()[0]
+            return last, set()
+        return rows[-1][0], {widget for _, widget, pid in rows if pid != os.getpid()}
+
+
+def open_store():
+    """SQLiteStore when the supervisor runs several workers, else MemoryStore"""
+    path = os.environ.get(SNAPSHOT_DB_ENV)
+    return SQLiteStore(path) if path else MemoryStore()
+
+
+store = open_store()
@@ -0,0 +1,84 @@
+"""
+Stocks - quotes for config.STOCKS from Yahoo Finance
+/stocks answers within its request deadline from a shared upstream snapshot
+(modules/upstream.py), with the quotes fetched so far if the deadline hits
+mid-fetch; the same payload is the dashboard's stocks widget.
+"""
+
+from config import STOCKS, REFRESH_INTERVAL_STOCKS
+from . import upstream, deadline, versions, events
+
+STOCK_URL = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=1d"
+
+# A snapshot younger than half the refresh interval is served as-is
+STOCKS_FRESH_FOR = REFRESH_INTERVAL_STOCKS / 2000
+
+
+def get_stocks():
+    return get_stocks_payload()['stocks']
+
+
+def get_stocks_payload(progress=None):
+    """Quotes for STOCKS; the last good list is served (stale: true) while
+    Yahoo Finance is failing"""
+    stocks, stale = upstream.serve('stocks', lambda: fetch_stocks(progress), [STOCK_URL.format(symbol=s) for s in STOCKS],
+                                   STOCKS_FRESH_FOR)
+    return {'stocks': stocks or [], 'stale': stale}
+
+
+def partial_stocks_payload(progress):
+    """/stocks answer when the deadline hits: quotes fetched so far, else the
+    last good list"""
+    if progress:
+        return {'stocks': progress, 'stale': False, 'partial': True}
+    snapshot = upstream.get_snapshot('stocks')
+    return {'stocks': snapshot['value'] if snapshot else [], 'stale': bool(snapshot), 'partial': True}
+
+
+def fetch_stocks(progress=None):
+    """Fetch quotes in STOCKS order, appending each to `progress` (if given)"""
+    results = progress if progress is not None else []
+    headers = {'User-Agent': 'Mozilla/5.0'}
+    for symbol in STOCKS:
+        url = STOCK_URL.format(symbol=symbol)
+        if upstream.skip_if_open(url, headers=headers, timeout=5):
+            continue
+        try:
+            resp = upstream.get(url, headers=headers, timeout=5)
+            data = resp.json()
+
+            result = data.get('chart', {}).get('result', [])
+            if not result:
+                continue
+
+            meta = result[0].get('meta', {})
+            price = meta.get('regularMarketPrice', 0)
+            prev_close = meta.get('chartPreviousClose', price)
+            change = price - prev_close
+            change_pct = (change / prev_close * 100) if prev_close else 0
+
+            results.append({
+                'symbol': symbol,
+                'name': meta.get('shortName', symbol)[:15] if meta.get('shortName') else symbol,
+                'price': round(price, 2),
+                'change': round(change, 2),
+                'change_pct': round(change_pct, 2)
+            })
+        except Exception as e:
+            print(f"Error fetching {symbol}: {e}")
+            continue
+
+    return results
+
+
+def register_routes(app):
+    """Register /stocks, its dashboard widget, /events job and warm-up task"""
+    upstream.register_widget('stocks', get_stocks_payload, partial_stocks_payload)
+    events.schedule_widget('stocks', REFRESH_INTERVAL_STOCKS / 1000, only_when_watched=True)
+    upstream.warm_task('stocks', lambda: get_stocks_payload()['stocks'], REFRESH_INTERVAL_STOCKS / 1000)
+
+    @app.route('/stocks')
+    @versions.validated('stocks', lambda: upstream.fresh_stamp('stocks', STOCKS_FRESH_FOR))
+    def stocks():
+        payload, _ = deadline.run_within('stocks', get_stocks_payload, partial_stocks_payload)
+        return versions.respond('stocks', payload, keys={'stocks': 'symbol'})
@@ -0,0 +1,371 @@
+"""
+Supervisor - several worker processes on one socket, and zero-downtime restarts
+`python -m modules.supervisor` binds the port once and runs SERVER_WORKERS
+copies of app.py on that socket; the kernel hands each connection to
+whichever worker accepts first, so one slow route no longer stalls the rest
+and every core is used. Workers share upstream snapshots, widget versions and
+change notifications through one SQLite file (modules/snapshots.py), and
+only the first worker runs the jobs that poll upstreams and write shared
+files (refresh.schedule(primary_only=True)).
+
+On SIGHUP (`python -m modules.supervisor reload`, which deploy.sh runs after
+pulling):
+  1. a single worker writes its upstream snapshots to the handoff file (with
+     several, the snapshot file already outlives them),
+  2. a new worker generation starts on the same socket, adopts them and warms
+     up; each worker reports ready through a pipe once /ready would answer 200,
+  3. the old workers stop accepting, end their /events streams (screens
+     reconnect to the new ones), finish in-flight requests for up to
+     SUPERVISOR_DRAIN_TIMEOUT and exit.
+If the new generation dies or isn't ready within SUPERVISOR_READY_TIMEOUT it
+is killed and the old one keeps serving. The socket never closes, so at
+worst a connection waits in the listen backlog for a moment.
+
+A worker that crashes is restarted. The supervisor itself is not reloaded;
+changes to this file need a full restart.
+"""
+
+import os
+import sys
+import json
+import time
+import select
+import signal
+import socket
+import argparse
+import threading
+import subprocess
+
+from config import SERVER_WORKERS, SUPERVISOR_READY_TIMEOUT, SUPERVISOR_DRAIN_TIMEOUT
+from . import snapshots
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+APP = os.path.join(ROOT, 'app.py')
+DATA_DIR = os.path.join(ROOT, 'data')
+HANDOFF_FILE = os.path.join(DATA_DIR, 'handoff.json')
+STATUS_FILE = os.path.join(DATA_DIR, 'supervisor.json')
+SNAPSHOT_DB = os.path.join(DATA_DIR, 'snapshots.db')
+
+# Set by the supervisor in each worker's environment
+LISTEN_FD_ENV = 'SRCC_LISTEN_FD'
+READY_FD_ENV = 'SRCC_READY_FD'
+HANDOFF_ENV = 'SRCC_HANDOFF'
+GENERATION_ENV = 'SRCC_GENERATION'
+WORKER_INDEX_ENV = 'SRCC_WORKER_INDEX'
+
+HANDOFF_TIMEOUT = 5
+
+
+# Worker side
+
+def is_worker():
+    """Whether this process was started by the supervisor"""
+    return LISTEN_FD_ENV in os.environ
+
+
+class InFlight:
+    """WSGI middleware counting requests whose response hasn't finished"""
+
+    def __init__(self, app):
+        self.app = app
+        self.count = 0
+        self.idle = threading.Condition()
+
+    def _done(self):
+        with self.idle:
+            self.count -= 1
+            self.idle.notify_all()
+
+    def __call__(self, environ, start_response):
+        from werkzeug.wsgi import ClosingIterator
+        with self.idle:
+            self.count += 1
+        try:
+            return ClosingIterator(self.app(environ, start_response), self._done)
+        except BaseException:
+            self._done()
+            raise
+
+    def wait_idle(self, timeout):
+        """Block until no request is in flight; False if timeout passed first"""
+        with self.idle:
+            return self.idle.wait_for(lambda: self.count == 0, timeout)
+
+
+def serve(app, then=None):
+    """Worker entry point (app.py under the supervisor): adopt the handed-over
+    snapshots, serve on the inherited socket, warm up, then report ready.
+    SIGUSR1 writes the handoff file; SIGTERM drains and exits."""
+    from werkzeug.serving import make_server
+    from . import events, refresh, warmup
+
+    index = int(os.environ.get(WORKER_INDEX_ENV, '0'))
+    refresh.set_primary(index == 0)
+    handoff = os.environ.get(HANDOFF_ENV)
+    if handoff:
+        from . import upstream
+        print(f"Adopted {upstream.load_snapshots(handoff)} snapshots from the previous generation", flush=True)
+
+    in_flight = InFlight(app.wsgi_app)
+    app.wsgi_app = in_flight
+    server = make_server('0.0.0.0', 0, app, threaded=True, fd=int(os.environ[LISTEN_FD_ENV]))
+
+    def report_ready():
+        if then:
+            then()
+        with os.fdopen(int(os.environ[READY_FD_ENV]), 'w') as pipe:
+            pipe.write('ready\n')
+
+    def dump_snapshots():
+        # Imported here: with every upstream widget disabled it isn't loaded
+        from . import upstream
+        upstream.dump_snapshots(HANDOFF_FILE)
+
+    def hand_off(signum, frame):
+        threading.Thread(target=dump_snapshots, name='handoff', daemon=True).start()
+
+    def drain(signum, frame):
+        # shutdown() waits for serve_forever() to return, so not on this thread
+        threading.Thread(target=server.shutdown, name='drain', daemon=True).start()
+
+    signal.signal(signal.SIGUSR1, hand_off)
+    signal.signal(signal.SIGTERM, drain)
+    warmup.start(then=report_ready)
+    generation = os.environ.get(GENERATION_ENV)
+    print(f"Worker {index} of generation {generation} (pid {os.getpid()}) serving", flush=True)
+    server.serve_forever()
+
+    # Draining: the socket stays open in the supervisor and the new worker
+    events.bus.close()
+    if not in_flight.wait_idle(SUPERVISOR_DRAIN_TIMEOUT / 1000):
+        print(f"Worker generation {generation} exiting with {in_flight.count} requests still in flight", flush=True)
+    else:
+        print(f"Worker generation {generation} drained", flush=True)
+
+
+# Supervisor side
+
+class Worker:
+    """One worker process of a generation, and its readiness pipe"""
+
+    def __init__(self, sock, generation, index=0, handoff=None, snapshot_db=None):
+        self.generation = generation
+        self.index = index
+        ready_r, ready_w = os.pipe()
+        env = dict(os.environ, **{LISTEN_FD_ENV: str(sock.fileno()), READY_FD_ENV: str(ready_w),
+                                  GENERATION_ENV: str(generation), WORKER_INDEX_ENV: str(index)})
+        for name, value in ((HANDOFF_ENV, handoff), (snapshots.SNAPSHOT_DB_ENV, snapshot_db)):
+            env.pop(name, None)
+            if value:
+                env[name] = value
+        self.process = subprocess.Popen([sys.executable, APP], cwd=ROOT, env=env,
+                                        pass_fds=(sock.fileno(), ready_w))
+        os.close(ready_w)
+        self.ready_fd = ready_r
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def wait_ready(self, timeout=SUPERVISOR_READY_TIMEOUT / 1000):
+        """True once the worker reports ready; False if it exits or times out"""
+        deadline = time.time() + timeout
+        try:
+            while time.time() < deadline:
+                readable, _, _ = select.select([self.ready_fd], [], [], min(1, max(0, deadline - time.time())))
+                if readable:
+                    return os.read(self.ready_fd, 64).startswith(b'ready')
+                if not self.alive:
+                    return False
+            return False
+        finally:
+            os.close(self.ready_fd)
+
+    def hand_off(self, path=HANDOFF_FILE, timeout=HANDOFF_TIMEOUT):
+        """Ask the worker to write its snapshots; the path once written, else None"""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        self.process.send_signal(signal.SIGUSR1)
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if os.path.exists(path):
+                return path
+            time.sleep(0.05)
+        return None
+
+
+def stop_workers(workers, timeout=SUPERVISOR_DRAIN_TIMEOUT / 1000 + 5):
+    """Drain and stop workers together, killing any that outstay the drain"""
+    running = [w for w in workers if w.alive]
+    for worker in running:
+        worker.process.terminate()
+    deadline = time.time() + timeout
+    for worker in running:
+        try:
+            worker.process.wait(max(0, deadline - time.time()))
+        except subprocess.TimeoutExpired:
+            worker.process.kill()
+            worker.process.wait()
+
+
+class Supervisor:
+    """Owns the listening socket and swaps worker generations on it. With
+    more than one worker they share snapshots through SNAPSHOT_DB; with one,
+    snapshots are handed from generation to generation through a file."""
+
+    def __init__(self, host='0.0.0.0', port=80, workers=SERVER_WORKERS):
+        self.sock = socket.create_server((host, port), backlog=128)
+        self.sock.set_inheritable(True)
+        self.port = self.sock.getsockname()[1]
+        self.size = max(1, workers)
+        self.snapshot_db = SNAPSHOT_DB if self.size > 1 else None
+        self.generation = 0
+        self.workers = []
+        self.last_reload = None
+        self.wake = threading.Event()
+        self.reload_requested = False
+        self.stopping = False
+
+    def _write_status(self):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        tmp = f'{STATUS_FILE}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'pid': os.getpid(), 'port': self.port, 'generation': self.generation,
+                       'worker_pids': [w.pid for w in self.workers], 'last_reload': self.last_reload}, f)
+        os.replace(tmp, STATUS_FILE)
+
+    def _spawn(self, handoff=None):
+        """Start a new generation; its workers, all ready, or None"""
+        self.generation += 1
+        os.makedirs(DATA_DIR, exist_ok=True)
+        workers = [Worker(self.sock, self.generation, index, handoff, self.snapshot_db)
+                   for index in range(self.size)]
+        # wait_ready() must run for every worker to close its pipe
+        ready = [worker.wait_ready() for worker in workers]
+        if all(ready):
+            return workers
+        stop_workers(workers, timeout=1)
+        return None
+
+    def start(self):
+        """Start the first generation; False if it never became ready"""
+        self.workers = self._spawn() or []
+        self._write_status()
+        print(f"Generation {self.generation}: {len(self.workers)} of {self.size} workers ready on port "
+              f"{self.port}", flush=True)
+        return bool(self.workers)
+
+    def reload(self):
+        """Start a new generation and swap to it once every worker is ready.
+        Returns True if the swap happened."""
+        started = time.time()
+        old = self.workers
+        handoff = None
+        if not self.snapshot_db and old and old[0].alive:
+            handoff = old[0].hand_off()
+        new = self._spawn(handoff)
+        old_generation = old[0].generation if old else None
+        if new:
+            self.workers = new
+            stop_workers(old)
+            self.last_reload = {'at': started, 'ok': True, 'seconds': round(time.time() - started, 2),
+                                'generation': self.generation}
+            print(f"Generation {self.generation} serving; generation {old_generation} drained", flush=True)
+        else:
+            self.last_reload = {'at': started, 'ok': False, 'seconds': round(time.time() - started, 2),
+                                'generation': self.generation,
+                                'error': f'generation {self.generation} exited or was not ready in time'}
+            print(f"Reload failed: {self.last_reload['error']}; generation {old_generation} keeps serving",
+                  flush=True)
+        self._write_status()
+        return self.last_reload['ok']
+
+    def replace_crashed(self):
+        """Restart any worker of the current generation that has exited"""
+        for i, worker in enumerate(self.workers):
+            if worker.alive or self.stopping:
+                continue
+            print(f"Worker {worker.index} of generation {worker.generation} exited with "
+                  f"{worker.process.returncode}; restarting", flush=True)
+            replacement = Worker(self.sock, worker.generation, worker.index, snapshot_db=self.snapshot_db)
+            replacement.wait_ready()
+            self.workers[i] = replacement
+            self._write_status()
+
+    def run(self):
+        """Serve until SIGTERM/SIGINT; SIGHUP reloads"""
+        def request_reload(signum, frame):
+            self.reload_requested = True
+            self.wake.set()
+
+        def request_stop(signum, frame):
+            self.stopping = True
+            self.wake.set()
+
+        signal.signal(signal.SIGHUP, request_reload)
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        self.start()
+        while not self.stopping:
+            self.wake.wait(1)
+            self.wake.clear()
+            if self.reload_requested or not self.workers:
+                self.reload_requested = False
+                self.reload()
+            else:
+                self.replace_crashed()
+        stop_workers(self.workers)
+        self.sock.close()
+
+
+
+def request_reload(timeout=SUPERVISOR_READY_TIMEOUT / 1000 + SUPERVISOR_DRAIN_TIMEOUT / 1000 + 10):
+    """Signal the running supervisor to reload and wait for the outcome.
+    Returns the last_reload record, or None if there is no supervisor."""
+    try:
+        with open(STATUS_FILE, 'r') as f:
+            pid = json.load(f)['pid']
+        sent = time.time()
+        os.kill(pid, signal.SIGHUP)
+    except (FileNotFoundError, ProcessLookupError, ValueError, KeyError):
+        return None
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        time.sleep(0.5)
+        try:
+            with open(STATUS_FILE, 'r') as f:
+                last = json.load(f).get('last_reload')
+        except (OSError, ValueError):
+            continue
+        if last and last['at'] >= sent:
+            return last
+    return {'ok': False, 'error': 'timed out waiting for the supervisor'}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run app.py workers on one socket with zero-downtime reloads')
+    parser.add_argument('command', nargs='?', choices=['run', 'reload'], default='run')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=80)
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS, help='worker processes per generation')
+    args = parser.parse_args(argv)
+
+    if args.command == 'reload':
+        result = request_reload()
+        if result is None:
+            print('No supervisor is running', file=sys.stderr)
+            return 2
+        print(json.dumps(result))
+        return 0 if result['ok'] else 1
+    Supervisor(args.host, args.port, args.workers).run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+System Stats - background sampler with ring-buffer history for /stats
+A refresher samples CPU (overall and per core), memory, temperature, disk
+I/O and network throughput at a fixed rate into fixed-size array-backed
+ring buffers. /stats answers from the latest sample without touching psutil
+or the disk, and /stats/history returns downsampled series for a window.
+"""
+
+import os
+import json
+import math
+import time
+import threading
+from array import array
+from flask import jsonify, request
+
+import psutil
+
+from config import STATS_SAMPLE_INTERVAL, STATS_HISTORY_SECONDS, REFRESH_INTERVAL_STATS
+from . import refresh, dashboard, events
+
+TEND_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'tend.json')
+
+# Most points /stats/history returns per series
+MAX_HISTORY_POINTS = 120
+
+
+class Ring:
+    """Fixed-capacity ring of floats backed by array('d')"""
+
+    def __init__(self, capacity):
+        self.data = array('d', [math.nan]) * capacity
+        self.capacity = capacity
+        self.next = 0
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.next] = math.nan if value is None else value
+        self.next = (self.next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last(self, n):
+        """The newest n values (or fewer), oldest first"""
+        n = min(n, self.count)
+        start = (self.next - n) % self.capacity
+        if start + n <= self.capacity:
+            return self.data[start:start + n]
+        return self.data[start:] + self.data[:(start + n) % self.capacity]
+
+
+def downsample(values, points):
+    """Mean of each of `points` equal buckets, ignoring gaps (NaN)"""
+    if len(values) <= points:
+        buckets = [[v] for v in values]
+    else:
+        size = len(values) / points
+        buckets = [values[int(i * size):int((i + 1) * size)] for i in range(points)]
+    result = []
+    for bucket in buckets:
+        present = [v for v in bucket if not math.isnan(v)]
+        result.append(round(sum(present) / len(present), 2) if present else None)
+    return result
+
+
+def read_temperature():
+    """CPU temperature in °C, or None where the platform doesn't report one"""
+    try:
+        sensors = psutil.sensors_temperatures()
+    except (AttributeError, OSError):
+        return None
+    for name in ('cpu_thermal', 'coretemp', 'k10temp', 'soc_thermal'):
+        if sensors.get(name):
+            return sensors[name][0].current
+    for readings in sensors.values():
+        if readings:
+            return readings[0].current
+    return None
+
+
+class Sampler:
+    """Samples system counters into rings; counters (disk, network) are stored
+    as per-second rates between consecutive samples."""
+
+    SERIES = ('cpu', 'memory', 'temperature', 'disk_read', 'disk_write', 'net_sent', 'net_recv')
+
+    def __init__(self, interval=STATS_SAMPLE_INTERVAL / 1000, history=STATS_HISTORY_SECONDS):
+        self.interval = interval
+        capacity = max(1, int(history / interval))
+        self.lock = threading.Lock()
+        self.times = Ring(capacity)
+        self.series = {name: Ring(capacity) for name in self.SERIES}
+        self.cores = [Ring(capacity) for _ in range(psutil.cpu_count() or 1)]
+        self.latest = None
+        self._counters = None
+        self._tend = {'mtime': None, 'value': 'Never'}
+
+    def _last_tend(self):
+        """data/tend.json's last_tend, re-read only when the file changes"""
+        try:
+            mtime = os.stat(TEND_FILE).st_mtime_ns
+        except OSError:
+            return 'Never'
+        if mtime != self._tend['mtime']:
+            value = 'Never'
+            try:
+                with open(TEND_FILE, 'r') as f:
+                    tend_data = json.load(f)
+                if tend_data and 'last_tend' in tend_data:
+                    value = tend_data['last_tend']
+            except (json.JSONDecodeError, IOError):
+                pass
+            self._tend = {'mtime': mtime, 'value': value}
+        return self._tend['value']
+
+    def sample(self):
+        """Take one sample. Returns the /stats payload."""
+        now = time.time()
+        cores = psutil.cpu_percent(percpu=True)
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        counters = (now, disk.read_bytes if disk else 0, disk.write_bytes if disk else 0,
+                    net.bytes_sent if net else 0, net.bytes_recv if net else 0)
+        rates = [None] * 4
+        if self._counters:
+            elapsed = now - self._counters[0]
+            if elapsed > 0:
+                rates = [max(0, (new - old) / elapsed) for new, old in zip(counters[1:], self._counters[1:])]
+        self._counters = counters
+
+        values = {
+            'cpu': round(sum(cores) / len(cores), 1) if cores else 0.0,
+            'memory': psutil.virtual_memory().percent,
+            'temperature': read_temperature(),
+            'disk_read': rates[0], 'disk_write': rates[1],
+            'net_sent': rates[2], 'net_recv': rates[3],
+        }
+
+        uptime_seconds = now - psutil.boot_time()
+        days = int(uptime_seconds // 86400)
+        hours = int((uptime_seconds % 86400) // 3600)
+        minutes = int((uptime_seconds % 3600) // 60)
+        latest = {
+            'cpu': values['cpu'],
+            'cores': cores,
+            'memory': values['memory'],
+            'temperature': values['temperature'],
+            'time': time.strftime('%H:%M:%S', time.localtime(now)),
+            'uptime': f"{days}d {hours}h {minutes}m",
+            'last_tend_time': self._last_tend(),
+            'sampled_at': now,
+        }
+
+        with self.lock:
+            self.times.append(now)
+            for name, value in values.items():
+                self.series[name].append(value)
+            for ring, value in zip(self.cores, cores):
+                ring.append(value)
+            self.latest = latest
+        return latest
+
+    def current(self):
+        """Latest sample, taking one now if the sampler hasn't run yet"""
+        return self.latest or self.sample()
+
+    def history(self, window, points=MAX_HISTORY_POINTS):
+        """Downsampled series for the last `window` seconds"""
+        n = max(1, int(window / self.interval))
+        with self.lock:
+            times = self.times.last(n)
+            series = {name: ring.last(n) for name, ring in self.series.items()}
+            cores = [ring.last(n) for ring in self.cores]
+        points = max(1, min(points, len(times)))
+        return {
+            'window': window,
+            'interval': round(len(times) * self.interval / points, 2),
+            'times': [round(t) if t is not None else None for t in downsample(times, points)],
+            'series': {name: downsample(values, points) for name, values in series.items()},
+            'cores': [downsample(values, points) for values in cores],
+        }
+
+
+sampler = Sampler()
+
+
+def get_stats():
+    """Latest background sample in the /stats shape"""
+    sample = sampler.current()
+    return {
+        'cpu': sample['cpu'],
+        'memory': sample['memory'],
+        'time': sample['time'],
+        'uptime': sample['uptime'],
+        'last_tend_time': sample['last_tend_time'],
+        'cores': sample['cores'],
+        'temperature': sample['temperature'],
+    }
+
+
+def register_routes(app):
+    """Register /stats, /stats/history, the stats widget and the background sampler"""
+    refresh.schedule('stats-sampler', sampler.sample, sampler.interval)
+    dashboard.register_widget('stats', lambda docs: (get_stats(), time.time()), feature='uptime')
+    events.schedule_widget('stats', REFRESH_INTERVAL_STATS / 1000, only_when_watched=True)
+
+    @app.route('/stats')
+    def stats():
+        return get_stats()
+
+    @app.route('/stats/history')
+    def stats_history():
+        """Downsampled system stats; ?window=<seconds> (default 10 minutes), ?points=<n>"""
+        window = request.args.get('window', 600, type=float)
+        if not math.isfinite(window) or window <= 0:
+            return jsonify({'error': 'window must be a positive number of seconds'}), 400
+        window = min(window, STATS_HISTORY_SECONDS)
+        points = min(request.args.get('points', MAX_HISTORY_POINTS, type=int), MAX_HISTORY_POINTS)
+        return jsonify(sampler.history(window, max(1, points)))
@@ -0,0 +1,121 @@
+"""
+Teams Module - personalized filtering for config.TEAM_FEEDS
+Every team's search terms are compiled into a single regex, so tagging an
+article is one scan of its title and summary no matter how many teams are
+configured. Articles are tagged as they come through the article pipeline
+and kept in a small per-team index that /news/teams serves directly.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from flask import jsonify, request
+
+from config import TEAM_FEEDS
+
+# Newest articles kept per team
+MAX_ARTICLES_PER_TEAM = 30
+
+
+def compile_matcher(team_feeds):
+    """One case-insensitive regex over every team's name and search phrase.
+    Each team is a named group, so match.lastgroup is the team key."""
+    groups = []
+    for key, team in team_feeds.items():
+        terms = {t.strip().lower() for t in (team.get('name', ''), team.get('search', '')) if t and t.strip()}
+        if not terms:
+            continue
+        # Longest first so "texas longhorns football" wins over "texas longhorns"
+        alternatives = [r'\s+'.join(re.escape(w) for w in term.split()) for term in sorted(terms, key=len, reverse=True)]
+        groups.append(f"(?P<{key}>{'|'.join(alternatives)})")
+    if not groups:
+        return None
+    return re.compile(r'\b(?:' + '|'.join(groups) + r')\b', re.IGNORECASE)
+
+
+def tag_article(article, matcher):
+    """Team keys mentioned in an article, merged with any it already carries"""
+    teams = set(article.get('teams', []))
+    if matcher is not None:
+        text = f"{article.get('title', '')} {article.get('summary', '')}"
+        teams.update(m.lastgroup for m in matcher.finditer(text))
+    return sorted(teams)
+
+
+class TeamIndex:
+    """Per-team lists of the newest tagged articles, keyed by link"""
+
+    def __init__(self, team_feeds, max_per_team=MAX_ARTICLES_PER_TEAM):
+        self.team_feeds = team_feeds
+        self.matcher = compile_matcher(team_feeds)
+        self.max_per_team = max_per_team
+        self.lock = threading.Lock()
+        self.articles = {key: OrderedDict() for key in team_feeds}
+        self.updated = None
+
+    def ingest(self, articles):
+        """Tag a batch of articles in place and index the ones that match"""
+        with self.lock:
+            for article in articles:
+                teams = tag_article(article, self.matcher)
+                if teams:
+                    article['teams'] = teams
+                for team in teams:
+                    bucket = self.articles.get(team)
+                    if bucket is None:
+                        continue
+                    link = article.get('link') or article.get('title')
+                    bucket.pop(link, None)
+                    bucket[link] = article
+                    while len(bucket) > self.max_per_team:
+                        bucket.popitem(last=False)
+            self.updated = datetime.now().strftime('%Y-%m-%d %H:%M')
+
+    def get(self, team):
+        """Newest-first articles for a team"""
+        with self.lock:
+            return list(reversed(self.articles.get(team, {}).values()))
+
+
+index = TeamIndex(TEAM_FEEDS)
+
+
+def tag_articles(articles):
+    """Article pipeline hook - tag and index freshly fetched articles"""
+    index.ingest(articles)
+
+
+def _seed_from_cache():
+    """Fill the index from the on-disk article cache after a restart"""
+    from sources import read_article_cache
+    articles, _ = read_article_cache()
+    index.ingest(articles)
+
+
+def register_routes(app):
+    """Register team routes and hook team tagging into the article pipeline"""
+    from sources import register_article_hook
+    register_article_hook(tag_articles)
+
+    @app.route('/news/teams')
+    def news_teams():
+        """Per-team article lists; ?team=<key> returns a single team"""
+        if index.updated is None:
+            _seed_from_cache()
+
+        team = request.args.get('team')
+        if team:
+            if team not in TEAM_FEEDS:
+                return jsonify({'error': f'Unknown team {team}'}), 404
+            keys = [team]
+        else:
+            keys = list(TEAM_FEEDS)
+
+        return jsonify({
+            'teams': {
+                key: {'name': TEAM_FEEDS[key]['name'], 'articles': index.get(key)}
+                for key in keys
+            },
+            'updated': index.updated
+        })
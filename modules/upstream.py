@@ -0,0 +1,392 @@
+"""
+Upstream Resilience - circuit breakers and stale-while-revalidate snapshots
+Every outbound HTTP call goes through get(), which keeps a circuit breaker
+per host. Once a host has failed CIRCUIT_FAILURE_THRESHOLD times in a row its
+circuit opens and calls fail immediately instead of waiting out a timeout.
+serve() wraps a fetcher so that, while its upstream is down, the last good
+payload is returned (marked stale) and refreshed in the background; fetchers
+that call several hosts use skip_if_open() so one dead host costs nothing.
+"""
+
+import os
+import json
+import time
+import threading
+from urllib.parse import urlparse
+
+import requests
+from flask import jsonify
+
+from config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT
+from . import deadline, metrics, memory, cassette, snapshots, dashboard, warmup
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """closed -> open after `threshold` consecutive failures; open -> half_open
+    after `reset_timeout` seconds, letting one probe request through; the probe's
+    result closes or re-opens the circuit."""
+
+    def __init__(self, host, threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_TIMEOUT / 1000):
+        self.host = host
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.total_failures = 0
+        self.total_calls = 0
+        self.last_error = None
+
+    def allow(self):
+        """Whether a request may be sent now"""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def is_open(self):
+        """True until a request succeeds again. Past the reset timeout this stays
+        True so that serve() does the half-open probe in the background rather
+        than on a request thread."""
+        with self.lock:
+            return self.state != CLOSED
+
+    def probe_due(self):
+        """Whether the reset timeout has passed and no probe is in flight"""
+        with self.lock:
+            if self.state == OPEN:
+                return time.time() - self.opened_at >= self.reset_timeout
+            return self.state == HALF_OPEN and not self.probe_in_flight
+
+    def record_success(self):
+        with self.lock:
+            self.total_calls += 1
+            self.state = CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self, error):
+        with self.lock:
+            self.total_calls += 1
+            self.total_failures += 1
+            self.failures += 1
+            self.last_error = str(error)
+            if self.state == HALF_OPEN or self.failures >= self.threshold:
+                self.state = OPEN
+                self.opened_at = time.time()
+            self.probe_in_flight = False
+
+    def release_probe(self):
+        """Let another half-open probe through without judging this one"""
+        with self.lock:
+            self.probe_in_flight = False
+
+    def get_status(self):
+        with self.lock:
+            return {
+                'host': self.host,
+                'state': self.state,
+                'consecutive_failures': self.failures,
+                'calls': self.total_calls,
+                'failures': self.total_failures,
+                'opened_at': self.opened_at,
+                'last_error': self.last_error,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(url):
+    """Circuit breaker for the host of a URL"""
+    host = urlparse(url).netloc or url
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+def get(url, **kwargs):
+    """requests.get() (or its cassette, see modules/cassette.py) behind the
+    host's circuit breaker. 5xx and 429 responses count as failures but are
+    still returned to the caller. The timeout is clamped to the current
+    request deadline; running out of budget raises DeadlineExceeded and is
+    not held against the upstream."""
+    clamped = False
+    left = deadline.remaining()
+    if left is not None:
+        if left <= 0:
+            deadline.mark_partial()
+            raise deadline.DeadlineExceeded(url)
+        if kwargs.get('timeout') is None or left < kwargs['timeout']:
+            kwargs['timeout'] = left
+            clamped = True
+
+    breaker = get_breaker(url)
+    if not breaker.allow():
+        metrics.upstream_errors.inc(host=breaker.host, kind='circuit_open')
+        raise CircuitOpenError(f"Circuit open for {breaker.host}")
+    start = time.perf_counter()
+    try:
+        resp = cassette.fetch(url, **kwargs)
+    except requests.exceptions.Timeout as e:
+        metrics.upstream_latency.observe(time.perf_counter() - start, host=breaker.host)
+        if clamped:
+            # Our budget ran out, not necessarily the upstream's fault
+            breaker.release_probe()
+            deadline.mark_partial()
+            metrics.upstream_errors.inc(host=breaker.host, kind='deadline')
+            raise deadline.DeadlineExceeded(url) from e
+        breaker.record_failure(e)
+        metrics.upstream_errors.inc(host=breaker.host, kind='timeout')
+        raise
+    except Exception as e:
+        metrics.upstream_latency.observe(time.perf_counter() - start, host=breaker.host)
+        breaker.record_failure(e)
+        metrics.upstream_errors.inc(host=breaker.host, kind=type(e).__name__)
+        raise
+    metrics.upstream_latency.observe(time.perf_counter() - start, host=breaker.host)
+    if resp.status_code >= 500 or resp.status_code == 429:
+        breaker.record_failure(f"HTTP {resp.status_code}")
+        metrics.upstream_errors.inc(host=breaker.host, kind=f'http_{resp.status_code}')
+    else:
+        breaker.record_success()
+    return resp
+
+
+def is_open(url):
+    """Whether the circuit for a URL's host is currently open"""
+    return get_breaker(url).is_open()
+
+
+# Stale-while-revalidate snapshots: key -> {'value', 'fetched_at'}, shared by
+# every worker process when there are several (modules/snapshots.py)
+_snapshots = snapshots.store
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+# How long one fetch may hold a key's lease before others assume it died
+FETCH_LEASE = 30
+
+
+def _store(key, value):
+    _snapshots.put(key, value)
+
+
+def _revalidate(key, fetch_fn):
+    try:
+        value = fetch_fn()
+        if value:
+            _store(key, value)
+    except Exception as e:
+        print(f"Background refresh of {key} failed: {e}")
+    finally:
+        with _revalidating_lock:
+            _revalidating.discard(key)
+
+
+def revalidate_in_background(key, fetch_fn):
+    """Refresh a snapshot on a background thread (one refresh per key at a time)"""
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+    threading.Thread(target=_revalidate, args=(key, fetch_fn), name=f"revalidate-{key}", daemon=True).start()
+
+
+def _probe(host, url, kwargs):
+    try:
+        get(url, **kwargs)
+    except Exception as e:
+        print(f"Probe of {host} failed: {e}")
+    finally:
+        with _revalidating_lock:
+            _revalidating.discard(('probe', host))
+
+
+def skip_if_open(url, **kwargs):
+    """For fetchers that call several hosts: True if url's circuit is open and
+    the caller should skip it. A due half-open probe is sent on a background
+    thread (one per host) instead of on the caller's thread."""
+    breaker = get_breaker(url)
+    if not breaker.is_open():
+        return False
+    if breaker.probe_due():
+        with _revalidating_lock:
+            if ('probe', breaker.host) in _revalidating:
+                return True
+            _revalidating.add(('probe', breaker.host))
+        threading.Thread(target=_probe, args=(breaker.host, url, kwargs), name=f"probe-{breaker.host}", daemon=True).start()
+    return True
+
+
+def _wait_for_snapshot(key, timeout):
+    """Wait while another thread or worker holds key's fetch lease; the
+    snapshot it produced, or None"""
+    deadline_at = time.time() + timeout
+    while _snapshots.leased(key) and time.time() < deadline_at:
+        time.sleep(0.05)
+    return _snapshots.get(key)
+
+
+def _fresh(key, fresh_for):
+    snapshot = _snapshots.get(key)
+    if snapshot and time.time() - snapshot['fetched_at'] < fresh_for:
+        return snapshot
+    return None
+
+
+def fresh_stamp(key, fresh_for):
+    """Fetch time of key's snapshot while serve() would return it without
+    fetching, else None - the source stamp for versions.validated()"""
+    snapshot = _fresh(key, fresh_for)
+    return snapshot['fetched_at'] if snapshot else None
+
+
+def serve(key, fetch_fn, urls, fresh_for=None):
+    """Call fetch_fn and remember its result as the last good payload for key.
+    If every upstream in `urls` has an open circuit, or fetch_fn raises or returns
+    nothing, the last good payload is returned instead and refreshed in the
+    background. Returns (value, stale); value is None if nothing ever succeeded.
+
+    With fresh_for, a snapshot younger than that many seconds is returned
+    without fetching, and only one fetch per key runs at a time across threads
+    and worker processes: the others get the current snapshot, or wait for the
+    first one."""
+    if fresh_for is None:
+        return _serve(key, fetch_fn, urls)
+    snapshot = _fresh(key, fresh_for)
+    if snapshot is None:
+        if _snapshots.claim(key, FETCH_LEASE):
+            try:
+                # Checked again: the previous lease holder may have just stored one
+                snapshot = _fresh(key, fresh_for)
+                if snapshot is None:
+                    return _serve(key, fetch_fn, urls)
+            finally:
+                _snapshots.release(key)
+        else:
+            # Another thread or worker is fetching: serve the current snapshot,
+            # or wait for the first one
+            snapshot = _snapshots.get(key) or _wait_for_snapshot(key, FETCH_LEASE)
+            if snapshot is None:
+                return _serve(key, fetch_fn, urls)
+    metrics.cache_result('upstream_snapshot', True)
+    return snapshot['value'], False
+
+
+def _serve(key, fetch_fn, urls):
+    snapshot = _snapshots.get(key)
+    if snapshot and urls and all(is_open(url) for url in urls):
+        metrics.cache_result('upstream_snapshot', True)
+        revalidate_in_background(key, fetch_fn)
+        return snapshot['value'], True
+
+    try:
+        value = fetch_fn()
+    except Exception as e:
+        print(f"Fetching {key} failed: {e}")
+        value = None
+
+    if value:
+        _store(key, value)
+        return value, False
+    metrics.cache_result('upstream_snapshot', bool(snapshot))
+    if snapshot:
+        revalidate_in_background(key, fetch_fn)
+        return snapshot['value'], True
+    return value, False
+
+
+def get_snapshot(key):
+    """Last good payload for key and when it was fetched, or None"""
+    return _snapshots.get(key)
+
+
+def register_widget(key, fetch, partial):
+    """Dashboard widget for an upstream-backed route. Every upstream fetch in a
+    bundle starts up front and they share the one request deadline."""
+    def build(docs):
+        payload, _ = deadline.run_within(key, fetch, partial)
+        snapshot = get_snapshot(key)
+        return payload, snapshot['fetched_at'] if snapshot else None
+    dashboard.register_widget(key, build, feature=key, prefetch=lambda: deadline.submit(key, fetch))
+
+
+def warm_task(key, warm, max_age):
+    """Warm-up task for key's snapshot (modules/warmup.py). One handed over by
+    the previous worker generation (modules/supervisor.py) is kept if it's
+    fresh enough."""
+    def task():
+        snapshot = get_snapshot(key)
+        if snapshot and time.time() - snapshot['fetched_at'] < max_age:
+            return True
+        return warm()
+    warmup.task(key, task)
+
+
+def dump_snapshots(path):
+    """Write every snapshot to path (atomically), e.g. for the next worker
+    generation to start from (modules/supervisor.py)"""
+    entries = dict(_snapshots.items())
+    payload = json.dumps(entries, default=str)
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    return len(entries)
+
+
+def load_snapshots(path):
+    """Adopt snapshots written by dump_snapshots(), keeping any newer ones
+    already held. Returns how many were loaded."""
+    try:
+        with open(path, 'r') as f:
+            loaded = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    for key, snapshot in loaded.items():
+        current = _snapshots.get(key)
+        if current is None or current['fetched_at'] < snapshot['fetched_at']:
+            _snapshots.put(key, snapshot['value'], snapshot['fetched_at'])
+    return len(loaded)
+
+
+def get_status():
+    """Breaker state per host and snapshot age per key"""
+    now = time.time()
+    with _breakers_lock:
+        breakers = [b.get_status() for b in _breakers.values()]
+    return {
+        'cassettes': cassette.cassettes.get_status(),
+        'circuits': sorted(breakers, key=lambda b: b['host']),
+        'snapshots': {key: {'age_s': round(now - snap['fetched_at'], 1)} for key, snap in _snapshots.items()},
+    }
+
+
+def register_routes(app):
+    """Register the upstream status route"""
+    # Reported only: snapshots are the stale fallback when an upstream is down
+    memory.register_cache('upstream_snapshots', lambda: {'entries': len(_snapshots)})
+
+    @app.route('/upstream/status')
+    def upstream_status():
+        """Circuit breaker state for every upstream host"""
+        return jsonify(get_status())
@@ -0,0 +1,225 @@
+"""
+Versions Module - monotonically increasing versions and deltas for widget data
+Each tracked source (weather, stocks, news, chores, life categories) keeps a
+version that only moves when its payload actually changes, plus a bounded
+history of what changed in each version. Clients pass ?since=<version> and
+get 304 if nothing changed, or just the list items added and removed since
+then (e.g. only the new articles) instead of the full payload.
+
+Routes whose data has a cheap stamp (a file mtime, a snapshot's fetch time)
+use validated(): while the stamp is unchanged the stored version is reused,
+so If-None-Match and ?since=<current> get 304 before the view builds
+anything, and a payload is only hashed when its source has changed.
+
+With several worker processes the version numbers come from the shared
+snapshot store (modules/snapshots.py), so every worker gives the same payload
+the same version and a version never stands for two payloads; a worker only
+sends a delta from a version it has seen itself.
+"""
+
+import json
+import time
+import hashlib
+import functools
+import threading
+from collections import deque
+from flask import g, jsonify, request
+
+from config import DELTA_HISTORY
+from . import httpcache, snapshots
+
+
+def _default_key(item):
+    if isinstance(item, str):
+        return item
+    return json.dumps(item, sort_keys=True, default=str)
+
+
+class Tracker:
+    """Version and recent diffs for one dict payload. List fields are diffed
+    item by item (keyed by keys[field], or the item itself); every other field
+    is compared as a whole."""
+
+    def __init__(self, name, keys=None, history=DELTA_HISTORY):
+        self.name = name
+        self.keys = keys or {}
+        self.lock = threading.Lock()
+        # Start from the clock (ms) so versions keep increasing across restarts
+        # and a client's pre-restart version can't be mistaken for a new one
+        self.version = int(time.time() * 1000)
+        self.hash = None
+        self.stamp = None    # source stamp of the last recorded payload
+        self.lists = {}      # field -> {item key: item}, in payload order
+        self.scalars = {}    # field -> value
+        self.diffs = deque(maxlen=history)  # (version, base version, {'changed', 'added', 'removed'})
+
+    def _key(self, field, item):
+        key = self.keys.get(field)
+        if key and isinstance(item, dict) and key in item:
+            return item[key]
+        return _default_key(item)
+
+    def current(self, stamp):
+        """The version recorded for this source stamp, or None if the source
+        has changed since (or there is no stamp)"""
+        with self.lock:
+            if stamp is not None and stamp == self.stamp:
+                return self.version
+        return None
+
+    def record(self, payload, stamp=None):
+        """Record the current payload; bumps the version if it changed.
+        Returns the current version. With the same non-None `stamp` as the
+        last call the payload is taken as unchanged without hashing it."""
+        version = self.current(stamp)
+        if version is not None:
+            return version
+        digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+        with self.lock:
+            if digest == self.hash:
+                self.stamp = stamp
+                return self.version
+
+            lists, scalars = {}, {}
+            for field, value in payload.items():
+                if isinstance(value, list):
+                    lists[field] = {self._key(field, item): item for item in value}
+                else:
+                    scalars[field] = value
+
+            diff = {'changed': set(), 'added': {}, 'removed': {}}
+            for field in set(scalars) | set(self.scalars):
+                if field not in lists and scalars.get(field) != self.scalars.get(field):
+                    diff['changed'].add(field)
+            for field in set(lists) | set(self.lists):
+                old, new = self.lists.get(field, {}), lists.get(field, {})
+                # A changed item is a removal followed by an addition
+                removed = [k for k in old if k not in new or new[k] != old[k]]
+                added = [k for k in new if k not in old or new[k] != old[k]]
+                if removed:
+                    diff['removed'][field] = removed
+                if added:
+                    diff['added'][field] = added
+
+            self.hash, self.stamp = digest, stamp
+            self.lists, self.scalars = lists, scalars
+            base, self.version = self.version, snapshots.store.next_version(self.name, digest, self.version)
+            self.diffs.append((self.version, base, diff))
+            return self.version
+
+    def delta(self, since):
+        """Changes since a version the client already has: None if nothing
+        changed, False if `since` is too old (or unknown) for a delta, otherwise
+        {'changed': {field: value}, 'added': {field: [items]}, 'removed': {field: [keys]}}.
+        Removed keys are applied before added items, so a changed item shows up
+        in both."""
+        with self.lock:
+            if since == self.version:
+                return None
+            # The diffs have to chain back to exactly `since`
+            bases = [base for _, base, _ in self.diffs]
+            if since not in bases:
+                return False
+
+            changed = set()
+            first = {}  # (field, key) -> first operation after `since`
+            for _, _, diff in list(self.diffs)[bases.index(since):]:
+                changed |= diff['changed']
+                for op in ('removed', 'added'):
+                    for field, keys in diff[op].items():
+                        for key in keys:
+                            first.setdefault((field, key), op)
+
+            result = {'changed': {f: self.scalars.get(f) for f in changed}, 'added': {}, 'removed': {}}
+            for (field, key), op in first.items():
+                if op == 'removed':
+                    result['removed'].setdefault(field, []).append(key)
+                current = self.lists.get(field, {})
+                if key in current:
+                    result['added'].setdefault(field, []).append(current[key])
+            return result
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def track(name, keys=None):
+    """Tracker for a source, created on first use. `keys` maps list fields to
+    the item key that identifies them (e.g. {'articles': 'link'})."""
+    with _trackers_lock:
+        tracker = _trackers.get(name)
+        if tracker is None:
+            tracker = _trackers[name] = Tracker(name, keys)
+        return tracker
+
+
+def current(name, stamp):
+    """Stored version of a tracked source if `stamp` still matches, else None"""
+    with _trackers_lock:
+        tracker = _trackers.get(name)
+    return tracker.current(stamp) if tracker else None
+
+
+def validated(name, stamp_fn):
+    """Route decorator for a versioned payload whose source only changes when
+    stamp_fn() does (None if unknown). While the stamp matches the one last
+    recorded, If-None-Match or ?since=<current version> get 304 without the
+    view running, and respond() reuses the version without hashing."""
+    def decorator(view):
+        @httpcache.validated(lambda: current(name, g.version_stamp))
+        def checked(*args, **kwargs):
+            version = current(name, g.version_stamp)
+            if version is not None and request.args.get('since', '') == str(version):
+                return '', 304
+            return view(*args, **kwargs)
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                # Writes change the source; the next GET stamps it afresh
+                g.version_stamp = None
+                return view(*args, **kwargs)
+            g.version_stamp = stamp_fn()
+            return checked(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def history_size():
+    with _trackers_lock:
+        trackers = list(_trackers.values())
+    return {'entries': sum(len(t.diffs) for t in trackers), 'trackers': len(trackers)}
+
+
+def clear_history():
+    """Forget every tracker's diffs; clients get full payloads until new
+    versions are recorded"""
+    with _trackers_lock:
+        trackers = list(_trackers.values())
+    for tracker in trackers:
+        with tracker.lock:
+            tracker.diffs.clear()
+
+
+def respond(name, payload, keys=None):
+    """Route response for a versioned payload. Records it, then honours
+    ?since=<version>: 304 if unchanged, a delta if the history reaches back
+    that far, otherwise the full payload. Partial payloads (cut short by the
+    request deadline) are served as-is and never recorded. Under validated()
+    the payload is only hashed if its source stamp changed."""
+    if payload.get('partial'):
+        return jsonify(payload)
+    tracker = track(name, keys)
+    version = tracker.record(payload, g.get('version_stamp'))
+
+    since = request.args.get('since', '')
+    if since.isdigit():
+        delta = tracker.delta(int(since))
+        if delta is None:
+            return '', 304
+        if delta is not False:
+            return jsonify(dict(delta, version=version, since=int(since), delta=True))
+    httpcache.set_version(version)
+    return jsonify(dict(payload, version=version))
+
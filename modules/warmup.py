@@ -0,0 +1,113 @@
+"""
+Startup Warm-up - fill the caches before the first screen asks
+Modules register a warm-up task with task(); at launch start() runs every task
+concurrently in the background (upstream snapshots, the article pool and
+digest, the data files) and then starts the refreshers. /ready answers 503
+until every task has finished, or WARMUP_TIMEOUT has passed, so deploy.sh can
+wait for a warm server instead of sleeping.
+
+A task that fails still counts as finished: routes fall back to their
+stale/partial payloads and the refreshers keep retrying.
+"""
+
+import time
+import threading
+import traceback
+from flask import jsonify
+
+from config import WARMUP_TIMEOUT
+
+# name -> task state
+_tasks = {}
+_lock = threading.Lock()
+_state = {'started': None, 'finished': None, 'done': threading.Event()}
+
+
+def task(name, fn):
+    """Register fn to run once at startup. A falsy result or an exception
+    marks the cache as failed (the payload was empty or unavailable)."""
+    with _lock:
+        _tasks[name] = {'fn': fn, 'state': 'pending', 'seconds': None, 'error': None}
+
+
+def _run_task(name):
+    entry = _tasks[name]
+    start = time.perf_counter()
+    try:
+        entry['state'] = 'warm' if entry['fn']() else 'failed'
+    except Exception as e:
+        entry['state'] = 'failed'
+        entry['error'] = str(e)
+        print(f"Warm-up {name} failed: {e}")
+        traceback.print_exc()
+    finally:
+        entry['seconds'] = round(time.perf_counter() - start, 3)
+
+
+def run(timeout=None):
+    """Run every registered task concurrently; returns once all have finished
+    or `timeout` seconds (default WARMUP_TIMEOUT) have passed. Tasks still
+    running then carry on in the background."""
+    timeout = WARMUP_TIMEOUT / 1000 if timeout is None else timeout
+    _state['started'] = time.time()
+    with _lock:
+        names = list(_tasks)
+        for name in names:
+            _tasks[name].update(state='running', seconds=None, error=None)
+    threads = [threading.Thread(target=_run_task, args=(name,), name=f'warmup-{name}', daemon=True)
+               for name in names]
+    for thread in threads:
+        thread.start()
+    deadline = time.time() + timeout
+    for thread in threads:
+        thread.join(max(0, deadline - time.time()))
+    _state['finished'] = time.time()
+    _state['done'].set()
+    return get_status()
+
+
+def start(then=None):
+    """Run the warm-up in a background thread, calling then() (e.g.
+    start_refreshers) when it finishes"""
+    def warm():
+        run()
+        if then:
+            then()
+    threading.Thread(target=warm, name='warmup', daemon=True).start()
+
+
+def is_ready():
+    return _state['done'].is_set()
+
+
+def wait(timeout=None):
+    """Block until the warm-up has finished; True if it has"""
+    return _state['done'].wait(timeout)
+
+
+def get_status():
+    started, finished = _state['started'], _state['finished']
+    with _lock:
+        caches = {name: {'state': entry['state'], 'seconds': entry['seconds'], 'error': entry['error']}
+                  for name, entry in _tasks.items()}
+    return {
+        'ready': is_ready(),
+        'seconds': round((finished or time.time()) - started, 3) if started else None,
+        'caches': caches,
+    }
+
+
+def register_routes(app):
+    """Register /ready"""
+
+    @app.route('/ready')
+    def ready():
+        """200 once the startup warm-up has finished, 503 before; always lists
+        each cache's state and how long it took to warm"""
+        status = get_status()
+        response = jsonify(status)
+        if not status['ready']:
+            response.status_code = 503
+            response.headers['Retry-After'] = '1'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
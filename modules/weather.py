@@ -0,0 +1,108 @@
+"""
+Weather - current conditions and the next hours from Open-Meteo
+/weather answers within its request deadline from a shared upstream snapshot
+(modules/upstream.py); the same payload is the dashboard's weather widget.
+"""
+
+from datetime import datetime
+
+import pytz
+
+from config import WEATHER_LAT, WEATHER_LON, WEATHER_CITY, REFRESH_INTERVAL_WEATHER
+from . import upstream, deadline, versions, events
+
+WEATHER_URL = f"https://api.open-meteo.com/v1/forecast?latitude={WEATHER_LAT}&longitude={WEATHER_LON}&current=temperature_2m,weather_code,wind_speed_10m&hourly=temperature_2m,weather_code&forecast_days=2&timezone=America/Los_Angeles"
+PACIFIC_TZ = pytz.timezone('America/Los_Angeles')
+
+# A snapshot younger than half the refresh interval is served as-is, so every
+# screen (and every worker process) shares one upstream fetch
+WEATHER_FRESH_FOR = REFRESH_INTERVAL_WEATHER / 2000
+
+
+def get_weather():
+    """Current weather; served from the last good snapshot (stale: true) while
+    Open-Meteo is failing"""
+    weather, stale = upstream.serve('weather', fetch_weather, [WEATHER_URL], WEATHER_FRESH_FOR)
+    if weather is None:
+        error = upstream.get_breaker(WEATHER_URL).last_error or 'Weather unavailable'
+        return {'temp': '--', 'condition': '--', 'wind': '--', 'city': WEATHER_CITY, 'forecast': [], 'error': error}
+    return dict(weather, stale=stale)
+
+
+def fetch_weather():
+    """Fetch and parse the Open-Meteo forecast. Raises on failure."""
+    resp = upstream.get(WEATHER_URL, timeout=5)
+    resp.raise_for_status()
+    data = resp.json()
+
+    current = data.get('current', {})
+    hourly = data.get('hourly', {})
+
+    temp_f = round(current.get('temperature_2m', 0) * 9/5 + 32)
+    wind = current.get('wind_speed_10m', 0)
+    code = current.get('weather_code', 0)
+
+    now_pacific = datetime.now(PACIFIC_TZ)
+    hourly_times = hourly.get('time', [])
+    hourly_temps = hourly.get('temperature_2m', [])
+    hourly_codes = hourly.get('weather_code', [])
+
+    forecast = []
+
+    # Show the next 6 hours from now
+    # Times from API are now in local Pacific time
+    for i, t in enumerate(hourly_times):
+        dt_local = datetime.fromisoformat(t)
+        dt_local = PACIFIC_TZ.localize(dt_local)
+
+        # Only include hours that are >= now
+        if dt_local >= now_pacific:
+            temp_c = hourly_temps[i] if i < len(hourly_temps) else 0
+            forecast.append({
+                'time': dt_local.strftime('%I %p'),
+                'temp': round(temp_c * 9/5 + 32),
+                'code': hourly_codes[i] if i < len(hourly_codes) else 0
+            })
+            if len(forecast) >= 6:
+                break
+
+    conditions = {
+        0: "Clear", 1: "Mainly Clear", 2: "Partly Cloudy", 3: "Overcast",
+        45: "Fog", 48: "Fog",
+        51: "Drizzle", 53: "Drizzle", 55: "Drizzle",
+        61: "Rain", 63: "Rain", 65: "Rain",
+        71: "Snow", 73: "Snow", 75: "Snow",
+        80: "Showers", 81: "Showers", 82: "Showers",
+        95: "Thunderstorm", 96: "Thunderstorm"
+    }
+
+    return {
+        'temp': temp_f,
+        'condition': conditions.get(code, "Unknown"),
+        'wind': round(wind * 0.621371),
+        'city': WEATHER_CITY,
+        'forecast': forecast,
+        'error': None
+    }
+
+
+def partial_weather_payload(progress):
+    """/weather answer when the deadline hits: the last good snapshot, if any"""
+    snapshot = upstream.get_snapshot('weather')
+    if snapshot:
+        return dict(snapshot['value'], stale=True, partial=True)
+    return {'temp': '--', 'condition': '--', 'wind': '--', 'city': WEATHER_CITY, 'forecast': [],
+            'error': 'Still loading', 'partial': True}
+
+
+def register_routes(app):
+    """Register /weather, its dashboard widget, /events job and warm-up task"""
+    upstream.register_widget('weather', lambda progress: get_weather(), partial_weather_payload)
+    events.schedule_widget('weather', REFRESH_INTERVAL_WEATHER / 1000, only_when_watched=True)
+    upstream.warm_task('weather', lambda: get_weather()['error'] is None, REFRESH_INTERVAL_WEATHER / 1000)
+
+    @app.route('/weather')
+    @versions.validated('weather', lambda: upstream.fresh_stamp('weather', WEATHER_FRESH_FOR))
+    def weather():
+        payload, _ = deadline.run_within('weather', lambda progress: get_weather(), partial_weather_payload)
+        return versions.respond('weather', payload)
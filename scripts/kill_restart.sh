@@ -1,7 +1,12 @@
 #!/bin/bash
+cd /home/juanpaez/.nanobot/workspace/dev/srcc
+# Under the supervisor: start a new worker generation, no downtime
+if pgrep -f "modules.supervisor" > /dev/null; then
+    sudo python3 -m modules.supervisor reload
+    exit $?
+fi
 # Kill old process
 ps aux | grep "python app.py" | grep -v grep | awk '{print $2}' | xargs -r sudo kill
 sleep 1
 # Start new
-cd /home/juanpaez/.nanobot/workspace/dev/srcc
 sudo python app.py > /tmp/srcc.log 2>&1 &
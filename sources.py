@@ -2,21 +2,49 @@
 Modular News Source System for SRCC
 Easy to add/remove feeds, consistent data structure, versioned schemas
 """
-import requests
 import re
 import os
 import json
+import time
+import threading
 from datetime import datetime
 from abc import ABC, abstractmethod
+from config import (TEAM_FEEDS, SOURCE_POLL_MIN_INTERVAL, SOURCE_POLL_MAX_INTERVAL,
+                    SOURCE_POLL_DEFAULT_INTERVAL, SOURCE_SCHEDULER_TICK)
+from modules import upstream, metrics
+from modules.dedupe import dedupe_articles
+
+# Adaptive polling: aim to find about this many new items per poll
+TARGET_NEW_ITEMS_PER_POLL = 2
+# Weight of the newest observation in the publish-rate / latency averages
+EWMA_ALPHA = 0.3
+# Recent links remembered per source to tell new items from repeats
+SEEN_LINKS_PER_SOURCE = 200
 
 class NewsSource(ABC):
     """Base class for news sources"""
     
-    def __init__(self, name, url, category='general', enabled=True):
+    def __init__(self, name, url, category='general', enabled=True, team=None):
         self.name = name
         self.url = url
         self.category = category
         self.enabled = enabled
+        self.team = team  # TEAM_FEEDS key for team-specific feeds
+        self.last_error = None  # set by fetch() when it swallows an exception
+        self.articles = []      # articles from the last successful poll
+        self.seen_links = []    # recent links, oldest first
+        self.state = {
+            'interval': SOURCE_POLL_DEFAULT_INTERVAL / 1000,  # seconds
+            'last_poll': None,
+            'next_poll': 0,
+            'polls': 0,
+            'errors': 0,
+            'consecutive_errors': 0,
+            'latency_ms': None,
+            'publish_rate': None,  # new items per hour (EWMA)
+            'last_new_at': None,
+            'last_error': None,
+        }
     
     @abstractmethod
     def fetch(self, max_items=10):
@@ -32,6 +60,96 @@ class NewsSource(ABC):
     def get_source_badge(self):
         """Get a short badge for the source"""
         return self.name[:12]
+    
+    def is_due(self, now=None):
+        """Whether the scheduler should poll this source now"""
+        return self.enabled and (now or time.time()) >= self.state['next_poll']
+    
+    def poll(self, max_items=10):
+        """Fetch articles, record latency/errors/new items and adapt the poll interval"""
+        self.last_error = None
+        start = time.time()
+        articles = self.fetch(max_items)
+        latency_ms = (time.time() - start) * 1000
+        
+        state = self.state
+        elapsed = start - state['last_poll'] if state['last_poll'] else None
+        state['polls'] += 1
+        state['last_poll'] = start
+        state['latency_ms'] = round(latency_ms if state['latency_ms'] is None else
+                                    EWMA_ALPHA * latency_ms + (1 - EWMA_ALPHA) * state['latency_ms'], 1)
+        
+        failed = self.last_error is not None
+        new_items = 0
+        if failed:
+            state['errors'] += 1
+            state['consecutive_errors'] += 1
+            state['last_error'] = self.last_error
+        else:
+            state['consecutive_errors'] = 0
+            seen = set(self.seen_links)
+            for article in articles:
+                if article['link'] not in seen:
+                    new_items += 1
+                    self.seen_links.append(article['link'])
+            del self.seen_links[:-SEEN_LINKS_PER_SOURCE]
+            if new_items:
+                state['last_new_at'] = start
+            self.articles = articles
+        
+        state['interval'] = adapt_interval(state, new_items, elapsed, failed)
+        state['next_poll'] = start + state['interval']
+        return articles
+    
+    def get_status(self, now=None):
+        """Polling plan and observed behaviour for /sources/status"""
+        now = now or time.time()
+        state = self.state
+        return {
+            'name': self.name,
+            'category': self.category,
+            'url': self.url,
+            'enabled': self.enabled,
+            'interval_s': round(state['interval']),
+            'next_poll_in_s': max(0, round(state['next_poll'] - now)),
+            'last_poll': datetime.fromtimestamp(state['last_poll']).isoformat(timespec='seconds') if state['last_poll'] else None,
+            'polls': state['polls'],
+            'errors': state['errors'],
+            'error_rate': round(state['errors'] / state['polls'], 3) if state['polls'] else 0,
+            'latency_ms': state['latency_ms'],
+            'publish_rate_per_hour': state['publish_rate'],
+            'last_error': state['last_error'],
+            'articles': len(self.articles),
+        }
+
+
+def adapt_interval(state, new_items, elapsed, failed):
+    """Next poll interval (seconds) for a source, kept within the configured bounds.
+    Failures back off exponentially from the default interval (so a long quiet
+    interval isn't compounded); polls with nothing new back off gently;
+    otherwise the interval tracks the observed publish rate."""
+    min_interval = SOURCE_POLL_MIN_INTERVAL / 1000
+    max_interval = SOURCE_POLL_MAX_INTERVAL / 1000
+    interval = state['interval']
+    
+    if failed:
+        interval = SOURCE_POLL_DEFAULT_INTERVAL / 1000 * 2 ** min(state['consecutive_errors'], 5)
+    elif elapsed is None:
+        pass  # first poll - nothing to compare against yet
+    elif new_items == 0:
+        interval *= 1.5
+        if state['publish_rate'] is not None:
+            state['publish_rate'] = round((1 - EWMA_ALPHA) * state['publish_rate'], 3)
+    else:
+        rate = new_items / elapsed * 3600  # items per hour
+        if state['publish_rate'] is None:
+            state['publish_rate'] = round(rate, 3)
+        else:
+            state['publish_rate'] = round(EWMA_ALPHA * rate + (1 - EWMA_ALPHA) * state['publish_rate'], 3)
+        if state['publish_rate'] > 0:
+            interval = TARGET_NEW_ITEMS_PER_POLL / state['publish_rate'] * 3600
+    
+    return max(min_interval, min(max_interval, interval))
 
 
 class RSSSource(NewsSource):
@@ -39,7 +157,7 @@ class RSSSource(NewsSource):
     
     def fetch(self, max_items=10):
         try:
-            resp = requests.get(self.url, timeout=8)
+            resp = upstream.get(self.url, timeout=8)
             content = resp.text
             
             articles = []
@@ -79,6 +197,7 @@ class RSSSource(NewsSource):
             
             return articles
         except Exception as e:
+            self.last_error = str(e)
             print(f"Error fetching {self.name}: {e}")
             return []
 
@@ -89,12 +208,12 @@ class HackerNewsSource(NewsSource):
     def fetch(self, max_items=10):
         try:
             # Use HN Firebase API
-            resp = requests.get(f"https://hacker-news.firebaseio.com/v0/topstories.json", timeout=10)
+            resp = upstream.get(f"https://hacker-news.firebaseio.com/v0/topstories.json", timeout=10)
             story_ids = resp.json()[:max_items]
             
             articles = []
             for story_id in story_ids:
-                story_resp = requests.get(f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json", timeout=5)
+                story_resp = upstream.get(f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json", timeout=5)
                 story = story_resp.json()
                 
                 if story and story.get('title'):
@@ -110,6 +229,7 @@ class HackerNewsSource(NewsSource):
             
             return articles
         except Exception as e:
+            self.last_error = str(e)
             print(f"Error fetching HN: {e}")
             return []
 
@@ -117,13 +237,13 @@ class HackerNewsSource(NewsSource):
 class APISource(NewsSource):
     """Generic API source (for future use)"""
     
-    def __init__(self, name, url, category='general', enabled=True, headers=None):
-        super().__init__(name, url, category, enabled)
+    def __init__(self, name, url, category='general', enabled=True, headers=None, team=None):
+        super().__init__(name, url, category, enabled, team)
         self.headers = headers or {}
     
     def fetch(self, max_items=10):
         try:
-            resp = requests.get(self.url, headers=self.headers, timeout=10)
+            resp = upstream.get(self.url, headers=self.headers, timeout=10)
             data = resp.json()
             
             # Override in subclass for specific API formats
@@ -140,13 +260,13 @@ class APISource(NewsSource):
                 })
             return articles
         except Exception as e:
+            self.last_error = str(e)
             print(f"Error fetching {self.name}: {e}")
             return []
 
 
 # Source registry - add new sources here
-def get_all_sources():
-    """Get all configured news sources"""
+def _build_sources():
     return [
         # Tech sources
         RSSSource('TechCrunch', 'https://techcrunch.com/feed/', 'tech'),
@@ -167,6 +287,64 @@ def get_all_sources():
         # Soccer
         RSSSource('Goal.com', 'https://www.goal.com/en-us/feeds/rss/news', 'soccer'),
         RSSSource('ESPN Soccer', 'https://www.espn.com/soccer/rss/_/league/all', 'soccer'),
+    ] + get_team_sources()
+
+
+# Sources are long-lived so their polling state survives between fetches
+_sources = None
+_sources_lock = threading.Lock()
+SOURCES_STATE_FILE = os.path.join(os.path.dirname(__file__), 'data', 'sources_state.json')
+
+def get_all_sources():
+    """Get all configured news sources"""
+    global _sources
+    with _sources_lock:
+        if _sources is None:
+            _sources = _build_sources()
+            load_source_state(_sources)
+        return _sources
+
+
+def load_source_state(sources):
+    """Restore polling state and last articles saved by save_source_state()"""
+    if not os.path.exists(SOURCES_STATE_FILE):
+        return
+    try:
+        with metrics.timed_json('sources_state', 'load'), open(SOURCES_STATE_FILE, 'r') as f:
+            saved = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return
+    for source in sources:
+        entry = saved.get(source.url)
+        if entry:
+            source.state.update(entry.get('state', {}))
+            source.seen_links = entry.get('seen_links', [])
+            source.articles = entry.get('articles', [])
+
+
+def save_source_state(sources=None):
+    """Persist each source's polling state so restarts keep the learned schedule"""
+    sources = sources or get_all_sources()
+    os.makedirs(os.path.dirname(SOURCES_STATE_FILE), exist_ok=True)
+    tmp_file = SOURCES_STATE_FILE + '.tmp'
+    with metrics.timed_json('sources_state', 'save'), open(tmp_file, 'w') as f:
+        json.dump({
+            source.url: {
+                'state': source.state,
+                'seen_links': source.seen_links,
+                'articles': source.articles,
+            }
+            for source in sources
+        }, f)
+    os.replace(tmp_file, SOURCES_STATE_FILE)
+
+
+def get_team_sources():
+    """Team-specific feeds from config.TEAM_FEEDS"""
+    return [
+        RSSSource(team['name'], url, 'teams', team=key)
+        for key, team in TEAM_FEEDS.items()
+        for url in team.get('feeds', [])
     ]
 
 
@@ -182,60 +360,138 @@ def get_sources_by_category():
     return by_category
 
 
-def fetch_all_articles(max_per_source=5):
-    """Fetch articles from all enabled sources"""
-    sources = get_all_sources()
+# Article pipeline hooks - called with every freshly fetched batch of articles
+# (after dedupe). Modules use this to archive, index or tag articles.
+_article_hooks = []
+
+def register_article_hook(fn):
+    """Register fn(articles) to run on every fetched batch"""
+    if fn not in _article_hooks:
+        _article_hooks.append(fn)
+
+
+def run_article_hooks(articles):
+    """Pass a batch of articles through every registered hook"""
+    for hook in _article_hooks:
+        try:
+            hook(articles)
+        except Exception as e:
+            print(f"Article hook {getattr(hook, '__name__', hook)} failed: {e}")
+
+
+# Only one thread polls sources at a time (scheduler vs. a cold cache read)
+_poll_lock = threading.Lock()
+
+def _assemble_articles(sources):
+    """Merge every source's latest articles into the shared pool"""
     all_articles = []
     seen_titles = set()
     
     for source in sources:
         if source.enabled:
-            articles = source.fetch(max_per_source)
-            for article in articles:
+            for article in source.articles:
+                # Tag a copy - source.articles stays as fetched
+                article = dict(article)
+                if source.team:
+                    article['teams'] = [source.team]
                 # Dedupe by title
                 if article['title'] not in seen_titles:
                     all_articles.append(article)
                     seen_titles.add(article['title'])
     
+    # Collapse the same story reported by several sources
+    all_articles = dedupe_articles(all_articles)
+    run_article_hooks(all_articles)
     return all_articles
 
 
+def fetch_all_articles(max_per_source=5):
+    """Fetch articles from all enabled sources"""
+    sources = get_all_sources()
+    with _poll_lock:
+        for source in sources:
+            if source.enabled:
+                source.poll(max_per_source)
+        save_source_state(sources)
+        return _assemble_articles(sources)
+
+
+def refresh_articles(max_per_source=5):
+    """Scheduler tick: poll only the sources that are due, then rebuild the
+    article cache if anything was polled. Returns the number of sources polled."""
+    sources = get_all_sources()
+    now = time.time()
+    with _poll_lock:
+        due = [s for s in sources if s.is_due(now)]
+        for source in due:
+            source.poll(max_per_source)
+        
+        # Keep the cache file inside get_cached_articles()' one-hour window even
+        # when every source is backing off
+        cache_age = now - os.path.getmtime(CACHE_FILE) if os.path.exists(CACHE_FILE) else None
+        if due or cache_age is None:
+            write_article_cache(_assemble_articles(sources))
+        elif cache_age > 1800:
+            # Nothing new: re-stamp the pool rather than re-running the hooks
+            write_article_cache(read_article_cache()[0])
+        if due:
+            save_source_state(sources)
+    return len(due)
+
+
+def get_polling_plan():
+    """Current polling plan for every source, soonest first"""
+    now = time.time()
+    return sorted((s.get_status(now) for s in get_all_sources()), key=lambda s: s['next_poll_in_s'])
+
+
 # Cache management
 CACHE_FILE = os.path.join(os.path.dirname(__file__), 'data', 'sources_cache.json')
 
-def get_cached_articles(max_per_source=5, max_total=30):
-    """Get articles with caching (for daily digest)"""
-    cache_age = None
-    
-    # Check cache
+def read_article_cache():
+    """Read the article cache without fetching. Returns (articles, age_seconds),
+    or ([], None) if there is no usable cache."""
     if os.path.exists(CACHE_FILE):
         try:
-            with open(CACHE_FILE, 'r') as f:
+            with metrics.timed_json('sources_cache', 'load'), open(CACHE_FILE, 'r') as f:
                 cached = json.load(f)
             
             cached_time = datetime.fromisoformat(cached.get('cached_at', '2000-01-01'))
             cache_age = (datetime.now() - cached_time).total_seconds()
-            
-            # Return cached if less than 1 hour old
-            if cache_age < 3600:
-                articles = cached.get('articles', [])
-                # Limit total
-                return articles[:max_total]
+            return cached.get('articles', []), cache_age
         except:
             pass
+    return [], None
+
+
+def get_cached_articles(max_per_source=5, max_total=30):
+    """Get articles with caching (for daily digest)"""
+    articles, cache_age = read_article_cache()
+    
+    # Return cached if less than 1 hour old
+    fresh = cache_age is not None and cache_age < 3600
+    metrics.cache_result('articles', fresh)
+    if fresh:
+        # Limit total
+        return articles[:max_total]
     
     # Fetch fresh
     articles = fetch_all_articles(max_per_source)
+    write_article_cache(articles)
     
-    # Cache it
+    return articles[:max_total]
+
+
+def write_article_cache(articles):
+    """Write the shared article pool to the cache file"""
     os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
-    with open(CACHE_FILE, 'w') as f:
+    tmp_file = CACHE_FILE + '.tmp'
+    with metrics.timed_json('sources_cache', 'save'), open(tmp_file, 'w') as f:
         json.dump({
             'cached_at': datetime.now().isoformat(),
             'articles': articles
         }, f)
-    
-    return articles[:max_total]
+    os.replace(tmp_file, CACHE_FILE)
 
 
 def clear_cache():
@@ -243,3 +499,19 @@ def clear_cache():
     if os.path.exists(CACHE_FILE):
         os.remove(CACHE_FILE)
     return True
+
+
+def register_routes(app):
+    """Register the source status route and the adaptive polling scheduler"""
+    from flask import jsonify
+    from modules import refresh, memory
+    refresh.schedule('sources', refresh_articles, SOURCE_SCHEDULER_TICK / 1000, primary_only=True)
+    memory.register_cache('article_pool', lambda: {'entries': sum(len(s.articles) for s in get_all_sources())})
+
+    @app.route('/sources/status')
+    def sources_status():
+        """Per-source polling plan and observed publish/error rates"""
+        return jsonify({
+            'sources': get_polling_plan(),
+            'scheduler': refresh.get_status().get('sources')
+        })
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Unit tests for admission control: token buckets, queueing and 429s."""
+
+import time
+import threading
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+
+from modules import admission
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test bucket refill and wait estimates."""
+
+    def test_burst_then_refill(self):
+        """A full bucket should allow `burst` requests, then refill at `rate`."""
+        bucket = admission.TokenBucket(rate=2, burst=3)
+        now = bucket.stamp
+        self.assertEqual([bucket.take(now) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(bucket.take(now), 0.5)
+        self.assertEqual(bucket.take(now + 0.5), 0)
+        self.assertEqual(bucket.take(now + 100) + bucket.take(now + 100), 0)
+
+
+class TestGate(unittest.TestCase):
+    """Test the concurrency limit and queue shedding."""
+
+    def test_sheds_when_expected_wait_exceeds_slo(self):
+        """With the slot busy and slow service, a newcomer should be turned away at once."""
+        gate = admission.Gate(limit=1, slo=0.1)
+        self.assertEqual(gate.enter()[0], True)
+        gate.service = 1.0
+        start = time.monotonic()
+        self.assertEqual(gate.enter(), (False, 0))
+        self.assertLess(time.monotonic() - start, 0.05)
+
+    def test_queued_request_gets_freed_slot(self):
+        """A queued request should run as soon as a slot frees up."""
+        gate = admission.Gate(limit=1, slo=1)
+        gate.enter()
+        threading.Timer(0.05, gate.leave, args=(0.05,)).start()
+        admitted, waited = gate.enter()
+        self.assertTrue(admitted)
+        self.assertGreater(waited, 0.03)
+        self.assertEqual(gate.active, 1)
+
+
+class TestAdmissionRoute(unittest.TestCase):
+    """Test the before_request hook on a small app."""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        admission.register(self.app)
+
+        @self.app.route('/ping', methods=['GET', 'POST'])
+        def ping():
+            return 'pong'
+        policies = {'ping': admission.Policy('ping', methods=('POST',), client=(60, 2), route=(600, 100),
+                                             concurrency=1)}
+        patcher = patch.dict(admission._policies, policies, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = self.app.test_client()
+
+    def test_client_over_its_bucket_gets_429(self):
+        """The third POST in a burst of two should be rejected with Retry-After."""
+        statuses = [self.client.post('/ping').status_code for _ in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+        response = self.client.post('/ping')
+        self.assertEqual(response.headers['Retry-After'], '1')
+        self.assertEqual(response.get_json()['reason'], admission.CLIENT_LIMITED)
+        # Other clients and other methods are unaffected
+        self.assertEqual(self.client.post('/ping', environ_base={'REMOTE_ADDR': '10.0.0.2'}).status_code, 200)
+        self.assertEqual(self.client.get('/ping').status_code, 200)
+
+        status = self.client.get('/admission/status').get_json()['ping']
+        self.assertEqual(status['active'], 0)
+        self.assertGreaterEqual(status['results'][admission.CLIENT_LIMITED], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
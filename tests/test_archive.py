@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Unit tests for the article archive and its inverted index."""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+from modules import archive as archive_module
+
+
+def make_article(n, title, summary=''):
+    return {'title': title, 'link': f'https://example.com/{n}', 'source': 'BBC', 'category': 'world', 'summary': summary}
+
+
+class ArchiveTestCase(unittest.TestCase):
+    """Create an archive in a temporary directory."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'archive.jsonl')
+        self.archive = archive_module.ArticleArchive(self.path, retention_days=30, max_bytes=1024 * 1024)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+
+class TestArchiveSearch(ArchiveTestCase):
+    """Test indexing and ranked search."""
+
+    def test_search_ranks_title_matches_first(self):
+        """Title matches should outrank summary-only matches."""
+        self.archive.add_articles([
+            make_article(1, 'Markets rally on earnings', 'Storm warnings issued for coast'),
+            make_article(2, 'Storm hits the coast', 'Thousands without power'),
+            make_article(3, 'Local team wins', ''),
+        ])
+        results = self.archive.search('storm')
+        self.assertEqual([r['link'] for r in results], ['https://example.com/2', 'https://example.com/1'])
+        self.assertGreater(results[0]['score'], results[1]['score'])
+
+    def test_all_terms_preferred_over_any(self):
+        """Documents matching every term should be returned when they exist."""
+        self.archive.add_articles([
+            make_article(1, 'Real Madrid win again'),
+            make_article(2, 'Madrid weather update'),
+        ])
+        results = self.archive.search('real madrid')
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['link'], 'https://example.com/1')
+
+    def test_duplicate_links_are_skipped(self):
+        """Articles already archived should not be added twice."""
+        self.assertEqual(self.archive.add_articles([make_article(1, 'Hello world')]), 1)
+        self.assertEqual(self.archive.add_articles([make_article(1, 'Hello world')]), 0)
+
+
+class TestArchiveRetention(ArchiveTestCase):
+    """Test age and size limits and persistence."""
+
+    def test_reload_from_disk(self):
+        """A fresh archive should load previously archived articles."""
+        self.archive.add_articles([make_article(1, 'Election results announced')])
+        reloaded = archive_module.ArticleArchive(self.path)
+        self.assertEqual(len(reloaded.search('election')), 1)
+
+    def test_expired_articles_are_dropped(self):
+        """Articles older than the retention window should not be loaded."""
+        with open(self.path, 'w') as f:
+            old = make_article(1, 'Ancient news')
+            old.update({'id': 0, 'archived_at': time.time() - 31 * 86400})
+            f.write(json.dumps(old) + '\n')
+        self.assertEqual(self.archive.search('ancient'), [])
+        self.assertEqual(self.archive.stats()['articles'], 0)
+
+    def test_size_limit_evicts_oldest(self):
+        """Exceeding max_bytes should evict the oldest articles and their postings."""
+        self.archive.max_bytes = 2000
+        self.archive.add_articles([make_article(i, f'Story number {i} about zebras') for i in range(50)])
+        stats = self.archive.stats()
+        self.assertLessEqual(stats['bytes'], 2000)
+        self.assertLess(stats['articles'], 50)
+        self.assertNotIn(0, self.archive.docs)
+        self.assertTrue(all(doc_id in self.archive.docs for doc_id in self.archive.index['zebras']))
+
+
+class TestNewsSearchRoute(unittest.TestCase):
+    """Test the /news/search endpoint."""
+
+    def setUp(self):
+        from app import app
+        self.client = app.test_client()
+
+    def test_missing_query_returns_400(self):
+        """/news/search without q should be rejected."""
+        response = self.client.get('/news/search')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
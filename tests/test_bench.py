@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Unit tests for the benchmark harness and stub upstreams."""
+
+import io
+import json
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+
+import requests
+
+from bench import datagen, kiosks, run, scaling, stubs
+from modules import life, upstream
+
+
+class TestHarness(unittest.TestCase):
+    """Test the statistics and regression check."""
+
+    def test_percentiles(self):
+        """Nearest-rank percentiles over 1..100."""
+        samples = list(range(100, 0, -1))
+        self.assertEqual(run.percentile(samples, 50), 50)
+        self.assertEqual(run.percentile(samples, 95), 95)
+        self.assertEqual(run.percentile(samples, 99), 99)
+
+    def test_main_benchmarks_every_route(self):
+        """A one-iteration run against the stubs should time every route, /ready included."""
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(io.StringIO()):
+            self.assertEqual(run.main(['--iterations', '1', '--concurrency', '1', '--skip-functions',
+                                       '--latency', '0']), 0)
+        results = json.loads(output.getvalue())['results']
+        self.assertIn('GET /ready', results)
+        self.assertIn('GET /dashboard', results)
+
+    def test_compare_flags_p95_regressions(self):
+        """Only benchmarks slower than the ratio should be reported."""
+        baseline = {'GET /a': {'p95': 10.0}, 'GET /b': {'p95': 10.0}}
+        results = {'GET /a': {'p95': 11.0}, 'GET /b': {'p95': 15.0}, 'GET /new': {'p95': 1.0}}
+        self.assertEqual(run.compare(results, baseline), [('GET /b', 10.0, 15.0)])
+
+
+class TestKiosks(unittest.TestCase):
+    """Test the server-side summary built from two /metrics scrapes."""
+
+    def test_metrics_deltas(self):
+        """Only what happened between the scrapes counts; /metrics itself is ignored."""
+        before = kiosks.parse_metrics(
+            'srcc_http_request_duration_seconds_bucket{endpoint="stats",le="0.005"} 10\n'
+            'srcc_http_request_duration_seconds_bucket{endpoint="stats",le="+Inf"} 10\n'
+            'srcc_upstream_request_duration_seconds_count{host="a.com"} 4\n')
+        after = kiosks.parse_metrics(
+            '# TYPE srcc_http_request_duration_seconds histogram\n'
+            'srcc_http_request_duration_seconds_bucket{endpoint="stats",le="0.005"} 28\n'
+            'srcc_http_request_duration_seconds_bucket{endpoint="stats",le="+Inf"} 30\n'
+            'srcc_http_request_duration_seconds_bucket{endpoint="metrics",le="+Inf"} 2\n'
+            'srcc_upstream_request_duration_seconds_count{host="a.com"} 9\n')
+        summary = kiosks.server_summary(before, after, client_requests=20)
+        self.assertEqual(summary['requests'], 20)
+        self.assertEqual(summary['p50_ms_upper'], 5.0)
+        self.assertIsNone(summary['p99_ms_upper'])
+        self.assertEqual(summary['upstream_calls_per_request'], 0.25)
+        self.assertEqual(summary['upstream_calls_by_host'], {'a.com': 5})
+
+
+class TestDataGenerator(unittest.TestCase):
+    """Test the synthetic data is realistic and reproducible."""
+
+    def test_generated_data_is_valid_and_deterministic(self):
+        """Same seed, same data; life.json should pass schema normalization untouched."""
+        data = datagen.generate_data(users=3, days=60, chores=25, seed=7)
+        self.assertEqual(data, datagen.generate_data(users=3, days=60, chores=25, seed=7))
+        self.assertEqual(len(data['chores']), 25)
+        self.assertEqual(set(data['telemetry']), {'User1', 'User2', 'User3'})
+
+        life_data = datagen.generate_life(days=60)
+        _, issues = life.normalize_life_data(life_data)
+        self.assertEqual(issues, [])
+        self.assertTrue(life_data['fitness']['workouts'])
+
+    def test_growth_slope(self):
+        """A cost that grows 100x over a 10x size change has slope 2."""
+        points = [{'size': 10, 'results': {'f': {'p50': 1.0, 'peak_kb': 5.0}}},
+                  {'size': 100, 'results': {'f': {'p50': 100.0, 'peak_kb': 50.0}}}]
+        self.assertEqual(scaling.growth(points), {'f': {'latency_slope': 2.0, 'memory_slope': 1.0,
+                                                        'superlinear': True}})
+
+
+class TestStubUpstreams(unittest.TestCase):
+    """Test the stub server stands in for real upstreams."""
+
+    def test_redirected_fetch_hits_the_stub(self):
+        """upstream.get() should reach the stub, keyed by the original host."""
+        upstream._breakers.clear()
+        with stubs.StubUpstreams(latency=0) as stub, stubs.redirect(stub):
+            resp = upstream.get('https://query1.finance.yahoo.com/v8/finance/chart/MSFT?interval=1d', timeout=5)
+            feed = upstream.get('https://feeds.bbci.co.uk/news/world/rss.xml', timeout=5).text
+        self.assertEqual(resp.json()['chart']['result'][0]['meta']['symbol'], 'MSFT')
+        self.assertIn('<item>', feed)
+        self.assertEqual(stub.hits, {'query1.finance.yahoo.com': 1, 'feeds.bbci.co.uk': 1})
+        self.assertIs(requests.get, stubs.requests.get)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Unit tests for upstream record/replay."""
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import requests
+
+from modules import cassette, upstream
+
+
+def fake_response(body, status=200, content_type='application/json'):
+    return MagicMock(status_code=status, content=body.encode(),
+                     headers={'Content-Type': content_type, 'Set-Cookie': 'id=1'})
+
+
+class TestCassettes(unittest.TestCase):
+    """Record through upstream.get(), then replay with no network."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.previous = cassette.cassettes
+        self.addCleanup(setattr, cassette, 'cassettes', self.previous)
+        upstream._breakers.clear()
+        self.addCleanup(upstream._breakers.clear)
+
+    @patch('modules.upstream.requests.get')
+    def test_recorded_responses_replay_in_order(self, mock_get):
+        """Replays should match what was recorded, cycling per URL; query order doesn't matter."""
+        cassette.use('record', self.dir)
+        mock_get.side_effect = [fake_response('{"n": 1}'), fake_response('{"n": 2}')]
+        upstream.get('https://api.example.com/v1/data?b=2&a=1', timeout=5)
+        upstream.get('https://api.example.com/v1/data?b=2&a=1', timeout=5)
+
+        mock_get.reset_mock(side_effect=True)
+        tape = cassette.use('replay', self.dir, latency_scale=0)
+        replies = [upstream.get('https://api.example.com/v1/data?a=1&b=2', timeout=5) for _ in range(3)]
+        mock_get.assert_not_called()
+        self.assertEqual([r.json()['n'] for r in replies], [1, 2, 1])
+        self.assertEqual(replies[0].headers['content-type'], 'application/json')
+        self.assertNotIn('Set-Cookie', replies[0].headers)
+        self.assertEqual(tape.get_status()['replayed'], 3)
+
+    @patch('modules.upstream.requests.get')
+    def test_failures_and_misses_replay_as_errors(self, mock_get):
+        """A recorded failure is raised again; an unrecorded URL looks unreachable."""
+        cassette.use('record', self.dir)
+        mock_get.side_effect = requests.exceptions.ConnectTimeout('slow')
+        with self.assertRaises(requests.exceptions.ConnectTimeout):
+            upstream.get('https://down.example.com/feed', timeout=5)
+
+        cassette.use('replay', self.dir, latency_scale=0)
+        with self.assertRaises(requests.exceptions.ConnectTimeout):
+            upstream.get('https://down.example.com/feed', timeout=5)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            upstream.get('https://never.example.com/', timeout=5)
+        self.assertEqual(upstream.get_breaker('https://never.example.com/').failures, 1)
+
+    @patch('modules.cassette.COMPACT_EVERY', 4)
+    @patch('modules.upstream.requests.get')
+    def test_recording_keeps_only_the_newest_per_url(self, mock_get):
+        """A long recording session should not grow the host file past CASSETTE_KEEP per URL."""
+        tape = cassette.use('record', self.dir)
+        tape.keep = 2
+        mock_get.side_effect = [fake_response(f'{{"n": {n}}}') for n in range(8)]
+        for _ in range(8):
+            upstream.get('https://api.example.com/v1/data', timeout=5)
+        path = cassette._host_file(self.dir, 'https://api.example.com/v1/data')
+        with open(path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        mock_get.reset_mock(side_effect=True)
+        cassette.use('replay', self.dir, latency_scale=0)
+        replies = [upstream.get('https://api.example.com/v1/data', timeout=5) for _ in range(2)]
+        self.assertEqual([r.json()['n'] for r in replies], [6, 7])
+
+    def test_replayed_latency_respects_the_timeout(self):
+        """A recording slower than the caller's timeout should time out."""
+        tape = cassette.Cassettes('replay', self.dir, latency_scale=1000)
+        with patch.object(tape, 'next_recording', return_value={'elapsed_ms': 10, 'status': 200, 'headers': {},
+                                                                 'body': ''}):
+            with self.assertRaises(requests.exceptions.ReadTimeout):
+                tape.fetch('https://slow.example.com/', timeout=0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,7 +14,12 @@ BASE_URL = "http://localhost:80"
 # Key endpoints that must work
 ENDPOINTS = [
     ("/", "Main dashboard HTML"),
+    ("/dashboard", "All widgets in one bundle"),
     ("/stats", "System stats (cpu, memory, uptime, last_tend_time)"),
+    ("/stats/history", "Downsampled system stats history"),
+    ("/metrics", "Prometheus metrics"),
+    ("/debug/memory", "Memory diagnostics"),
+    ("/ready", "Startup warm-up state"),
     ("/stocks", "Stock prices"),
     ("/weather", "Weather data"),
     ("/digest", "News digest"),
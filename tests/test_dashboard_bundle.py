@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Unit tests for the /dashboard widget bundle."""
+
+import json
+import unittest
+from unittest.mock import patch
+
+from modules import dashboard
+
+
+class BundleTestCase(unittest.TestCase):
+    """Swap in a private widget registry for each test."""
+
+    def setUp(self):
+        self.original_widgets = dashboard._widgets
+        dashboard._widgets = {}
+
+    def tearDown(self):
+        dashboard._widgets = self.original_widgets
+
+
+class TestBuildBundle(BundleTestCase):
+    """Test building widgets in one pass."""
+
+    def test_documents_are_loaded_once(self):
+        """Widgets sharing a document should trigger a single load."""
+        loads = []
+
+        def load():
+            loads.append(1)
+            return {'chores': ['feed horses']}
+        dashboard.register_widget('a', lambda docs: (docs.get('data', load)['chores'], 1.0))
+        dashboard.register_widget('b', lambda docs: (len(docs.get('data', load)['chores']), 2.0))
+
+        bundle = dashboard.build_bundle()
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(bundle['widgets']['a'], {'data': ['feed horses'], 'updated': 1.0})
+        self.assertEqual(bundle['widgets']['b']['data'], 1)
+
+    @patch.dict('modules.dashboard.FEATURES', {'weather': False})
+    def test_disabled_widgets_are_skipped(self):
+        """A widget whose feature is off should not be built at all."""
+        built = []
+        dashboard.register_widget('weather', lambda docs: built.append(1), feature='weather',
+                                  prefetch=lambda: built.append(1))
+        self.assertEqual(dashboard.build_bundle()['widgets'], {})
+        self.assertEqual(built, [])
+
+    def test_failing_widget_does_not_break_bundle(self):
+        """One widget raising should be reported without losing the others."""
+        def broken(docs):
+            raise IOError('disk')
+        dashboard.register_widget('broken', broken)
+        dashboard.register_widget('ok', lambda docs: ('fine', None))
+
+        widgets = dashboard.build_bundle()['widgets']
+        self.assertEqual(widgets['broken']['error'], 'disk')
+        self.assertEqual(widgets['ok']['data'], 'fine')
+
+
+class TestDashboardRoute(unittest.TestCase):
+    """Test the /dashboard route against the real app."""
+
+    def setUp(self):
+        from app import app
+        self.client = app.test_client()
+
+    def test_widget_filter(self):
+        """?widgets= should limit the bundle to the named widgets."""
+        response = self.client.get('/dashboard?widgets=stats,chores')
+        self.assertEqual(response.status_code, 200)
+        bundle = json.loads(response.data)
+        self.assertEqual(set(bundle['widgets']), {'stats', 'chores'})
+        self.assertIn('cpu', bundle['widgets']['stats']['data'])
+        self.assertIn('features', bundle)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Unit tests for request deadlines and partial responses."""
+
+import time
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+
+import requests
+
+from modules import deadline, upstream
+
+
+class TestDeadlineContext(unittest.TestCase):
+    """Test the per-context deadline."""
+
+    def test_no_deadline_by_default(self):
+        """Without a deadline nothing should expire."""
+        self.assertIsNone(deadline.remaining())
+        self.assertFalse(deadline.expired())
+
+    def test_expired_deadline_marks_partial(self):
+        """check() should raise once the budget is spent."""
+        token = deadline.start(0)
+        try:
+            with self.assertRaises(deadline.DeadlineExceeded):
+                deadline.check()
+            self.assertTrue(deadline.is_partial())
+        finally:
+            deadline.stop(token)
+        self.assertFalse(deadline.is_partial())
+
+
+class TestRunWithin(unittest.TestCase):
+    """Test deadline-bound background work."""
+
+    def test_fast_work_returns_result(self):
+        """Work that finishes in time should return its result."""
+        token = deadline.start(1)
+        try:
+            result, partial = deadline.run_within('fast', lambda progress: 'done', lambda progress: 'partial')
+        finally:
+            deadline.stop(token)
+        self.assertEqual((result, partial), ('done', False))
+
+    def test_slow_work_returns_progress_and_keeps_running(self):
+        """Slow work should yield what it has so far and still finish."""
+        finished = threading.Event()
+
+        def slow(progress):
+            progress.append('first')
+            time.sleep(0.2)
+            progress.append('second')
+            finished.set()
+            return progress
+
+        token = deadline.start(0.05)
+        try:
+            result, partial = deadline.run_within('slow', slow, lambda progress: progress)
+        finally:
+            deadline.stop(token)
+        self.assertTrue(partial)
+        self.assertEqual(result, ['first'])
+        self.assertTrue(finished.wait(2))
+
+
+class TestUpstreamDeadline(unittest.TestCase):
+    """Test that upstream calls respect the deadline."""
+
+    def setUp(self):
+        upstream._breakers.clear()
+
+    def tearDown(self):
+        upstream._breakers.clear()
+
+    @patch('modules.upstream.requests.get')
+    def test_timeout_is_clamped(self, mock_get):
+        """The request timeout should shrink to the remaining budget."""
+        mock_get.return_value = MagicMock(status_code=200)
+        token = deadline.start(0.5)
+        try:
+            upstream.get('https://example.com/feed', timeout=5)
+        finally:
+            deadline.stop(token)
+        self.assertLessEqual(mock_get.call_args.kwargs['timeout'], 0.5)
+
+    @patch('modules.upstream.requests.get')
+    def test_budget_timeout_does_not_trip_breaker(self, mock_get):
+        """Running out of budget should not count against the upstream."""
+        mock_get.side_effect = requests.exceptions.Timeout('slow')
+        token = deadline.start(0.5)
+        try:
+            for _ in range(upstream.CIRCUIT_FAILURE_THRESHOLD + 1):
+                with self.assertRaises(deadline.DeadlineExceeded):
+                    upstream.get('https://example.com/feed', timeout=5)
+        finally:
+            deadline.stop(token)
+        self.assertEqual(upstream.get_breaker('https://example.com/feed').state, upstream.CLOSED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Unit tests for near-duplicate article clustering."""
+
+import time
+import random
+import unittest
+
+from modules import dedupe
+
+
+class TestDedupeArticles(unittest.TestCase):
+    """Test MinHash/LSH clustering of articles."""
+
+    def test_same_story_from_different_sources_is_merged(self):
+        """Rewordings of one headline should collapse into one article."""
+        articles = [
+            {'title': 'Israel and Hamas agree ceasefire deal in Gaza', 'source': 'BBC World',
+             'summary': 'The agreement was reached after weeks of talks in Cairo.'},
+            {'title': 'Apple unveils new MacBook Pro with M5 chip', 'source': 'The Verge', 'summary': ''},
+            {'title': 'Israel and Hamas Reach Gaza Cease-Fire Agreement', 'source': 'NYT World',
+             'summary': 'Talks in Cairo produced an agreement after weeks.'},
+        ]
+        result = dedupe.dedupe_articles(articles)
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0]['source'], 'BBC World')
+        self.assertEqual(result[0]['also_from'], ['NYT World'])
+        self.assertNotIn('also_from', result[1])
+
+    def test_unrelated_articles_are_kept(self):
+        """Distinct stories should not be clustered."""
+        articles = [
+            {'title': 'Manchester United sign new striker'},
+            {'title': 'Fed holds interest rates steady'},
+            {'title': 'Wildfire spreads across southern California'},
+        ]
+        self.assertEqual(len(dedupe.dedupe_articles(articles)), 3)
+
+    def test_articles_without_tokens(self):
+        """Articles with no usable words should pass through untouched."""
+        articles = [{'title': ''}, {'title': 'a b'}]
+        self.assertEqual(len(dedupe.dedupe_articles(articles)), 2)
+
+    def test_scales_to_hundreds_of_articles(self):
+        """A few hundred articles should cluster quickly."""
+        rng = random.Random(1)
+        vocabulary = [''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(7)) for _ in range(2000)]
+        articles = [{'title': ' '.join(rng.sample(vocabulary, 10)), 'summary': ' '.join(rng.sample(vocabulary, 20))}
+                    for _ in range(300)]
+        start = time.perf_counter()
+        result = dedupe.dedupe_articles(articles)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(len(result), 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
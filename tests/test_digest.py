@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Unit tests for the prebuilt digest store."""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from modules import digest as digest_module
+
+
+class TestBuildDigests(unittest.TestCase):
+    """Test digest payload builders."""
+
+    def test_rss_digest_groups_by_category(self):
+        """Articles should be grouped into themes by category."""
+        payload = digest_module.build_rss_digest([
+            {'title': 'A', 'link': 'a', 'source': 'BBC', 'category': 'world'},
+            {'title': 'B', 'link': 'b', 'source': 'Wired', 'category': 'tech'},
+            {'title': 'C', 'link': 'c', 'source': 'NYT', 'category': 'world'},
+        ])
+        themes = {t['theme']: t['headlines'] for t in payload['themes']}
+        self.assertEqual([h['title'] for h in themes['world']], ['A', 'C'])
+        self.assertIn('generated', payload)
+
+    def test_ai_digest_old_format(self):
+        """Old summary/themes format should be reshaped into categories."""
+        payload = digest_module.build_ai_digest({
+            'summary': 'Quiet day',
+            'themes': [{'theme': 'tech', 'headlines': ['h'] * 7}, {'theme': 'empty', 'headlines': []}]
+        })
+        self.assertEqual(payload['summary'], 'Quiet day')
+        self.assertEqual(len(payload['categories']), 1)
+        self.assertEqual(payload['categories'][0]['count'], 7)
+        self.assertEqual(len(payload['categories'][0]['headlines']), 5)
+
+
+class TestDigestStore(unittest.TestCase):
+    """Test in-memory digest store with write-through persistence."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'digest.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_write_through_round_trip(self):
+        """A new store should load what the previous one saved."""
+        store = digest_module.DigestStore(self.path)
+        store.set_ai_digest({'categories': [{'theme': 'x'}], 'date': '2026-10-18'})
+        store.set_rss_digest({'themes': [], 'generated': 'now'})
+
+        reloaded = digest_module.DigestStore(self.path)
+        reloaded.load()
+        self.assertEqual(reloaded.raw, {'categories': [{'theme': 'x'}], 'date': '2026-10-18'})
+        self.assertEqual(reloaded.rss, {'themes': [], 'generated': 'now'})
+        self.assertEqual(len(reloaded.history), 1)
+
+    def test_history_is_bounded(self):
+        """History should keep only the most recent HISTORY_DAYS dates."""
+        store = digest_module.DigestStore(self.path)
+        store.history = {f'2026-01-{d:02d}': {} for d in range(1, 30)}
+        store.set_rss_digest({'themes': []})
+        self.assertEqual(len(store.history), digest_module.HISTORY_DAYS)
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)['history']), digest_module.HISTORY_DAYS)
+
+
+class TestDigestRoutes(unittest.TestCase):
+    """Test that digest routes serve the prebuilt payloads."""
+
+    def setUp(self):
+        from app import app
+        self.client = app.test_client()
+        self.original_rss = digest_module.store.rss
+
+    def tearDown(self):
+        digest_module.store.rss = self.original_rss
+
+    def test_digest_serves_prebuilt_payload(self):
+        """/digest should return the stored payload with cache headers."""
+        digest_module.store.rss = {'themes': [{'theme': 'tech', 'headlines': []}], 'generated': 'prebuilt'}
+        response = self.client.get('/digest')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['generated'], 'prebuilt')
+        self.assertIn('max-age', response.headers['Cache-Control'])
+
+    @patch('modules.digest.refresh.trigger')
+    def test_cold_digest_wakes_refresher(self, mock_trigger):
+        """With nothing built yet /digest should answer at once and not be cached."""
+        digest_module.store.rss = None
+        response = self.client.get('/digest')
+        self.assertTrue(json.loads(response.data)['building'])
+        self.assertEqual(response.headers['Cache-Control'], 'no-store')
+        mock_trigger.assert_called_once_with('digest')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Unit tests for the /events push channel."""
+
+import json
+import threading
+import unittest
+
+from modules import events
+
+
+def parse(message):
+    """(id, event, data) from one SSE message"""
+    fields = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+    return int(fields['id']), fields['event'], json.loads(fields['data'])
+
+
+class TestEventBus(unittest.TestCase):
+    """Test versioned publishing and catch-up."""
+
+    def test_unchanged_payload_is_dropped(self):
+        """Publishing the same payload twice should only produce one event."""
+        bus = events.EventBus()
+        self.assertEqual(bus.publish('weather', {'temp': 60}, updated=1.0), 1)
+        self.assertIsNone(bus.publish('weather', {'temp': 60}, updated=2.0))
+        self.assertEqual(bus.publish('weather', {'temp': 61}), 2)
+        self.assertEqual(len(bus.events), 2)
+
+    def test_reconnect_resumes_or_resyncs(self):
+        """A known id should get only what it missed; an unknown one the latest state."""
+        bus = events.EventBus(backlog=2)
+        bus.publish('stats', {'cpu': 1})
+        bus.publish('stocks', {'stocks': []})
+        bus.publish('stats', {'cpu': 2})
+
+        missed = [parse(m) for m in bus.since(2)]
+        self.assertEqual([(seq, name) for seq, name, _ in missed], [(3, 'stats')])
+
+        resync = [parse(m) for m in bus.since(0)]
+        self.assertEqual({name: data['version'] for _, name, data in resync}, {'stocks': 1, 'stats': 2})
+
+    def test_stream_wakes_on_publish_and_heartbeats(self):
+        """Subscribers should block until a change, with heartbeats while idle."""
+        bus = events.EventBus()
+        stream = bus.stream(heartbeat=0.05)
+        self.assertTrue(next(stream).startswith('retry:'))
+        self.assertEqual(next(stream), ': heartbeat\n\n')
+        self.assertEqual(bus.subscribers, 1)
+
+        threading.Timer(0.01, bus.publish, args=('chores', {'chores': ['feed']})).start()
+        seq, name, data = parse(next(stream))
+        self.assertEqual((name, data['data']), ('chores', {'chores': ['feed']}))
+        stream.close()
+        self.assertEqual(bus.subscribers, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
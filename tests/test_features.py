@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Unit tests for FEATURES-driven module loading and the startup report."""
+
+import sys
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+
+from modules import features
+
+
+def register_ping(app):
+    """Feature target for these tests, loaded by 'module:function'"""
+    @app.route('/ping')
+    def ping():
+        return 'pong'
+
+
+class TestFeatures(unittest.TestCase):
+    """Test that only enabled features are imported and registered."""
+
+    def setUp(self):
+        saved_features, saved_steps = list(features._features), list(features._steps)
+        features._features.clear()
+        features._steps.clear()
+        self.addCleanup(features._steps.extend, saved_steps)
+        self.addCleanup(features._features.extend, saved_features)
+        self.addCleanup(features._steps.clear)
+        self.addCleanup(features._features.clear)
+
+    def test_disabled_feature_is_not_imported(self):
+        """A feature whose flags are all off should never import its module."""
+        app = Flask(__name__)
+        features.register('ping', f'{__name__}:register_ping', flags=('ping', 'pong'))
+        features.register('missing', 'modules.does_not_exist')
+        with patch.dict(features.FEATURES, {'ping': False, 'pong': True, 'missing': False}):
+            features.load(app)
+
+        self.assertEqual(app.test_client().get('/ping').data, b'pong')
+        self.assertNotIn('modules.does_not_exist', sys.modules)
+        report = features.get_report()
+        self.assertEqual(report['disabled'], ['missing'])
+        self.assertIsNotNone(report['steps'][0]['register_ms'])
+
+    def test_report_lists_every_step(self):
+        """Recorded and loaded steps should both appear, disabled ones as off."""
+        calls = []
+        features.record('core imports', 0.25)
+        features.register('chores', calls.append)
+        features.register('weather', 'modules.does_not_exist')
+        with patch.dict(features.FEATURES, {'weather': False}):
+            features.load('app')
+
+        self.assertEqual(calls, ['app'])
+        lines = features.format_report().splitlines()
+        self.assertIn('250.0 ms', lines[1])
+        self.assertTrue(lines[2].strip().startswith('chores'))
+        self.assertTrue(lines[3].endswith('off'))
+
+
+if __name__ == '__main__':
+    unittest.main()
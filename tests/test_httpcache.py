@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Unit tests for the ETag / Cache-Control / gzip middleware."""
+
+import gzip
+import unittest
+from unittest.mock import patch
+
+from flask import Flask, jsonify
+
+from modules import httpcache
+
+
+class TestHttpCache(unittest.TestCase):
+    """Exercise the middleware on a throwaway app."""
+
+    def setUp(self):
+        httpcache._gzip_cache.clear()
+        self.version = 1
+        self.builds = 0
+        app = Flask(__name__)
+        httpcache.register(app)
+
+        @app.route('/doc')
+        @httpcache.validated(lambda: self.version)
+        def doc():
+            self.builds += 1
+            return jsonify({'items': ['x' * 40] * 100})
+
+        @app.route('/small')
+        def small():
+            return jsonify({'ok': True})
+
+        self.client = app.test_client()
+
+    def test_matching_etag_skips_the_view(self):
+        """If-None-Match with the current ETag should 304 without building the body."""
+        etag = self.client.get('/doc').headers['ETag']
+        response = self.client.get('/doc', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+
+        self.version = 2
+        self.assertEqual(self.client.get('/doc', headers={'If-None-Match': etag}).status_code, 200)
+
+    def test_large_bodies_are_gzipped_once_per_version(self):
+        """Compressed bytes should be cached and reused for the same ETag."""
+        headers = {'Accept-Encoding': 'gzip'}
+        with patch('modules.httpcache.gzip.compress', wraps=gzip.compress) as compress:
+            first = self.client.get('/doc', headers=headers)
+            second = self.client.get('/doc', headers=headers)
+        self.assertEqual(first.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(compress.call_count, 1)
+        self.assertIn(b'xxxx', gzip.decompress(first.data))
+
+        response = self.client.get('/doc', headers=dict(headers, **{'If-None-Match': first.headers['ETag']}))
+        self.assertEqual(response.status_code, 304)
+
+    def test_small_bodies_are_left_alone(self):
+        """Bodies under GZIP_MIN_SIZE shouldn't be compressed or tagged."""
+        response = self.client.get('/small', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertNotIn('ETag', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
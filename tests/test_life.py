@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Unit tests for the life module's load-once migration pipeline."""
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from modules import life as life_module
+
+
+class LifeFileTestCase(unittest.TestCase):
+    """Point the life module at a temporary life.json."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_life_file = life_module.LIFE_FILE
+        life_module.LIFE_FILE = os.path.join(self.temp_dir, 'life.json')
+        life_module._life_cache['data'] = None
+        life_module._life_cache['mtime'] = None
+
+    def tearDown(self):
+        life_module.LIFE_FILE = self.original_life_file
+        life_module._life_cache['data'] = None
+        life_module._life_cache['mtime'] = None
+        shutil.rmtree(self.temp_dir)
+
+    def write_life(self, data):
+        with open(life_module.LIFE_FILE, 'w') as f:
+            json.dump(data, f)
+
+
+class TestMigrateLifeData(LifeFileTestCase):
+    """Test the migration chain and schema normalization."""
+
+    def test_unversioned_data_is_migrated(self):
+        """Data without a version should be upgraded to the current schema."""
+        data = life_module.migrate_life_data({'fitness': {'workouts': [{'date': '2026-01-01'}]}})
+        self.assertEqual(data['version'], life_module.CURRENT_VERSION)
+        self.assertEqual(len(data['fitness']['workouts']), 1)
+        self.assertIn('goals', data['fitness'])
+        self.assertEqual(data['social'], {'interactions': []})
+
+    def test_malformed_entries_are_dropped(self):
+        """Non-object entries and wrong section types should be repaired."""
+        data, issues = life_module.normalize_life_data({
+            'version': '1.0',
+            'mood': {'entries': [{'mood': 7}, 'oops']},
+            'learning': [],
+        })
+        self.assertEqual(data['mood']['entries'], [{'mood': 7}])
+        self.assertEqual(data['learning']['books'], [])
+        self.assertEqual(len(issues), 2)
+
+
+class TestLoadLifeData(LifeFileTestCase):
+    """Test that life.json is read once and served from memory."""
+
+    def test_migration_is_persisted_once(self):
+        """Loading an old file should write the migrated version back."""
+        self.write_life({'mood': {'entries': []}})
+        life_module.init_life_data()
+        with open(life_module.LIFE_FILE) as f:
+            self.assertEqual(json.load(f)['version'], life_module.CURRENT_VERSION)
+
+    def test_reads_are_served_from_memory(self):
+        """Repeated loads should return the same object until the file changes."""
+        self.write_life(life_module.get_default_life_data())
+        first = life_module.load_life_data()
+        self.assertIs(life_module.load_life_data(), first)
+
+        stat = os.stat(life_module.LIFE_FILE)
+        self.write_life({'version': '1.0', 'mood': {'entries': [{'mood': 3}]}})
+        os.utime(life_module.LIFE_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        reloaded = life_module.load_life_data()
+        self.assertIsNot(reloaded, first)
+        self.assertEqual(reloaded['mood']['entries'], [{'mood': 3}])
+
+    def test_update_does_not_touch_shared_copy(self):
+        """Writers should change a private copy and swap it in on save."""
+        self.write_life(life_module.get_default_life_data())
+        before = life_module.load_life_data()
+        life_module.update_life_data(lambda data: data['mood']['entries'].append({'mood': 8}))
+        self.assertEqual(before['mood']['entries'], [])
+        self.assertEqual(life_module.load_life_data()['mood']['entries'], [{'mood': 8}])
+        with open(life_module.LIFE_FILE) as f:
+            self.assertEqual(json.load(f)['mood']['entries'], [{'mood': 8}])
+
+    def test_dry_run_does_not_write(self):
+        """Dry run should report timings and leave the file untouched."""
+        self.write_life({'fitness': {'workouts': 'bad'}})
+        before = os.stat(life_module.LIFE_FILE).st_mtime_ns
+        report = life_module.dry_run_migration()
+        self.assertEqual(report['from_version'], '0.0')
+        self.assertEqual(report['to_version'], life_module.CURRENT_VERSION)
+        self.assertTrue(report['changed'])
+        self.assertEqual(os.stat(life_module.LIFE_FILE).st_mtime_ns, before)
+
+
+if __name__ == '__main__':
+    unittest.main()
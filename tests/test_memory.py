@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Unit tests for memory diagnostics and the soft limit."""
+
+import tracemalloc
+import unittest
+from unittest.mock import patch
+
+from modules import memory
+
+
+class TestSoftLimit(unittest.TestCase):
+    """Test cache eviction under the RSS soft limit."""
+
+    def setUp(self):
+        self.saved = dict(memory._caches)
+        memory._caches.clear()
+        self.addCleanup(memory._caches.update, self.saved)
+        self.addCleanup(memory._caches.clear)
+        self.evicted = []
+        memory.register_cache('archive', lambda: {'entries': 1}, lambda: self.evicted.append('archive'), priority=90)
+        memory.register_cache('gzip', lambda: {'entries': 1}, lambda: self.evicted.append('gzip'), priority=0)
+        memory.register_cache('snapshots', lambda: {'entries': 1})
+
+    def test_under_limit_evicts_nothing(self):
+        """Nothing should be evicted while RSS is under the limit."""
+        with patch.object(memory, 'rss_mb', return_value=100):
+            self.assertEqual(memory.enforce_soft_limit(200), [])
+        self.assertEqual(self.evicted, [])
+
+    def test_cheapest_cache_goes_first(self):
+        """Eviction should stop as soon as RSS is back under the limit."""
+        with patch.object(memory, 'rss_mb', side_effect=[250, 250, 150]), patch.object(memory, '_release'):
+            self.assertEqual(memory.enforce_soft_limit(200), ['gzip'])
+
+        # Still over: gzip is cooling down, so the archive is next
+        with patch.object(memory, 'rss_mb', return_value=250), patch.object(memory, '_release'):
+            self.assertEqual(memory.enforce_soft_limit(200), ['archive'])
+        self.assertEqual(self.evicted, ['gzip', 'archive'])
+        self.assertFalse(memory.cache_sizes()['snapshots']['evictable'])
+
+
+class TestTracer(unittest.TestCase):
+    """Test tracemalloc snapshots and diffs."""
+
+    def test_growth_is_reported(self):
+        """A second snapshot should report what grew since the first."""
+        tracer = memory.Tracer()
+        was_tracing = tracemalloc.is_tracing()
+        tracer.start()
+        try:
+            tracer.snapshot()
+            hoard = [bytearray(1024) for _ in range(1000)]
+            report = tracer.snapshot()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+        self.assertTrue(report['top'])
+        self.assertTrue(any('test_memory.py' in site['site'] for site in report['growth']))
+        del hoard
+
+
+if __name__ == '__main__':
+    unittest.main()
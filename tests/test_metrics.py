@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Unit tests for the /metrics exporter."""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+from flask import Flask, jsonify
+
+from modules import metrics, upstream
+
+
+class TestMetricTypes(unittest.TestCase):
+    """Test counters and histograms render in Prometheus text format."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Each bucket should count every observation at or below its bound."""
+        histogram = metrics.Histogram('test_duration_seconds', 'Test', ('route',), buckets=(0.1, 1))
+        histogram.observe(0.05, route='a')
+        histogram.observe(0.5, route='a')
+        histogram.observe(5, route='a')
+        lines = histogram.render()
+        metrics._registry.remove(histogram)
+        self.assertIn('test_duration_seconds_bucket{route="a",le="0.1"} 1', lines)
+        self.assertIn('test_duration_seconds_bucket{route="a",le="1"} 2', lines)
+        self.assertIn('test_duration_seconds_bucket{route="a",le="+Inf"} 3', lines)
+        self.assertIn('test_duration_seconds_count{route="a"} 3', lines)
+
+    def test_label_values_are_escaped(self):
+        """Quotes in label values must not break the exposition format."""
+        counter = metrics.Counter('test_total', 'Test', ('name',))
+        counter.inc(name='say "hi"')
+        lines = counter.render()
+        metrics._registry.remove(counter)
+        self.assertEqual(lines, ['test_total{name="say \\"hi\\""} 1'])
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test the request hooks and upstream instrumentation."""
+
+    def test_requests_are_counted_by_endpoint(self):
+        """Each request should be counted under its endpoint and status."""
+        app = Flask(__name__)
+        metrics.register(app)
+
+        @app.route('/ping')
+        def ping():
+            return jsonify({'ok': True})
+
+        client = app.test_client()
+        client.get('/ping')
+        client.get('/nope')
+        body = client.get('/metrics').get_data(as_text=True)
+        self.assertIn('srcc_http_requests_total{endpoint="ping",method="GET",status="200"}', body)
+        self.assertIn('srcc_http_requests_total{endpoint="unmatched",method="GET",status="404"}', body)
+        self.assertIn('srcc_http_request_duration_seconds_count{endpoint="ping",method="GET"}', body)
+        self.assertIn('srcc_process_resident_memory_bytes ', body)
+
+    @patch('modules.upstream.requests.get')
+    def test_upstream_errors_are_counted_by_host(self, mock_get):
+        """Upstream failures should be labelled by host and kind."""
+        upstream._breakers.clear()
+        mock_get.side_effect = [MagicMock(status_code=503), requests.exceptions.ConnectionError()]
+        before = metrics.upstream_errors.values.copy()
+        upstream.get('http://metrics.test/a')
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            upstream.get('http://metrics.test/b')
+        upstream._breakers.clear()
+
+        def delta(kind):
+            key = ('metrics.test', kind)
+            return metrics.upstream_errors.values.get(key, 0) - before.get(key, 0)
+        self.assertEqual(delta('http_503'), 1)
+        self.assertEqual(delta('ConnectionError'), 1)
+        self.assertIn('srcc_upstream_request_duration_seconds_count{host="metrics.test"} 2', metrics.render())
+
+
+if __name__ == '__main__':
+    unittest.main()
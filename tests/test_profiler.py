@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Unit tests for the opt-in request profiler."""
+
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from flask import Flask, jsonify
+
+from modules import profiler
+
+
+class TestProfiler(unittest.TestCase):
+    """Exercise the profiling middleware on a throwaway app."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        patcher = patch.object(profiler, 'PROFILE_DIR', self.dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_app(self):
+        app = Flask(__name__)
+        profiler.register(app)
+
+        @app.route('/slow')
+        def slow():
+            return jsonify({'total': sum(range(1000))})
+
+        return app.test_client()
+
+    def test_disabled_installs_nothing(self):
+        """With PROFILING off a profile request is served normally and nothing is saved."""
+        with patch.object(profiler, 'PROFILING', False):
+            client = self.make_app()
+        response = client.get('/slow?__profile=1')
+        self.assertNotIn('X-Profile', response.headers)
+        self.assertEqual(client.get('/debug/profiles').status_code, 404)
+        self.assertEqual(profiler.list_profiles(), [])
+
+    def test_profiles_are_saved_and_listed(self):
+        """Only requests that ask for it should be profiled, and the ring stays bounded."""
+        with patch.object(profiler, 'PROFILING', True), patch.object(profiler, 'PROFILE_KEEP', 2):
+            client = self.make_app()
+            client.get('/slow')
+            self.assertEqual(profiler.list_profiles(), [])
+
+            names = [client.get('/slow', headers={'X-Profile': '1'}).headers['X-Profile'] for _ in range(3)]
+            listing = client.get('/debug/profiles').get_json()
+
+        self.assertEqual(len(listing['profiles']), 2)
+        self.assertEqual(listing['profiles'][0]['route'], '/slow')
+        report = client.get(f'/debug/profiles/{names[-1]}').get_data(as_text=True)
+        self.assertIn('function calls', report)
+        self.assertEqual(client.get('/debug/profiles/../config.py').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Unit tests for the snapshot store shared by worker processes."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from modules import snapshots
+
+
+class TestSQLiteStore(unittest.TestCase):
+    """Two stores on one file stand in for two workers."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir, True)
+        path = os.path.join(self.dir, 'snapshots.db')
+        self.a = snapshots.SQLiteStore(path)
+        self.b = snapshots.SQLiteStore(path)
+
+    def test_snapshot_put_by_one_is_read_by_the_other(self):
+        """A snapshot stored through one handle should be visible to the other."""
+        self.a.put('weather', {'temp': 60}, fetched_at=100.0)
+        self.assertEqual(self.b.get('weather'), {'value': {'temp': 60}, 'fetched_at': 100.0})
+        self.a.put('weather', {'temp': 61}, fetched_at=200.0)
+        self.assertEqual(self.b.get('weather')['value'], {'temp': 61})
+        self.assertEqual(len(self.b), 1)
+        self.assertIsNone(self.b.get('stocks'))
+
+    def test_current_memo_skips_reading_the_value(self):
+        """A read with an up-to-date memo should select only the fetch time."""
+        self.a.put('weather', {'temp': 60}, fetched_at=100.0)
+        first = self.b.get('weather')
+        with patch('json.loads') as loads:
+            self.assertIs(self.b.get('weather'), first)
+            loads.assert_not_called()
+        self.a.put('weather', {'temp': 61}, fetched_at=200.0)
+        self.assertEqual(self.b.get('weather')['value'], {'temp': 61})
+
+    def test_lease_is_held_until_released_or_expired(self):
+        """Only one claim should win until the lease is released or runs out."""
+        self.assertTrue(self.a.claim('weather', 30))
+        self.assertFalse(self.b.claim('weather', 30))
+        self.assertTrue(self.b.leased('weather'))
+        self.a.release('weather')
+        self.assertTrue(self.b.claim('weather', 0))
+        self.assertTrue(self.a.claim('weather', 30))
+
+    def test_versions_are_shared_and_never_reused(self):
+        """The same payload should keep its version; a new one gets a fresh number."""
+        v1 = self.a.next_version('news', 'd1', 0)
+        self.assertEqual(self.b.next_version('news', 'd1', 0), v1)
+        v2 = self.b.next_version('news', 'd2', v1)
+        self.assertGreater(v2, v1)
+        self.assertGreater(self.a.next_version('news', 'd1', v1), v2)
+
+    def test_changes_skip_this_process(self):
+        """A worker should only hear about widgets changed by other processes."""
+        seq, names = self.b.changes(None)
+        self.assertEqual(names, set())
+        self.a.notify(['news'])
+        self.assertEqual(self.b.changes(seq)[1], set())
+        with patch('os.getpid', return_value=os.getpid() + 1):
+            self.a.notify(['stocks'])
+        seq, names = self.b.changes(seq)
+        self.assertEqual(names, {'stocks'})
+        self.assertEqual(self.b.changes(seq), (seq, set()))
+
+
+if __name__ == '__main__':
+    unittest.main()
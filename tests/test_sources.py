@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Unit tests for the persistent source registry and adaptive polling."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import sources
+from config import SOURCE_POLL_MIN_INTERVAL, SOURCE_POLL_MAX_INTERVAL, SOURCE_POLL_DEFAULT_INTERVAL
+
+
+class FakeSource(sources.NewsSource):
+    """Source that returns a scripted list of links per poll."""
+
+    def __init__(self, name, batches, fail=False):
+        super().__init__(name, f'https://example.com/{name}', 'tech')
+        self.batches = list(batches)
+        self.fail = fail
+
+    def fetch(self, max_items=10):
+        if self.fail:
+            self.last_error = 'timeout'
+            return []
+        links = self.batches.pop(0) if self.batches else []
+        return [{'title': f'{self.name} {link}', 'link': link, 'source': self.name, 'summary': ''} for link in links]
+
+
+class TestAdaptInterval(unittest.TestCase):
+    """Test poll interval adaptation."""
+
+    def state(self, interval=1800, consecutive_errors=0, publish_rate=None):
+        return {'interval': interval, 'consecutive_errors': consecutive_errors, 'publish_rate': publish_rate}
+
+    def test_busy_source_polls_faster(self):
+        """Many new items should shorten the interval down to the minimum."""
+        interval = sources.adapt_interval(self.state(), new_items=20, elapsed=600, failed=False)
+        self.assertEqual(interval, SOURCE_POLL_MIN_INTERVAL / 1000)
+
+    def test_quiet_source_backs_off(self):
+        """No new items should lengthen the interval."""
+        self.assertEqual(sources.adapt_interval(self.state(), 0, 1800, False), 2700)
+
+    def test_failure_backoff_starts_from_default(self):
+        """Backoff should double from the default interval, not the current one."""
+        default = SOURCE_POLL_DEFAULT_INTERVAL / 1000
+        self.assertEqual(sources.adapt_interval(self.state(interval=5000, consecutive_errors=1), 0, 1800, True), default * 2)
+        self.assertEqual(sources.adapt_interval(self.state(interval=5000, consecutive_errors=2), 0, 1800, True), default * 4)
+
+    def test_failures_back_off_within_bounds(self):
+        """Repeated failures should back off exponentially up to the maximum."""
+        interval = sources.adapt_interval(self.state(consecutive_errors=10), 0, 1800, True)
+        self.assertEqual(interval, SOURCE_POLL_MAX_INTERVAL / 1000)
+
+
+class TestSourceScheduler(unittest.TestCase):
+    """Test polling state and the due-source scheduler."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.originals = (sources.CACHE_FILE, sources.SOURCES_STATE_FILE, sources._sources, sources._article_hooks)
+        sources.CACHE_FILE = os.path.join(self.temp_dir, 'cache.json')
+        sources.SOURCES_STATE_FILE = os.path.join(self.temp_dir, 'state.json')
+        sources._article_hooks = []
+
+    def tearDown(self):
+        sources.CACHE_FILE, sources.SOURCES_STATE_FILE, sources._sources, sources._article_hooks = self.originals
+        shutil.rmtree(self.temp_dir)
+
+    def test_poll_counts_only_new_links(self):
+        """Links seen on an earlier poll should not count as new."""
+        source = FakeSource('a', [['1', '2'], ['2', '3']])
+        source.poll()
+        source.state['last_poll'] -= 3600
+        source.poll()
+        self.assertEqual(source.state['polls'], 2)
+        self.assertEqual(source.seen_links, ['1', '2', '3'])
+        self.assertEqual(source.state['publish_rate'], 1.0)
+
+    def test_refresh_polls_only_due_sources(self):
+        """Sources that aren't due should be skipped, and their articles kept."""
+        due = FakeSource('due', [['x']])
+        idle = FakeSource('idle', [['never']])
+        idle.articles = [{'title': 'idle old', 'link': 'old', 'source': 'idle', 'summary': ''}]
+        idle.state['next_poll'] = float('inf')
+        sources._sources = [due, idle]
+
+        self.assertEqual(sources.refresh_articles(), 1)
+        articles, age = sources.read_article_cache()
+        self.assertEqual({a['link'] for a in articles}, {'x', 'old'})
+        self.assertEqual(idle.state['polls'], 0)
+
+    def test_stale_cache_is_restamped_without_hooks(self):
+        """With nothing due an old cache should be rewritten but not re-processed."""
+        idle = FakeSource('idle', [])
+        idle.articles = [{'title': 'idle old', 'link': 'old', 'source': 'idle', 'summary': ''}]
+        idle.state['next_poll'] = float('inf')
+        sources._sources = [idle]
+        sources.write_article_cache(idle.articles)
+        old = os.path.getmtime(sources.CACHE_FILE) - 3600
+        os.utime(sources.CACHE_FILE, (old, old))
+        calls = []
+        sources.register_article_hook(calls.append)
+
+        self.assertEqual(sources.refresh_articles(), 0)
+        self.assertEqual(calls, [])
+        self.assertGreater(os.path.getmtime(sources.CACHE_FILE), old)
+        self.assertEqual(sources.read_article_cache()[0], idle.articles)
+
+    def test_state_survives_restart(self):
+        """Saved polling state should be restored onto new source objects."""
+        source = FakeSource('a', [['1']], fail=True)
+        source.poll()
+        sources.save_source_state([source])
+
+        restored = FakeSource('a', [])
+        sources.load_source_state([restored])
+        self.assertEqual(restored.state['errors'], 1)
+        self.assertEqual(restored.state['interval'], source.state['interval'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Unit tests for the zero-downtime restart pieces."""
+
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+from modules import events, supervisor, upstream
+
+
+class TestHandoff(unittest.TestCase):
+    """Test snapshots survive the trip to the next generation."""
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        upstream._snapshots.clear()
+        self.addCleanup(upstream._snapshots.clear)
+
+    def test_snapshots_round_trip_and_newer_ones_win(self):
+        """Loaded snapshots keep their age; one fetched since isn't overwritten."""
+        path = os.path.join(self.dir, 'handoff.json')
+        upstream._store('weather', {'temp': 60})
+        upstream._store('stocks', [{'symbol': 'MSFT'}])
+        fetched_at = upstream.get_snapshot('weather')['fetched_at']
+        self.assertEqual(upstream.dump_snapshots(path), 2)
+
+        upstream._snapshots.clear()
+        upstream._store('stocks', [{'symbol': 'AMZN'}])
+        self.assertEqual(upstream.load_snapshots(path), 2)
+        self.assertEqual(upstream.get_snapshot('weather'), {'value': {'temp': 60}, 'fetched_at': fetched_at})
+        self.assertEqual(upstream.get_snapshot('stocks')['value'], [{'symbol': 'AMZN'}])
+        self.assertEqual(upstream.load_snapshots(os.path.join(self.dir, 'missing.json')), 0)
+
+
+class TestDrain(unittest.TestCase):
+    """Test a draining worker waits for in-flight responses."""
+
+    def test_streaming_response_counts_until_closed(self):
+        """A request is in flight until its body has been fully sent."""
+        def app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return iter([b'a', b'b'])
+
+        in_flight = supervisor.InFlight(app)
+        body = in_flight({}, lambda status, headers: None)
+        self.assertEqual(in_flight.count, 1)
+        self.assertFalse(in_flight.wait_idle(0.01))
+
+        threading.Timer(0.05, body.close).start()
+        self.assertEqual(b''.join(body), b'ab')
+        self.assertTrue(in_flight.wait_idle(1))
+        self.assertEqual(in_flight.count, 0)
+
+    def test_closing_the_bus_ends_streams(self):
+        """Open /events streams should finish promptly so the worker can exit."""
+        bus = events.EventBus()
+        stream = bus.stream(heartbeat=5)
+        next(stream)
+        threading.Timer(0.05, bus.close).start()
+        start = time.time()
+        self.assertEqual(list(stream), [])
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(bus.subscribers, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
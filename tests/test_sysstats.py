@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Unit tests for the background system sampler."""
+
+import json
+import math
+import unittest
+
+from modules import sysstats
+
+
+class TestRing(unittest.TestCase):
+    """Test the array-backed ring buffer."""
+
+    def test_wraps_and_returns_oldest_first(self):
+        """Appending past capacity should overwrite the oldest values."""
+        ring = sysstats.Ring(3)
+        for value in range(5):
+            ring.append(value)
+        self.assertEqual(list(ring.last(10)), [2.0, 3.0, 4.0])
+        self.assertEqual(list(ring.last(2)), [3.0, 4.0])
+
+    def test_downsample_skips_gaps(self):
+        """Buckets should average present values and report None when empty."""
+        values = [1, 3, math.nan, math.nan, 5, 7]
+        self.assertEqual(sysstats.downsample(values, 3), [2.0, None, 6.0])
+
+
+class TestSampler(unittest.TestCase):
+    """Test sampling and history."""
+
+    def test_history_has_every_series(self):
+        """History should cover every series and core at the requested resolution."""
+        sampler = sysstats.Sampler(interval=1, history=10)
+        for _ in range(4):
+            sampler.sample()
+        history = sampler.history(window=10, points=2)
+        self.assertEqual(len(history['times']), 2)
+        self.assertEqual(set(history['series']), set(sysstats.Sampler.SERIES))
+        self.assertEqual(len(history['cores']), len(sampler.cores))
+        self.assertIsNotNone(history['series']['disk_read'][-1])
+
+    def test_stats_route_serves_latest_sample(self):
+        """/stats should answer from the sampler with its usual fields."""
+        from app import app
+        data = json.loads(app.test_client().get('/stats').data)
+        for key in ('cpu', 'memory', 'time', 'uptime', 'last_tend_time'):
+            self.assertIn(key, data)
+
+    def test_history_rejects_bad_window(self):
+        """A window that isn't a finite positive number should get 400, not 500."""
+        from app import app
+        client = app.test_client()
+        for window in ('nan', 'inf', '-5', '0'):
+            self.assertEqual(client.get(f'/stats/history?window={window}').status_code, 400, window)
+        self.assertEqual(client.get('/stats/history?window=60').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Unit tests for TEAM_FEEDS tagging and the per-team index."""
+
+import unittest
+
+import sources
+from config import TEAM_FEEDS
+from modules import teams
+
+
+class TestTeamMatcher(unittest.TestCase):
+    """Test the compiled team matcher."""
+
+    def setUp(self):
+        self.matcher = teams.compile_matcher(TEAM_FEEDS)
+
+    def test_tags_every_team_mentioned(self):
+        """One scan should find all teams in an article."""
+        article = {'title': 'Real Madrid beat Manchester United in friendly', 'summary': ''}
+        self.assertEqual(teams.tag_article(article, self.matcher), ['man_united', 'real_madrid'])
+
+    def test_match_is_case_insensitive_and_word_bounded(self):
+        """Matches should ignore case but not match inside other words."""
+        self.assertEqual(teams.tag_article({'title': 'TEXAS LONGHORNS win big'}, self.matcher), ['texas_longhorns'])
+        self.assertEqual(teams.tag_article({'title': 'Surreal Madridista fan club'}, self.matcher), [])
+
+    def test_feed_tags_are_kept(self):
+        """Articles from a team feed keep their team even without a mention."""
+        article = {'title': 'Training report', 'teams': ['man_united']}
+        self.assertEqual(teams.tag_article(article, self.matcher), ['man_united'])
+
+
+class TestTeamIndex(unittest.TestCase):
+    """Test the per-team article index."""
+
+    def test_index_is_bounded_and_newest_first(self):
+        """Each team should keep only its newest articles."""
+        index = teams.TeamIndex(TEAM_FEEDS, max_per_team=3)
+        index.ingest([{'title': f'Real Madrid story {i}', 'link': f'l{i}'} for i in range(5)])
+        self.assertEqual([a['link'] for a in index.get('real_madrid')], ['l4', 'l3', 'l2'])
+        self.assertEqual(index.get('man_united'), [])
+
+    def test_team_feeds_are_registered_sources(self):
+        """TEAM_FEEDS URLs should be fetched with the other sources."""
+        team_sources = [s for s in sources.get_all_sources() if s.team]
+        self.assertEqual({s.team for s in team_sources}, set(TEAM_FEEDS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -164,7 +164,7 @@ class TestWeatherParsing(unittest.TestCase):
         app_module.DATA_FILE = self.original_data_file
         os.unlink(self.temp_file.name)
 
-    @patch('app.requests.get')
+    @patch('modules.upstream.requests.get')
     def test_weather_returns_dict(self, mock_get):
         """get_weather should return a dict."""
         mock_response = MagicMock()
@@ -175,8 +175,8 @@ class TestWeatherParsing(unittest.TestCase):
         mock_response.raise_for_status = MagicMock()
         mock_get.return_value = mock_response
         
-        import app
-        result = app.get_weather()
+        from modules import weather
+        result = weather.get_weather()
         self.assertIsInstance(result, dict)
 
 
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Unit tests for upstream circuit breakers and stale-while-revalidate."""
+
+import time
+import unittest
+import threading
+from unittest.mock import patch, MagicMock
+
+import requests
+
+from modules import upstream
+
+
+class UpstreamTestCase(unittest.TestCase):
+    """Start every test with no breakers or snapshots."""
+
+    def setUp(self):
+        upstream._breakers.clear()
+        upstream._snapshots.clear()
+
+    def tearDown(self):
+        upstream._breakers.clear()
+        upstream._snapshots.clear()
+
+
+class TestCircuitBreaker(UpstreamTestCase):
+    """Test breaker state transitions."""
+
+    def test_opens_after_threshold(self):
+        """Consecutive failures should open the circuit."""
+        breaker = upstream.CircuitBreaker('example.com', threshold=2, reset_timeout=60)
+        breaker.record_failure('boom')
+        self.assertTrue(breaker.allow())
+        breaker.record_failure('boom')
+        self.assertEqual(breaker.state, upstream.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_allows_one_probe(self):
+        """After the reset timeout exactly one probe should be let through."""
+        breaker = upstream.CircuitBreaker('example.com', threshold=1, reset_timeout=0)
+        breaker.record_failure('boom')
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, upstream.CLOSED)
+
+    @patch('modules.upstream.requests.get')
+    def test_open_circuit_skips_request(self, mock_get):
+        """get() should fail fast without calling requests when the circuit is open."""
+        mock_get.side_effect = requests.exceptions.Timeout('slow')
+        for _ in range(upstream.CIRCUIT_FAILURE_THRESHOLD):
+            with self.assertRaises(requests.exceptions.Timeout):
+                upstream.get('https://slow.example.com/feed')
+        with self.assertRaises(upstream.CircuitOpenError):
+            upstream.get('https://slow.example.com/other')
+        self.assertEqual(mock_get.call_count, upstream.CIRCUIT_FAILURE_THRESHOLD)
+
+    @patch('modules.upstream.requests.get')
+    def test_server_errors_count_as_failures(self, mock_get):
+        """5xx responses should count towards opening the circuit."""
+        mock_get.return_value = MagicMock(status_code=503)
+        upstream.get('https://down.example.com/')
+        self.assertEqual(upstream.get_breaker('https://down.example.com/').failures, 1)
+
+    @patch('modules.upstream.requests.get')
+    def test_skip_if_open_probes_in_background(self, mock_get):
+        """An open host should be skipped and its probe sent off-thread, once."""
+        mock_get.return_value = MagicMock(status_code=200)
+        breaker = upstream.get_breaker('https://flaky.example.com/a')
+        breaker.reset_timeout = 0
+        for _ in range(breaker.threshold):
+            breaker.record_failure('down')
+
+        self.assertFalse(upstream.skip_if_open('https://ok.example.com/feed'))
+        self.assertTrue(upstream.skip_if_open('https://flaky.example.com/a', timeout=5))
+        for _ in range(200):
+            if breaker.state == upstream.CLOSED:
+                break
+            time.sleep(0.01)
+        self.assertEqual(breaker.state, upstream.CLOSED)
+        self.assertEqual(mock_get.call_count, 1)
+
+
+class TestServe(UpstreamTestCase):
+    """Test stale-while-revalidate snapshots."""
+
+    def test_failure_serves_last_good_value(self):
+        """A failing fetch should return the previous value marked stale."""
+        self.assertEqual(upstream.serve('w', lambda: {'temp': 60}, ['https://a.example.com']), ({'temp': 60}, False))
+
+        def failing():
+            raise requests.exceptions.ConnectionError('down')
+        value, stale = upstream.serve('w', failing, ['https://a.example.com'])
+        self.assertEqual(value, {'temp': 60})
+        self.assertTrue(stale)
+
+    def test_open_circuit_serves_stale_without_waiting(self):
+        """With the circuit open the fetcher should only run in the background."""
+        upstream._store('w', {'temp': 50})
+        breaker = upstream.get_breaker('https://a.example.com')
+        for _ in range(breaker.threshold):
+            breaker.record_failure('down')
+
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            time.sleep(0.3)
+            return {'temp': 70}
+        start = time.time()
+        value, stale = upstream.serve('w', slow_fetch, ['https://a.example.com'])
+        self.assertLess(time.time() - start, 0.2)
+        self.assertEqual((value, stale), ({'temp': 50}, True))
+
+        for _ in range(200):
+            if upstream.get_snapshot('w')['value'] == {'temp': 70}:
+                break
+            time.sleep(0.01)
+        self.assertEqual(upstream.get_snapshot('w')['value'], {'temp': 70})
+        self.assertEqual(len(calls), 1)
+
+    def test_fresh_snapshot_skips_fetch(self):
+        """With fresh_for a recent snapshot should be served without fetching."""
+        upstream._store('w', {'temp': 50})
+        fetch = MagicMock(return_value={'temp': 70})
+        self.assertEqual(upstream.serve('w', fetch, ['https://a.example.com'], fresh_for=60), ({'temp': 50}, False))
+        fetch.assert_not_called()
+        self.assertEqual(upstream.serve('w', fetch, ['https://a.example.com'], fresh_for=0), ({'temp': 70}, False))
+        fetch.assert_called_once()
+
+    def test_concurrent_callers_share_one_fetch(self):
+        """Callers arriving during a fetch should wait for it instead of fetching."""
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'temp': 70}
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            upstream.serve('w', slow_fetch, ['https://a.example.com'], fresh_for=60))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [({'temp': 70}, False)] * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Unit tests for widget versions and ?since= deltas."""
+
+import json
+import unittest
+from unittest.mock import patch
+
+from modules import versions
+
+
+class TestTracker(unittest.TestCase):
+    """Test version bumps and delta composition."""
+
+    def setUp(self):
+        self.tracker = versions.Tracker('news', keys={'articles': 'link'}, history=3)
+
+    def articles(self, *links):
+        return {'articles': [{'link': link, 'title': link.upper()} for link in links], 'stale': False}
+
+    def test_unchanged_payload_keeps_version(self):
+        """Recording the same payload should not bump the version."""
+        v1 = self.tracker.record(self.articles('a', 'b'))
+        self.assertEqual(self.tracker.record(self.articles('a', 'b')), v1)
+        self.assertIsNone(self.tracker.delta(v1))
+
+    def test_delta_has_only_new_and_removed_items(self):
+        """A delta should list added items and removed keys across versions."""
+        v1 = self.tracker.record(self.articles('a', 'b'))
+        self.tracker.record(self.articles('a', 'b', 'c'))
+        self.tracker.record(dict(self.articles('b', 'c', 'd'), stale=True))
+
+        delta = self.tracker.delta(v1)
+        self.assertEqual([a['link'] for a in delta['added']['articles']], ['c', 'd'])
+        self.assertEqual(delta['removed'], {'articles': ['a']})
+        self.assertEqual(delta['changed'], {'stale': True})
+
+    def test_same_stamp_skips_hashing(self):
+        """With an unchanged source stamp the payload should not be hashed again."""
+        v1 = self.tracker.record(self.articles('a'), stamp=1)
+        with patch('hashlib.sha1') as sha1:
+            self.assertEqual(self.tracker.record(self.articles('a'), stamp=1), v1)
+            self.assertEqual(self.tracker.current(1), v1)
+            sha1.assert_not_called()
+        self.assertIsNone(self.tracker.current(2))
+        self.assertGreater(self.tracker.record(self.articles('a', 'b'), stamp=2), v1)
+
+    def test_old_version_gets_full_payload(self):
+        """A version older than the history should not get a delta."""
+        v1 = self.tracker.record(self.articles('a'))
+        for link in 'bcde':
+            self.tracker.record(self.articles(link))
+        self.assertIs(self.tracker.delta(v1), False)
+        self.assertIs(self.tracker.delta(self.tracker.version + 1), False)
+
+
+class TestVersionedRoutes(unittest.TestCase):
+    """Test ?since= handling on a real route."""
+
+    def setUp(self):
+        from app import app
+        self.client = app.test_client()
+
+    def test_unchanged_chores_return_304(self):
+        """Polling with the current version should return 304."""
+        version = json.loads(self.client.get('/chores').data)['version']
+        self.assertEqual(self.client.get(f'/chores?since={version}').status_code, 304)
+
+    def test_unchanged_chores_are_not_rebuilt(self):
+        """Once versioned, a current client should get 304 without the payload being built."""
+        response = self.client.get('/chores')
+        version, etag = json.loads(response.data)['version'], response.headers['ETag']
+        with patch('app.load_data') as load_data:
+            self.assertEqual(self.client.get(f'/chores?since={version}').status_code, 304)
+            self.assertEqual(self.client.get('/chores', headers={'If-None-Match': etag}).status_code, 304)
+            load_data.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
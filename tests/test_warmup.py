@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Unit tests for the startup warm-up and /ready."""
+
+import time
+import threading
+import unittest
+from unittest.mock import patch
+
+from flask import Flask
+
+from modules import warmup
+
+
+class TestWarmup(unittest.TestCase):
+    """Test tasks run together and /ready reflects them."""
+
+    def setUp(self):
+        saved_tasks, saved_state = dict(warmup._tasks), dict(warmup._state)
+        warmup._tasks.clear()
+        warmup._state.update(started=None, finished=None, done=threading.Event())
+        self.addCleanup(warmup._state.update, saved_state)
+        self.addCleanup(warmup._tasks.update, saved_tasks)
+        self.addCleanup(warmup._tasks.clear)
+
+    def test_tasks_run_concurrently(self):
+        """Two slow caches should warm in the time of one; failures are reported, not raised."""
+        warmup.task('weather', lambda: time.sleep(0.2) or {'temp': 50})
+        warmup.task('stocks', lambda: time.sleep(0.2) or [])
+        warmup.task('news', lambda: 1 / 0)
+        with patch('builtins.print'), patch('traceback.print_exc'):
+            status = warmup.run(timeout=5)
+        self.assertTrue(status['ready'])
+        self.assertLess(status['seconds'], 0.35)
+        self.assertEqual({name: c['state'] for name, c in status['caches'].items()},
+                         {'weather': 'warm', 'stocks': 'failed', 'news': 'failed'})
+        self.assertIn('division by zero', status['caches']['news']['error'])
+
+    def test_ready_endpoint(self):
+        """/ready is 503 until the warm-up finishes, even if a task outlives the timeout."""
+        release = threading.Event()
+        warmup.task('slow', lambda: release.wait(5))
+        self.addCleanup(release.set)
+        app = Flask(__name__)
+        warmup.register_routes(app)
+        client = app.test_client()
+
+        response = client.get('/ready')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+
+        status = warmup.run(timeout=0.05)
+        self.assertTrue(status['ready'])
+        self.assertEqual(status['caches']['slow']['state'], 'running')
+        self.assertEqual(client.get('/ready').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()